@@ -1,21 +1,27 @@
 import xml.etree.ElementTree as ET
+from kml_journal import Journal
+from kml_stream import parse_kml
 
-# 2.5km 파일 로드
-tree = ET.parse('cheongna_buildings_2.5km_perfect.kml')
-root = tree.getroot()
+KML_FILE = 'cheongna_buildings_2.5km_perfect.kml'
 
 ns = {'kml': 'http://www.opengis.net/kml/2.2'}
 ET.register_namespace('', 'http://www.opengis.net/kml/2.2')
 
-# LookAt 범위 조정
-lookat = root.find('.//kml:LookAt', ns)
-if lookat is not None:
-    range_elem = lookat.find('kml:range', ns)
-    if range_elem is not None:
-        old_range = range_elem.text
-        range_elem.text = '2500'  # 2.5km
-        print(f"LookAt 범위 조정: {old_range} → 2500m")
+# 파일을 직접 다시 쓰므로 쌓인 편집 기록을 먼저 반영하고, 쓴 뒤에는 새 기준으로 기록 계속
+with Journal(KML_FILE).rewriting():
+    # 2.5km 파일 로드
+    tree = parse_kml(KML_FILE)
+    root = tree.getroot()
 
-# 저장
-tree.write('cheongna_buildings_2.5km_perfect.kml', encoding='utf-8', xml_declaration=True)
+    # LookAt 범위 조정
+    lookat = root.find('.//kml:LookAt', ns)
+    if lookat is not None:
+        range_elem = lookat.find('kml:range', ns)
+        if range_elem is not None:
+            old_range = range_elem.text
+            range_elem.text = '2500'  # 2.5km
+            print(f"LookAt 범위 조정: {old_range} → 2500m")
+
+    # 저장
+    tree.write(KML_FILE, encoding='utf-8', xml_declaration=True)
 print("✅ 업데이트 완료")
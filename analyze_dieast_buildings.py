@@ -2,18 +2,8 @@
 """
 Analyze 청라 디 이스트 buildings to identify properly modeled ones
 """
-import xml.etree.ElementTree as ET
 import re
-
-# Parse KML
-tree = ET.parse('cheongna_buildings_2.5km_perfect.kml')
-root = tree.getroot()
-
-# Define namespace
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-
-# Find all placemarks
-placemarks = root.findall('.//kml:Placemark', ns)
+from kml_stream import iter_placemarks
 
 print("=" * 80)
 print("청라 디 이스트 Buildings Analysis")
@@ -21,27 +11,19 @@ print("=" * 80)
 
 dieast_buildings = []
 
-for i, placemark in enumerate(placemarks):
-    name_elem = placemark.find('.//kml:name', ns)
-    if name_elem is not None and '청라 디 이스트' in name_elem.text:
+for pm in iter_placemarks('cheongna_buildings_2.5km_perfect.kml'):
+    if pm.name is not None and '청라 디 이스트' in pm.name:
         # Extract height from name
-        height_match = re.search(r'\((\d+\.?\d*)m\)', name_elem.text)
+        height_match = re.search(r'\((\d+\.?\d*)m\)', pm.name)
         height = float(height_match.group(1)) if height_match else 0.0
         
         # Get coordinates
-        coordinates_elem = placemark.find('.//kml:coordinates', ns)
-        if coordinates_elem is not None:
-            coord_text = coordinates_elem.text.strip()
-            coord_points = [c.strip() for c in coord_text.split() if c.strip()]
+        if pm.rings:
+            coord_points = pm.rings[0]
             
             # Calculate center
-            lons = []
-            lats = []
-            for coord in coord_points:
-                parts = coord.split(',')
-                if len(parts) >= 2:
-                    lons.append(float(parts[0]))
-                    lats.append(float(parts[1]))
+            lons = coord_points[:, 0].tolist()
+            lats = coord_points[:, 1].tolist()
             
             if lons and lats:
                 center_lon = sum(lons) / len(lons)
@@ -58,8 +40,8 @@ for i, placemark in enumerate(placemarks):
                 aspect_ratio = max(width, depth) / min(width, depth) if min(width, depth) > 0 else 0
                 
                 dieast_buildings.append({
-                    'index': i,
-                    'name': name_elem.text,
+                    'index': pm.index,
+                    'name': pm.name,
                     'height': height,
                     'center_lon': center_lon,
                     'center_lat': center_lat,
@@ -1,16 +1,7 @@
-import xml.etree.ElementTree as ET
-import re
+from kml_stream import KmlReader
 
-# KML 파일 파싱
-tree = ET.parse('cheongna_buildings_5km.kml')
-root = tree.getroot()
-
-# 네임스페이스 추출
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-
-# Placemark 찾기
-placemarks = root.findall('.//kml:Placemark', ns)
-print(f"총 Placemark 개수: {len(placemarks)}")
+# KML 파일 스트리밍
+reader = KmlReader('cheongna_buildings_5km.kml')
 
 # 각 Placemark 분석
 polygon_count = 0
@@ -19,23 +10,21 @@ total_coords = 0
 max_coords = 0
 min_coords = float('inf')
 
-for placemark in placemarks[:10]:  # 처음 10개만 샘플링
-    name_elem = placemark.find('.//kml:name', ns)
-    name = name_elem.text if name_elem is not None else "No name"
+for pm in reader:
+    if pm.index >= 10:  # 처음 10개만 샘플링 (나머지는 개수만 셈)
+        continue
+    name = pm.name if pm.name is not None else "No name"
     
-    polygon = placemark.find('.//kml:Polygon', ns)
-    if polygon is not None:
+    if pm.rings:
         polygon_count += 1
         
         # extrude 확인
-        extrude = polygon.find('.//kml:extrude', ns)
-        if extrude is not None and extrude.text == '1':
+        if pm.extrude == 1:
             polygon_with_extrude += 1
         
         # 좌표 개수 확인
-        coords_elem = polygon.find('.//kml:coordinates', ns)
-        if coords_elem is not None:
-            coords_text = coords_elem.text.strip()
+        if pm.coord_texts:
+            coords_text = pm.coord_texts[0].strip()
             coord_points = [c.strip() for c in coords_text.split() if c.strip()]
             num_coords = len(coord_points)
             total_coords += num_coords
@@ -46,6 +35,7 @@ for placemark in placemarks[:10]:  # 처음 10개만 샘플링
             print(f"  좌표 개수: {num_coords}")
             print(f"  샘플 좌표: {coord_points[0] if coord_points else 'None'}")
 
+print(f"\n총 Placemark 개수: {reader.count}")
 print(f"\n=== 전체 분석 (샘플 10개) ===")
 print(f"Polygon 개수: {polygon_count}")
 print(f"Extrude=1인 Polygon: {polygon_with_extrude}")
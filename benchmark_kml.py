@@ -0,0 +1,45 @@
+from kml_bench import (compare, latest_results, load_results, run_benchmarks,
+                       save_results)
+
+# 합성 건물 수 (청라 샘플과 비슷한 건물을 크기별로 생성)
+SIZES = [10_000, 100_000, 1_000_000]
+
+# 측정할 작업 (None 이면 전부: parse, radius, clean, optimize, copy, names, validate, verify, write)
+OPERATIONS = None
+
+# 합성 KML / 작업 출력 파일을 만들 임시 디렉터리 (끝나면 삭제), 결과 JSON 디렉터리
+WORK_DIR = 'bench_work'
+RESULT_DIR = 'bench_results'
+
+# 메모리 측정 (tracemalloc 으로 작업을 한 번 더 실행)
+MEASURE_MEMORY = True
+
+print("=== KML 도구 합성 데이터 벤치마크 ===\n")
+print(f"{'건물 수':>10} | {'작업':<9} | {'시간 (s)':>9} | {'최대 메모리 (MB)':>16} | {'파일 (MB)':>9}")
+print("-" * 68)
+
+
+def show(row):
+    peak = f"{row['peak_mb']:>16.1f}" if row['peak_mb'] is not None else f"{'-':>16}"
+    print(f"{row['buildings']:>10,} | {row['operation']:<9} | {row['seconds']:>9.3f} | "
+          f"{peak} | {row['file_mb']:>9.1f}", flush=True)
+
+
+results = run_benchmarks(SIZES, OPERATIONS, work_dir=WORK_DIR, memory=MEASURE_MEMORY,
+                         progress=show)
+path = save_results(results, RESULT_DIR)
+print(f"\n✅ 결과 저장: {path} (커밋 {results['commit'] or '없음'})")
+
+# 직전 결과와 비교
+previous = latest_results(RESULT_DIR, exclude=path)
+if previous is not None:
+    old = load_results(previous)
+    print(f"\n=== 직전 결과와 비교: {previous} (커밋 {old['commit'] or '없음'}) ===")
+    for row in compare(old, results):
+        ratio = row['time_ratio']
+        # 0.01초 미만 작업은 측정 오차가 커서 표시하지 않음
+        slower = ratio is not None and ratio > 1.2 and row['new_seconds'] >= 0.01
+        mark = ' ⚠️' if slower else ''
+        ratio_text = f"{ratio:.2f}x" if ratio is not None else '-'
+        print(f"  {row['buildings']:>10,} {row['operation']:<9} "
+              f"{row['old_seconds']:>8.3f}s → {row['new_seconds']:>8.3f}s ({ratio_text}){mark}")
@@ -1,26 +1,35 @@
-import xml.etree.ElementTree as ET
-import re
+from kml_stream import KmlReader
 
-# KML 파일 파싱
-tree = ET.parse('cheongna_buildings_5km.kml')
-root = tree.getroot()
-
-# 네임스페이스
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-
-placemarks = root.findall('.//kml:Placemark', ns)
-print(f"총 Placemark 개수: {len(placemarks)}\n")
+# KML 파일 스트리밍 (포맷 검사와 패턴 분석을 한 번에)
+reader = KmlReader('cheongna_buildings_5km.kml')
 
 # 좌표 포맷 문제 찾기
 format_issues = []
 
-for idx, placemark in enumerate(placemarks[:100]):  # 처음 100개 샘플링
-    name_elem = placemark.find('.//kml:name', ns)
-    name = name_elem.text if name_elem is not None else f"Building_{idx}"
+# 전체 파일에서 좌표 구분 패턴 분석
+space_only = 0
+newline_only = 0
+mixed = 0
+
+for pm in reader:
+    if not pm.coord_texts:
+        continue
+    
+    text = pm.coord_texts[0].strip()
+    has_space = ' ' in text
+    has_newline = '\n' in text
     
-    coords_elem = placemark.find('.//kml:coordinates', ns)
-    if coords_elem is not None:
-        coords_text = coords_elem.text
+    if has_space and not has_newline:
+        space_only += 1
+    elif has_newline and not has_space:
+        newline_only += 1
+    elif has_space and has_newline:
+        mixed += 1
+    
+    idx = pm.index
+    if idx < 100:  # 처음 100개 샘플링
+        name = pm.name if pm.name is not None else f"Building_{idx}"
+        coords_text = pm.coord_texts[0]
         
         # 원본 좌표 텍스트 확인
         has_issue = False
@@ -45,10 +54,9 @@ for idx, placemark in enumerate(placemarks[:100]):  # 처음 100개 샘플링
             has_issue = True
             issues.append(f"공백구분={len(space_separated)}, 줄구분={len(newline_separated)}")
         
-        # 각 좌표 검증
-        for i, coord in enumerate(space_separated[:3]):  # 처음 3개만
-            parts = coord.split(',')
-            if len(parts) < 2:
+        # 각 좌표 검증 (리더가 전체 좌표를 파싱하며 실패 위치를 기록해 둠)
+        for ring, i, coord in pm.errors:
+            if ring == 0:
                 has_issue = True
                 issues.append(f"좌표{i} 파싱 실패: {coord}")
         
@@ -60,6 +68,7 @@ for idx, placemark in enumerate(placemarks[:100]):  # 처음 100개 샘플링
                 'sample': coords_text[:200]  # 처음 200자
             })
 
+print(f"총 Placemark 개수: {reader.count}\n")
 print(f"포맷 문제 발견: {len(format_issues)}개\n")
 
 for i, issue in enumerate(format_issues[:10]):
@@ -70,24 +79,6 @@ for i, issue in enumerate(format_issues[:10]):
 
 # 전체 파일에서 좌표 구분 패턴 분석
 print("\n=== 좌표 구분 패턴 분석 (전체) ===")
-space_only = 0
-newline_only = 0
-mixed = 0
-
-for placemark in placemarks:
-    coords_elem = placemark.find('.//kml:coordinates', ns)
-    if coords_elem is not None:
-        text = coords_elem.text.strip()
-        has_space = ' ' in text
-        has_newline = '\n' in text
-        
-        if has_space and not has_newline:
-            space_only += 1
-        elif has_newline and not has_space:
-            newline_only += 1
-        elif has_space and has_newline:
-            mixed += 1
-
 print(f"공백만 사용: {space_only}개")
 print(f"줄바꿈만 사용: {newline_only}개")
 print(f"혼합 사용: {mixed}개")
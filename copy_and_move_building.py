@@ -1,50 +1,28 @@
-import xml.etree.ElementTree as ET
-import re
-import copy
+import os
 
-# 2.5km 파일 로드
-tree = ET.parse('cheongna_buildings_2.5km_perfect.kml')
-root = tree.getroot()
+import numpy as np
 
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-ET.register_namespace('', 'http://www.opengis.net/kml/2.2')
+from kml_journal import Journal
 
-# 청라더샵레이크파크 찾기
-placemarks = root.findall('.//kml:Placemark', ns)
-document = root.find('.//kml:Document', ns)
-lake_park = None
+KML_FILE = 'cheongna_buildings_2.5km_perfect.kml'
+# 편집 기록에 추가한 복사를 KML 파일에도 바로 반영 (False 면 기록에만 남고 파일은 그대로)
+COMPACT = True
+
+# 현재 상태 = 캐시로 읽은 2.5km 파일 + 편집 기록 (바뀌지 않는 건물은 원본 XML 그대로 저장)
+journal = Journal(KML_FILE)
+store = journal.state()
 
-for placemark in placemarks:
-    name_elem = placemark.find('.//kml:name', ns)
-    if name_elem is not None and '청라더샵레이크파크' in name_elem.text:
-        lake_park = placemark
-        break
+# 청라더샵레이크파크 찾기
+candidates = np.flatnonzero(store.name_mask('청라더샵레이크파크') & ~store.deleted)
 
-if lake_park is None:
+if not len(candidates):
     print("❌ 청라더샵레이크파크를 찾을 수 없습니다.")
     exit(1)
+lake_park = candidates[0]
 
-# 원본 좌표 가져오기 및 중심점 계산
-coords_elem = lake_park.find('.//kml:coordinates', ns)
-coords_text = coords_elem.text.strip()
-coord_points = re.split(r'\s+', coords_text)
-coord_points = [c.strip() for c in coord_points if c.strip()]
-
-# 원본 중심점 계산
-lons = []
-lats = []
-heights = []
-
-for coord in coord_points:
-    parts = coord.split(',')
-    if len(parts) >= 2:
-        lons.append(float(parts[0]))
-        lats.append(float(parts[1]))
-        if len(parts) >= 3:
-            heights.append(float(parts[2]))
-
-original_center_lon = sum(lons) / len(lons)
-original_center_lat = sum(lats) / len(lats)
+# 원본 중심점
+original_center_lon = store.centroid_lon[lake_park]
+original_center_lat = store.centroid_lat[lake_park]
 print(f"원본 중심: ({original_center_lon:.6f}, {original_center_lat:.6f})")
 
 # 새 위치 (중심 좌표)
@@ -54,55 +32,25 @@ new_locations = [
     (37.530824759044826, 126.63702985257429, "Copy 3")
 ]
 
-# 각 위치에 대해 복사 및 이동
-for new_lat, new_lon, copy_name in new_locations:
-    # Placemark 복사
-    new_placemark = copy.deepcopy(lake_park)
-    
-    # 이름 변경
-    name_elem = new_placemark.find('.//kml:name', ns)
-    if name_elem is not None:
-        original_name = name_elem.text
-        name_elem.text = f"{original_name} - {copy_name}"
-    
-    # 좌표 이동
-    new_coords_elem = new_placemark.find('.//kml:coordinates', ns)
-    if new_coords_elem is not None:
-        # 오프셋 계산 (새 중심 - 원본 중심)
-        offset_lon = new_lon - original_center_lon
-        offset_lat = new_lat - original_center_lat
-        
-        # 모든 좌표에 오프셋 적용
-        new_coords = []
-        for coord in coord_points:
-            parts = coord.split(',')
-            if len(parts) >= 2:
-                old_lon = float(parts[0])
-                old_lat = float(parts[1])
-                new_coord_lon = old_lon + offset_lon
-                new_coord_lat = old_lat + offset_lat
-                
-                if len(parts) >= 3:
-                    height = parts[2]
-                    new_coords.append(f"{new_coord_lon:.7f},{new_coord_lat:.7f},{height}")
-                else:
-                    new_coords.append(f"{new_coord_lon:.7f},{new_coord_lat:.7f}")
-        
-        # 새 좌표 적용 (줄바꿈 형식)
-        new_coords_elem.text = '\n              ' + '\n              '.join(new_coords) + '\n            '
-    
-    # Document에 추가
-    if document is not None:
-        document.append(new_placemark)
-        print(f"✅ 추가됨: {name_elem.text} at ({new_lat:.6f}, {new_lon:.6f})")
-
-# 저장
-tree.write('cheongna_buildings_2.5km_perfect.kml', encoding='utf-8', xml_declaration=True)
-
-print(f"\n✅ 완료! 3개의 건물이 추가되었습니다.")
-print(f"총 건물 수: {len(placemarks)} → {len(placemarks) + 3}")
-
-# 파일 크기
-import os
-file_size = os.path.getsize('cheongna_buildings_2.5km_perfect.kml')
-print(f"파일 크기: {file_size/1024/1024:.2f} MB")
+# 모든 위치로 한 번에 복사 + 이동 (오프셋 = 새 중심 - 원본 중심, 브로드캐스트 한 번)
+new_lats = [lat for lat, _, _ in new_locations]
+new_lons = [lon for _, lon, _ in new_locations]
+original_name = store.names[lake_park]
+total_before = len(store.live())
+copies = journal.copy(lake_park, new_lons, new_lats,
+                      names=[f"{original_name} - {copy_name}" for _, _, copy_name in new_locations])
+store = journal.state()
+for i, new_lat, new_lon in zip(copies.tolist(), new_lats, new_lons):
+    print(f"✅ 추가됨: {store.names[i]} at ({new_lat:.6f}, {new_lon:.6f})")
+
+print(f"\n✅ 완료! {len(copies)}개의 건물이 추가되었습니다.")
+print(f"총 건물 수: {total_before} → {len(store.live())}")
+
+# Document 끝에 추가된 상태로 파일 저장
+if COMPACT:
+    journal.compact()
+    file_size = os.path.getsize(KML_FILE)
+    print(f"파일 크기: {file_size/1024/1024:.2f} MB")
+else:
+    print(f"⚠️  {KML_FILE} 은 바뀌지 않음 — 편집 기록에만 추가: {journal.path} "
+          f"({len(journal)}개, journal_kml.py 로 반영)")
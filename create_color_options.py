@@ -1,7 +1,8 @@
 import xml.etree.ElementTree as ET
+from kml_stream import parse_kml
 
 # 정리된 파일 로드
-tree = ET.parse('cheongna_buildings_5km_clean.kml')
+tree = parse_kml('cheongna_buildings_5km_clean.kml')
 root = tree.getroot()
 
 ns = {'kml': 'http://www.opengis.net/kml/2.2'}
@@ -17,7 +18,7 @@ print("   - 깜빡임 완전 제거")
 print("   - 3D 건물 벽면만 (색상 없음)")
 
 # 옵션 2: fill=0, outline=1, 단색 LineStyle
-tree2 = ET.parse('cheongna_buildings_5km_clean.kml')
+tree2 = parse_kml('cheongna_buildings_5km_clean.kml')
 root2 = tree2.getroot()
 
 # LineStyle만 활성화, PolyStyle은 비활성화
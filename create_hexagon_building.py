@@ -6,6 +6,11 @@ Based on floor area data from Excel
 import pandas as pd
 import math
 import xml.etree.ElementTree as ET
+from kml_journal import Journal
+from kml_styles import intern_document
+from kml_stream import parse_kml
+
+KML_FILE = 'cheongna_buildings_2.5km_perfect.kml'
 
 # Read Excel file
 excel_file = '청라_층별_넓이.xlsx'
@@ -72,17 +77,10 @@ def create_hexagon_from_area(center_lat, center_lon, area_sqm):
     
     return coords
 
-# Load existing KML
-tree = ET.parse('cheongna_buildings_2.5km_perfect.kml')
-root = tree.getroot()
-
 # Register namespace
 ET.register_namespace('', 'http://www.opengis.net/kml/2.2')
 ns = {'kml': 'http://www.opengis.net/kml/2.2'}
 
-# Find document
-document = root.find('.//kml:Document', ns)
-
 print("\n" + "=" * 80)
 print("Creating floor polygons...")
 print("=" * 80)
@@ -155,11 +153,22 @@ for floor_data in floors:
     
     print(f"  Floor {floor_num:>5}: {area:>10.2f}㎡, Height: {base_height:>6.1f}m - {top_height:>6.1f}m")
 
-# Add folder to document
-document.append(folder)
-
-# Save
-tree.write('cheongna_buildings_2.5km_perfect.kml', encoding='utf-8', xml_declaration=True)
+# The file is rewritten in place: pending journal edits are applied to it first,
+# and the journal then continues on top of the rewritten file (kml_journal)
+with Journal(KML_FILE).rewriting():
+    # Load existing KML and add folder to document
+    tree = parse_kml(KML_FILE)
+    document = tree.getroot().find('.//kml:Document', ns)
+    document.append(folder)
+
+    # Share identical inline styles (every floor, plus any left in the file) as <Style id> + styleUrl
+    style_report = intern_document(document, prefix='tower_style')
+    print(f"\nShared styles: {style_report['shared_styles']} "
+          f"({style_report['placemarks']} inline styles → styleUrl, "
+          f"~{style_report['bytes_saved']:,} bytes saved)")
+
+    # Save
+    tree.write(KML_FILE, encoding='utf-8', xml_declaration=True)
 
 print("\n" + "=" * 80)
 print("✓ Building created successfully!")
@@ -1,7 +1,8 @@
 import xml.etree.ElementTree as ET
+from kml_stream import parse_kml
 
 # 정리된 파일 로드
-tree = ET.parse('cheongna_buildings_5km_clean.kml')
+tree = parse_kml('cheongna_buildings_5km_clean.kml')
 root = tree.getroot()
 
 ns = {'kml': 'http://www.opengis.net/kml/2.2'}
@@ -1,85 +1,72 @@
-import xml.etree.ElementTree as ET
-import re
-
-# 원본 파일 분석
-tree = ET.parse('cheongna_buildings_5km.kml')
-root = tree.getroot()
+import json
+from collections import Counter
 
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+from kml_cache import load
+from kml_overlap import overlap_report
+from kml_stream import count_tags
 
-placemarks = root.findall('.//kml:Placemark', ns)
-print(f"총 건물 수: {len(placemarks)}\n")
+SOURCE_FILE = 'cheongna_buildings_5km.kml'
+REPORT_FILE = 'zfighting_report.json'
 
-# 문제 패턴 찾기
-issues = []
+# 원본 파일 분석 (바이너리 캐시 + 격자 인덱스, 샘플링 없이 전체 건물)
+store, index = load(SOURCE_FILE)
+print(f"총 건물 수: {len(store)}\n")
 
-for idx, placemark in enumerate(placemarks[:50]):  # 처음 50개 샘플
-    name_elem = placemark.find('.//kml:name', ns)
-    name = name_elem.text if name_elem is not None else f"Building_{idx}"
-    
-    # 모든 Polygon 찾기 (중복 여부 확인)
-    polygons = placemark.findall('.//kml:Polygon', ns)
-    
-    if len(polygons) > 1:
-        issues.append({
-            'name': name,
-            'type': 'multiple_polygons',
-            'count': len(polygons),
-            'detail': f'{len(polygons)}개 Polygon 중복'
-        })
-    
-    # 좌표 분석
-    for polygon in polygons:
-        coords_elem = polygon.find('.//kml:coordinates', ns)
-        if coords_elem:
-            coords_text = coords_elem.text.strip()
-            coord_points = re.split(r'\s+', coords_text)
-            coord_points = [c for c in coord_points if c.strip()]
-            
-            # 중복 좌표 확인
-            unique_coords = set(coord_points)
-            if len(coord_points) != len(unique_coords) + 1:  # +1은 시작=끝 좌표
-                issues.append({
-                    'name': name,
-                    'type': 'duplicate_coords',
-                    'detail': f'총 {len(coord_points)}개 중 중복 있음'
-                })
-            
-            # 동일 좌표 연속 확인
-            for i in range(len(coord_points) - 1):
-                if coord_points[i] == coord_points[i+1]:
-                    issues.append({
-                        'name': name,
-                        'type': 'consecutive_same',
-                        'detail': f'연속 동일 좌표: {coord_points[i]}'
-                    })
-                    break
+# bbox spatial join → 겹치는 footprint 쌍 + 건물 내부 문제
+report = overlap_report(store, index, source=SOURCE_FILE)
+summary = report['summary']
 
-print(f"발견된 문제: {len(issues)}개\n")
+print(f"bbox 가 겹치는 후보 쌍: {report['candidate_pairs']}개")
+print(f"footprint 가 겹치는 쌍: {summary['overlapping_pairs']}개")
+print(f"  거의 같은 footprint (중복 건물): {summary['identical_pairs']}개")
+print(f"  최고 높이도 같은 쌍 (z-fighting): {summary['same_top_pairs']}개\n")
 
 # 문제 유형별 통계
-from collections import Counter
-issue_types = Counter([i['type'] for i in issues])
+issue_types = Counter()
+for pair in report['pairs']:
+    if pair['same_top']:
+        issue_types['same_top_overlap'] += 1
+    if pair['identical']:
+        issue_types['identical_footprint'] += 1
+    else:
+        issue_types['overlap'] += 1
+for building in report['self_issues']:
+    if building['duplicate_coords']:
+        issue_types['duplicate_coords'] += 1
+    if building['consecutive_same']:
+        issue_types['consecutive_same'] += 1
+    if building['polygons'] > 1:
+        issue_types['multiple_polygons'] += 1
 
 print("=== 문제 유형 ===")
 for itype, count in issue_types.items():
     print(f"  {itype}: {count}개")
 
 print("\n=== 상세 (처음 10개) ===")
-for i, issue in enumerate(issues[:10]):
-    print(f"{i+1}. {issue['name']}")
-    print(f"   유형: {issue['type']}")
-    print(f"   상세: {issue['detail']}\n")
+for i, pair in enumerate(report['pairs'][:10]):
+    print(f"{i+1}. {pair['name_a']} ↔ {pair['name_b']}")
+    print(f"   겹침: {pair['overlap_m2']:.1f}㎡ (작은 건물의 {pair['overlap_ratio']*100:.0f}%, "
+          f"IoU {pair['iou']:.2f})")
+    print(f"   최고 높이: {pair['top_alt_a']}m / {pair['top_alt_b']}m"
+          f"{' ⚠️ 같은 높이' if pair['same_top'] else ''}\n")
 
-# LineString이나 MultiGeometry 확인
-linestrings = root.findall('.//kml:LineString', ns)
-multigeoms = root.findall('.//kml:MultiGeometry', ns)
+# LineString 은 건물 저장소에 없으므로 파일에서 태그 수만 셈 (파싱 없음)
+linestrings = count_tags(SOURCE_FILE, ['LineString'])['LineString']
+report['summary']['linestrings'] = linestrings
 
 print(f"=== 기하 요소 ===")
-print(f"LineString: {len(linestrings)}개")
-print(f"MultiGeometry: {len(multigeoms)}개")
+print(f"LineString: {linestrings}개")
+print(f"MultiGeometry: {summary['multi_polygon_buildings']}개")
+print(f"연속 동일 좌표가 있는 건물: {summary['consecutive_same_buildings']}개")
+print(f"중복 좌표가 있는 건물: {summary['duplicate_coords_buildings']}개")
 
-if len(linestrings) > 0:
+if linestrings > 0:
     print("⚠️ LineString이 있습니다! (선이 튀는 원인)")
-if len(multigeoms) > 0:
+if summary['same_top_pairs'] > 0:
+    print("⚠️ 같은 높이로 겹치는 건물이 있습니다! (지붕 면이 깜빡이는 원인)")
+if summary['multi_polygon_buildings'] > 0:
     print("⚠️ MultiGeometry가 있습니다! (면 중복 원인)")
+
+with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+    json.dump(report, f, ensure_ascii=False, indent=2)
+print(f"\n보고서 저장: {REPORT_FILE}")
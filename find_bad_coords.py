@@ -1,12 +1,9 @@
-import xml.etree.ElementTree as ET
-import re
+import numpy as np
 
-# KML 파일 파싱
-tree = ET.parse('cheongna_buildings_5km.kml')
-root = tree.getroot()
+from kml_stream import KmlReader
 
-# 네임스페이스
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+# KML 파일 스트리밍 (전체 DOM 을 메모리에 올리지 않음)
+reader = KmlReader('cheongna_buildings_5km.kml')
 
 # 청라 지역 대략적인 범위 (인천 청라)
 EXPECTED_LAT_MIN = 37.48
@@ -15,54 +12,42 @@ EXPECTED_LON_MIN = 126.6
 EXPECTED_LON_MAX = 126.75
 
 # 문제 좌표 찾기
-placemarks = root.findall('.//kml:Placemark', ns)
-print(f"총 Placemark 개수: {len(placemarks)}")
-print("\n=== 이상한 좌표 검색 중... ===\n")
+print("=== 이상한 좌표 검색 중... ===\n")
 
 problematic_buildings = []
 
-for idx, placemark in enumerate(placemarks):
-    name_elem = placemark.find('.//kml:name', ns)
-    name = name_elem.text if name_elem is not None else f"Building_{idx}"
+for pm in reader:
+    idx = pm.index
+    name = pm.name if pm.name is not None else f"Building_{idx}"
     
-    coords_elem = placemark.find('.//kml:coordinates', ns)
-    if coords_elem is not None:
-        coords_text = coords_elem.text.strip()
-        coord_points = [c.strip() for c in coords_text.split() if c.strip()]
-        
+    if pm.rings:
         has_problem = False
         problem_coords = []
         
-        for coord in coord_points:
-            parts = coord.split(',')
-            if len(parts) >= 2:
-                try:
-                    lon = float(parts[0])
-                    lat = float(parts[1])
-                    
-                    # 범위를 벗어나는 좌표 체크
-                    if (lat < EXPECTED_LAT_MIN or lat > EXPECTED_LAT_MAX or
-                        lon < EXPECTED_LON_MIN or lon > EXPECTED_LON_MAX):
-                        has_problem = True
-                        problem_coords.append(f"({lon}, {lat})")
-                    
-                    # 극단적인 값 체크 (지구 범위를 벗어남)
-                    if abs(lat) > 90 or abs(lon) > 180:
-                        has_problem = True
-                        problem_coords.append(f"INVALID: ({lon}, {lat})")
-                        
-                except ValueError:
-                    has_problem = True
-                    problem_coords.append(f"PARSE_ERROR: {coord}")
+        lon, lat = pm.rings[0][:, 0], pm.rings[0][:, 1]
+        # 범위를 벗어나는 좌표 / 극단적인 값 (지구 범위를 벗어남) 을 링 전체에 한 번에 체크
+        outside = ((lat < EXPECTED_LAT_MIN) | (lat > EXPECTED_LAT_MAX) |
+                   (lon < EXPECTED_LON_MIN) | (lon > EXPECTED_LON_MAX))
+        invalid = (np.abs(lat) > 90) | (np.abs(lon) > 180)
+        for i in np.flatnonzero(outside | invalid).tolist():
+            has_problem = True
+            problem_coords.append(f"({lon[i]}, {lat[i]})")
+            if invalid[i]:
+                problem_coords.append(f"INVALID: ({lon[i]}, {lat[i]})")
+        
+        for ring, position, coord in pm.errors:
+            has_problem = True
+            problem_coords.append(f"PARSE_ERROR[{ring}:{position}]: {coord}")
         
         if has_problem:
             problematic_buildings.append({
                 'name': name,
                 'index': idx,
                 'bad_coords': problem_coords,
-                'total_coords': len(coord_points)
+                'total_coords': len(pm.rings[0]) + len(pm.errors)
             })
 
+print(f"총 Placemark 개수: {reader.count}")
 print(f"발견된 문제 건물: {len(problematic_buildings)}개\n")
 
 # 처음 20개만 출력
@@ -81,4 +66,4 @@ if len(problematic_buildings) > 20:
 if problematic_buildings:
     print("=== 문제 유형 분석 ===")
     total_bad = len(problematic_buildings)
-    print(f"전체 건물 중 {total_bad}개 ({total_bad/len(placemarks)*100:.1f}%)에 문제 있음")
+    print(f"전체 건물 중 {total_bad}개 ({total_bad/reader.count*100:.1f}%)에 문제 있음")
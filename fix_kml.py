@@ -1,7 +1,8 @@
 import xml.etree.ElementTree as ET
+from kml_stream import parse_kml
 
 # KML 파일 파싱
-tree = ET.parse('cheongna_buildings_5km.kml')
+tree = parse_kml('cheongna_buildings_5km.kml')
 root = tree.getroot()
 
 # 네임스페이스
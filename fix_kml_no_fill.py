@@ -1,8 +1,9 @@
 import xml.etree.ElementTree as ET
+from kml_stream import parse_kml
 import re
 
 # 정리된 파일 로드
-tree = ET.parse('cheongna_buildings_5km_clean.kml')
+tree = parse_kml('cheongna_buildings_5km_clean.kml')
 root = tree.getroot()
 
 # 네임스페이스
@@ -33,7 +34,7 @@ tree.write(output_file, encoding='utf-8', xml_declaration=True)
 print(f"저장 완료: {output_file}")
 
 # 검증
-tree2 = ET.parse(output_file)
+tree2 = parse_kml(output_file)
 root2 = tree2.getroot()
 fill_count = 0
 for poly_style in root2.findall('.//kml:PolyStyle', ns):
@@ -0,0 +1,29 @@
+import os
+
+from kml_cache import load_store
+from kml_styles import intern_store
+
+# 인라인 <Style> 을 공유 스타일로 합칠 파일 (어떤 KML 이든)
+SOURCE_FILE = 'cheongna_buildings_2.5km_perfect.kml'
+OUTPUT_FILE = 'cheongna_buildings_2.5km_perfect_styles.kml'
+
+print("=== 인라인 스타일 → 공유 스타일 ===\n")
+
+# 원본 Placemark 그대로 보관 (스타일 부분만 바꾸고 나머지는 원본 그대로 저장)
+store = load_store(SOURCE_FILE, keep_xml=True)
+report = intern_store(store)
+
+print(f"총 건물: {len(store)}개")
+print(f"인라인 스타일 → styleUrl: {report['placemarks']}개")
+print(f"만든 공유 스타일: {report['shared_styles']}개")
+if report['skipped']:
+    print(f"건너뜀 (styleUrl 과 인라인 스타일이 함께 있음): {report['skipped']}개")
+
+store.write_raw(OUTPUT_FILE)
+
+original_size = os.path.getsize(SOURCE_FILE)
+new_size = os.path.getsize(OUTPUT_FILE)
+print(f"\n✅ 저장 완료: {OUTPUT_FILE}")
+print(f"  원본: {original_size:,} bytes")
+print(f"  변환: {new_size:,} bytes")
+print(f"  절약: {original_size - new_size:,} bytes (예상 {report['bytes_saved']:,} bytes)")
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from kml_journal import Journal
+
+# 편집 기록이 쌓인 기준 파일
+KML_FILE = 'cheongna_buildings_2.5km_perfect.kml'
+
+# 'status': 기록 보기, 'compact': 기록을 기준 파일에 반영, 'export': 어느 시점 상태를 다른 파일로 저장
+# 'reset': 기준 파일이 기록 밖에서 다시 만들어져 (기준 파일이 기록을 만든 뒤 바뀜) 열리지 않을 때
+#          쌓인 편집을 history 에 보관하고 지금 기준 파일로 기록을 새로 시작
+ACTION = 'status'
+
+# export: 이 편집 번호까지 (포함) 적용한 상태 (None 이면 현재 상태, -1 이면 첫 기준 파일)
+EXPORT_SEQ = None
+EXPORT_FILE = 'cheongna_buildings_2.5km_perfect_export.kml'
+
+journal = Journal(KML_FILE, check_base=ACTION != 'reset')
+
+print("=== 편집 기록 ===\n")
+print(f"기준 파일: {KML_FILE} (세대 {journal.generation})")
+print(f"기록: {journal.path} ({len(journal)}개 편집 대기 중)\n")
+
+for entry in journal.history():
+    when = datetime.fromtimestamp(entry['time']).strftime('%Y-%m-%d %H:%M:%S')
+    if entry['op'] == 'copy':
+        detail = f"건물 {entry['id']} → {len(entry['lons'])}곳"
+    elif entry['op'] == 'restore':
+        detail = f"{entry['source']} 에서 {len(entry['ids'])}개"
+    elif entry['op'] == 'restyle':
+        detail = f"{len(entry['ids'])}개 → {entry['style_url']}"
+    else:
+        detail = f"{len(entry['ids'])}개"
+    print(f"  #{entry['seq']:<5} {when}  {entry['op']:<8} {detail}")
+
+if ACTION == 'reset':
+    dropped = journal.reset()
+    print(f"\n✅ 편집 {dropped}개를 보관하고 기록을 새로 시작: {KML_FILE} (세대 {journal.generation})")
+elif ACTION == 'compact':
+    pending = len(journal)
+    count = journal.compact()
+    print(f"\n✅ {pending}개 편집을 기준 파일에 반영: {KML_FILE} (건물 {count}개, 세대 {journal.generation})")
+elif ACTION == 'export':
+    store = journal.state() if EXPORT_SEQ is None else journal.at(EXPORT_SEQ)
+    store.write(EXPORT_FILE)
+    label = '현재' if EXPORT_SEQ is None else f'편집 #{EXPORT_SEQ}'
+    print(f"\n✅ {label} 상태 저장: {EXPORT_FILE} (건물 {len(store.live())}개)")
@@ -0,0 +1,290 @@
+"""
+합성 데이터 벤치마크 (건물 수가 늘어날 때 어떤 작업이 먼저 느려지는지)
+- synthetic_store(n): 청라 샘플과 비슷한 건물 n 개 (중심에서 멀수록 드문 위치, 사각형 위주의
+  4~40 정점 외곽선, 2~299m 높이, 높이별 공유 스타일 building_low/medium/high)
+- 작업마다 준비 (setup) 는 측정하지 않고 본 작업만 (시간, Python 할당 최대 메모리) 측정
+  시간은 추적 없이 한 번, 메모리는 tracemalloc 으로 한 번 더 실행해서 측정 (추적 비용이 시간에 섞이지 않도록)
+- 결과는 커밋 / 시각 / 환경과 함께 JSON 하나로 저장, compare 로 두 결과 비교
+
+results = run_benchmarks([10_000, 100_000], work_dir='bench_work')
+path = save_results(results)
+"""
+import gc
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from kml_names import NameIndex
+from kml_pipeline import CleanStage, ExtrudeStage, Pipeline, SimplifyStage
+from kml_rules import evaluate
+from kml_store import BuildingStore
+from kml_verify import Count, Forbidden, Positions, SameGeometry, Select, verify
+
+# 청라시티타워 중심 좌표 (filter_radius.py)
+CENTER_LON = 126.633973
+CENTER_LAT = 37.533053
+METERS_PER_DEG = 111000.0
+
+SIZES = (10_000, 100_000, 1_000_000)
+RESULT_DIR = 'bench_results'
+
+# 샘플 파일과 같은 높이 구간 / 스타일
+STYLE_LIMITS = ((50.0, 'building_low'), (100.0, 'building_medium'), (np.inf, 'building_high'))
+_HEADER = (
+    '<Document xmlns="http://www.opengis.net/kml/2.2">'
+    '<LookAt><heading>327.04412726540033</heading><tilt>83.29890837595849</tilt>'
+    '<latitude>%(lat)s</latitude><longitude>%(lon)s</longitude>'
+    '<range>2500</range><altitude>0</altitude></LookAt>'
+    '<Style id="building_low"><LineStyle><color>ff00ff00</color><width>1</width></LineStyle>'
+    '<PolyStyle><color>ff00ff00</color><fill>1</fill><outline>1</outline></PolyStyle></Style>'
+    '<Style id="building_medium"><LineStyle><color>ff00ffff</color><width>1</width></LineStyle>'
+    '<PolyStyle><color>ff00ffff</color><fill>1</fill><outline>1</outline></PolyStyle></Style>'
+    '<Style id="building_high"><LineStyle><color>ff0000ff</color><width>1.5</width></LineStyle>'
+    '<PolyStyle><color>ff0000ff</color><fill>1</fill><outline>1</outline></PolyStyle></Style>'
+    '</Document>'
+)
+
+# name: 결과 키, setup(ctx) → run 인자 (측정 안 함), run(*args) → 측정 대상
+Operation = namedtuple('Operation', ['name', 'setup', 'run'])
+
+
+def synthetic_header(center_lon=CENTER_LON, center_lat=CENTER_LAT):
+    """샘플 파일과 같은 LookAt + 높이별 공유 스타일 header 요소"""
+    document = ET.fromstring(_HEADER % dict(lon=center_lon, lat=center_lat))
+    elems = list(document)
+    for elem in elems:
+        ET.indent(elem, space='  ', level=2)
+        elem.tail = '\n    '
+    return elems
+
+
+def synthetic_store(n, seed=0, center_lon=CENTER_LON, center_lat=CENTER_LAT, radius_km=5.0):
+    """
+    청라 샘플과 비슷한 합성 건물 n 개 → BuildingStore (모든 건물을 배열 연산으로 한 번에 생성)
+    - 위치: 중심에서 지수 분포 거리 (radius_km 안), 외곽선: 50% 회전한 사각형, 나머지는 5~39 각형
+    - 높이: 로그 정규 (중앙값 약 12m, 2~299m), 정점 높이 = 건물 높이, extrude 1
+    """
+    rng = np.random.default_rng(seed)
+    distance = np.minimum(rng.exponential(radius_km / 3, n), radius_km) * 1000
+    bearing = rng.uniform(0, 2 * np.pi, n)
+    lon_per_meter = 1.0 / (METERS_PER_DEG * np.cos(np.radians(center_lat)))
+    lat_per_meter = 1.0 / METERS_PER_DEG
+    cx = center_lon + distance * np.sin(bearing) * lon_per_meter
+    cy = center_lat + distance * np.cos(bearing) * lat_per_meter
+
+    # 꼭짓점 수 (닫는 정점 제외)
+    corners = np.where(rng.random(n) < 0.5, 4, rng.integers(5, 40, n))
+    counts = corners + 1
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    owner = np.repeat(np.arange(n), counts)
+    k = np.arange(offsets[-1]) - offsets[owner]
+    # 마지막 정점은 첫 정점 (k = corners → 각도 2π)
+    angle = 2 * np.pi * k / corners[owner] + rng.uniform(0, np.pi, n)[owner]
+    half_w = rng.uniform(5, 40, n)
+    half_h = half_w * rng.uniform(0.3, 1.0, n)
+    # 사각형은 꼭짓점이 직사각형 모서리에 오도록 반지름을 √2 배
+    scale = np.where(corners == 4, np.sqrt(2), 1.0)[owner]
+    dx = half_w[owner] * scale * np.cos(angle)
+    dy = half_h[owner] * scale * np.sin(angle)
+    lon = np.round(cx[owner] + dx * lon_per_meter, 7)
+    lat = np.round(cy[owner] + dy * lat_per_meter, 7)
+    closing = offsets[1:] - 1
+    lon[closing] = lon[offsets[:-1]]
+    lat[closing] = lat[offsets[:-1]]
+
+    height = np.round(np.clip(rng.lognormal(np.log(12.0), 1.0, n), 2, 299))
+    alt = height[owner]
+    style_index = np.searchsorted([limit for limit, _ in STYLE_LIMITS], height, side='right')
+    style_urls = np.array(['#' + style for _, style in STYLE_LIMITS], dtype=object)[style_index]
+    names = ['Building_%d (%.1fm)' % (i, h) for i, h in enumerate(height.tolist())]
+
+    return BuildingStore(
+        lon, lat, alt, offsets, np.zeros(n, dtype=bool), np.arange(n + 1),
+        names, style_urls, [None] * n, np.ones(n, dtype=np.int8),
+        ['relativeToGround'] * n, [()] * n,
+        header=synthetic_header(center_lon, center_lat),
+        document_name='합성 건물 %d개' % n,
+    )
+
+
+def synthetic_kml(path, n, seed=0, **options):
+    """합성 건물 n 개를 KML 로 저장 (샘플 파일과 같은 7자리 좌표, 높이 1자리) → 파일 크기"""
+    store = synthetic_store(n, seed, **options)
+    store.write(path, precision=7, alt_precision=1)
+    return os.path.getsize(path)
+
+
+def _copy(store):
+    # copy_and_move_building.py: 건물 하나를 여러 위치로 복사해서 문서 끝에 추가
+    i = int(np.argmax(store.top_alt))
+    lons = store.centroid_lon[i] + np.arange(1, 4) * 0.001
+    lats = np.full(3, store.centroid_lat[i])
+    return BuildingStore.concat([store, store.clone(i, lons, lats)])
+
+
+def _verify_setup(ctx):
+    # verify_kml.py 와 같은 종류의 검사: 건물 하나를 3곳에 ' - Copy k' 로 복사한 상태를 검증
+    store = ctx['store']
+    i = int(np.argmax(store.top_alt))
+    lons = store.centroid_lon[i] + np.arange(1, 4) * 0.001
+    lats = np.full(3, store.centroid_lat[i])
+    names = ['%s - Copy %d' % (store.names[i], k) for k in range(1, 4)]
+    edited = BuildingStore.concat([store, store.clone(i, lons, lats, names=names)])
+    checks = [
+        Count('copies', Select(copies=True), 3),
+        Forbidden('no_empty', Select(where=lambda s: s.vertex_count == 0)),
+        Positions('copy_positions', Select(copies=True), list(zip(lats.tolist(), lons.tolist()))),
+        SameGeometry('copy_shapes', Select(copies=True), relative=True),
+    ]
+    return edited, NameIndex.from_store(edited), checks
+
+
+# 작업이 만드는 출력 파일 이름 (keep_files=False 면 크기마다 삭제)
+_OUTPUTS = ('clean', 'optimized', 'write')
+
+
+def _output(ctx, name):
+    return os.path.join(ctx['work_dir'], 'bench_%d_%s.kml' % (ctx['buildings'], name))
+
+
+OPERATIONS = [
+    Operation('parse', lambda ctx: (ctx['source'],), BuildingStore.from_kml),
+    Operation('radius', lambda ctx: (ctx['store'],),
+              lambda store: store.within_radius(CENTER_LON, CENTER_LAT, [2.5])),
+    Operation('clean', lambda ctx: (ctx['source'], _output(ctx, 'clean')),
+              lambda source, output: Pipeline([CleanStage()]).run(source, output)),
+    Operation('optimize', lambda ctx: (ctx['source'], _output(ctx, 'optimized')),
+              lambda source, output: Pipeline([SimplifyStage(), ExtrudeStage(None)]).run(
+                  source, output, precision=6, alt_precision=1, compact=True)),
+    Operation('copy', lambda ctx: (ctx['store'],), _copy),
+    Operation('names', lambda ctx: (ctx['store'],), NameIndex.from_store),
+    Operation('validate', lambda ctx: (ctx['store'],), evaluate),
+    Operation('verify', _verify_setup, verify),
+    Operation('write', lambda ctx: (ctx['store'], _output(ctx, 'write')),
+              lambda store, output: store.write(output)),
+]
+
+
+def measure(run, args, memory=True):
+    """run(*args) → (초, Python 할당 최대 바이트 또는 None)"""
+    gc.collect()
+    start = time.perf_counter()
+    run(*args)
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return seconds, peak
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes=SIZES, operations=None, work_dir='bench_work', seed=0, memory=True,
+                   keep_files=False, progress=None):
+    """
+    크기마다 합성 KML 을 만들고 작업들을 측정 → 결과 dict (save_results 로 저장)
+    operations: 측정할 작업 이름 (None 이면 전부), progress(row): 작업 하나 끝날 때마다 호출
+    """
+    selected = [op for op in OPERATIONS if operations is None or op.name in operations]
+    os.makedirs(work_dir, exist_ok=True)
+    rows = []
+    for n in sizes:
+        source = os.path.join(work_dir, 'bench_%d.kml' % n)
+        file_size = synthetic_kml(source, n, seed)
+        ctx = dict(buildings=n, source=source, work_dir=work_dir,
+                   store=BuildingStore.from_kml(source))
+        try:
+            for op in selected:
+                seconds, peak = measure(op.run, op.setup(ctx), memory)
+                row = dict(buildings=n, operation=op.name, seconds=seconds,
+                           peak_mb=None if peak is None else peak / 1024 / 1024,
+                           file_mb=file_size / 1024 / 1024)
+                rows.append(row)
+                if progress is not None:
+                    progress(row)
+        finally:
+            if not keep_files:
+                for name in _OUTPUTS:
+                    path = _output(ctx, name)
+                    if os.path.exists(path):
+                        os.remove(path)
+                os.remove(source)
+    return {
+        'commit': _commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': rows,
+    }
+
+
+def save_results(results, directory=RESULT_DIR):
+    """결과를 directory/<시각>_<커밋 앞 8자리>.json 으로 저장 → 경로 (이미 있으면 _1, _2 …)"""
+    os.makedirs(directory, exist_ok=True)
+    stamp = results['created'].replace(':', '').replace('-', '')
+    base = os.path.join(directory, '%s_%s' % (stamp, (results['commit'] or 'nocommit')[:8]))
+    path = base + '.json'
+    # 같은 초에 저장한 결과를 덮어쓰지 않도록
+    suffix = 1
+    while os.path.exists(path):
+        path = '%s_%d.json' % (base, suffix)
+        suffix += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def latest_results(directory=RESULT_DIR, exclude=None):
+    """directory 에서 가장 최근 결과 파일 경로 (없으면 None), exclude 경로는 제외"""
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.endswith('.json'))
+    paths = [p for p in paths if exclude is None or os.path.abspath(p) != os.path.abspath(exclude)]
+    return paths[-1] if paths else None
+
+
+def compare(old, new):
+    """
+    두 결과의 같은 (건물 수, 작업) 끼리 비교 → 행 목록
+    (buildings, operation, old_seconds, new_seconds, time_ratio, old_peak_mb, new_peak_mb)
+    ratio > 1 이면 새 결과가 느림
+    """
+    before = {(r['buildings'], r['operation']): r for r in old['results']}
+    rows = []
+    for r in new['results']:
+        o = before.get((r['buildings'], r['operation']))
+        if o is None:
+            continue
+        rows.append(dict(buildings=r['buildings'], operation=r['operation'],
+                         old_seconds=o['seconds'], new_seconds=r['seconds'],
+                         time_ratio=r['seconds'] / o['seconds'] if o['seconds'] else None,
+                         old_peak_mb=o['peak_mb'], new_peak_mb=r['peak_mb']))
+    return rows
@@ -0,0 +1,362 @@
+"""
+KML 바이너리 사이드카 캐시
+- 처음 읽을 때 BuildingStore + GridIndex 를 '<파일>.bcache' 한 파일로 저장
+- 다음부터는 XML 파싱 없이 좌표 배열을 mmap 으로 바로 사용
+- 파일 크기/mtime 이 같으면 그대로 사용, 다르면 내용 해시(sha1)로 확인
+  해시까지 다르면 캐시를 자동으로 다시 만듦
+- 압축하지 않은 KML 은 Placemark 마다 원본 파일 바이트 구간도 저장
+  → placemark_bytes 로 필요한 건물만 원본에서 바로 읽음 (파일 전체 파싱 없음)
+- load_index / load_strings 는 문자열 컬럼 전체를 풀지 않고 필요한 것만 읽음
+- 건물 이름 역색인 (kml_names.NameIndex) 도 함께 저장 → load_names 는 이름 검색을 바로 시작
+
+store = load_store('cheongna_buildings_2.5km_perfect.kml')
+index = load_index('cheongna_buildings_2.5km_perfect.kml')
+names = load_strings('cheongna_buildings_5km_perfect.kml', 'names', ids)
+ids = load_names('cheongna_buildings_2.5km_perfect.kml').contains('푸르지오')
+"""
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from kml_stream import KML_NS, fragment
+from kml_store import BuildingStore, DERIVED
+from kml_index import GridIndex
+from kml_names import ARRAYS as NAME_ARRAYS, NameIndex
+from kml_profile import profiled
+
+MAGIC = b'KMLCACHE5\n'
+ALIGN = 64
+# 헤더 JSON 뒤 여유 공간 (mtime 갱신 시 헤더만 덮어쓰기 위함)
+HEADER_SLACK = 256
+
+STORE_ARRAYS = ('lon', 'lat', 'alt', 'ring_offsets', 'ring_inner', 'building_rings',
+                'extrude', 'parse_errors') + DERIVED
+STORE_STRINGS = ('names', 'style_urls', 'descriptions', 'altitude_modes', 'inline_styles')
+INDEX_ARRAYS = ('point_starts', 'point_items', 'box_starts', 'box_items')
+
+# Placemark 시작 / 끝 태그 (접두사가 붙은 태그도)
+_PLACEMARK_START = re.compile(rb'<(?:[\w.-]+:)?Placemark[\s>/]')
+_PLACEMARK_END = re.compile(rb'</(?:[\w.-]+:)?Placemark\s*>')
+_ROOT = re.compile(rb'<((?:[\w.-]+:)?kml)\b[^>]*>')
+
+
+def cache_path(path):
+    return path + '.bcache'
+
+
+def file_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def placemark_spans(path, count):
+    """
+    원본 파일에서 Placemark 마다 [시작, 끝) 바이트 위치 (count, 2)
+    압축 파일이거나 태그 수가 건물 수와 맞지 않으면 (주석 안의 태그 등) 모두 -1
+    """
+    spans = np.full((count, 2), -1, dtype=np.int64)
+    with open(path, 'rb') as f:
+        if f.read(4)[:2] in (b'\x1f\x8b', b'PK') or count == 0:
+            return spans
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            starts = np.array([m.start() for m in _PLACEMARK_START.finditer(data)], dtype=np.int64)
+            ends = np.array([m.end() for m in _PLACEMARK_END.finditer(data)], dtype=np.int64)
+    if len(starts) != count or len(ends) != count:
+        return spans
+    # 겹치거나 순서가 어긋난 구간이 있으면 사용하지 않음
+    if (ends <= starts).any() or (starts[1:] < ends[:-1]).any():
+        return spans
+    spans[:, 0] = starts
+    spans[:, 1] = ends
+    return spans
+
+
+def _encode_strings(values):
+    """문자열 컬럼 → (utf-8 blob, offsets, None 마스크)"""
+    encoded = [b'' if v is None else v.encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    is_none = np.array([v is None for v in values], dtype=bool)
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets, is_none
+
+
+def _decode_strings(blob, offsets, is_none):
+    data = blob.tobytes()
+    out = np.empty(len(is_none), dtype=object)
+    bounds = offsets.tolist()
+    for i, none in enumerate(is_none.tolist()):
+        out[i] = None if none else data[bounds[i]:bounds[i + 1]].decode('utf-8')
+    return out
+
+
+def _source_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+@profiled('cache_write')
+def write_cache(path, store, index):
+    """store/index 를 사이드카 파일로 저장 (임시 파일에 쓴 뒤 교체)"""
+    arrays = {name: getattr(store, name) for name in STORE_ARRAYS}
+    for name in INDEX_ARRAYS:
+        arrays['index_' + name] = getattr(index, name)
+    # 이름 역색인 (이름 문자열 자체는 names 컬럼을 같이 씀)
+    names = NameIndex.from_store(store)
+    for name in NAME_ARRAYS:
+        arrays['names_' + name] = getattr(names, name)
+    columns = list(STORE_STRINGS) + (['xml'] if store.xml is not None else [])
+    for name in columns:
+        blob, offsets, is_none = _encode_strings(getattr(store, name))
+        arrays[name + '_blob'] = blob
+        arrays[name + '_offsets'] = offsets
+        arrays[name + '_none'] = is_none
+
+    # Folder 는 종류가 적으므로 목록 + 건물별 번호로 저장
+    folder_list = []
+    folder_ids = {}
+    ids = np.empty(len(store), dtype=np.int32)
+    for i, folder in enumerate(store.folders):
+        folder = tuple(folder or ())
+        if folder not in folder_ids:
+            folder_ids[folder] = len(folder_list)
+            folder_list.append(list(folder))
+        ids[i] = folder_ids[folder]
+    arrays['folder_ids'] = ids
+    arrays['placemark_spans'] = placemark_spans(path, len(store))
+
+    size, mtime_ns = _source_stat(path)
+    meta = {
+        'source_size': size,
+        'source_mtime_ns': mtime_ns,
+        'source_sha1': file_hash(path),
+        'keep_xml': store.xml is not None,
+        'document_name': store.document_name,
+        'header_xml': ''.join(fragment(e) for e in store.header),
+        'folders': folder_list,
+        'index': {'origin': list(index.origin), 'cell_size': index.cell_size,
+                  'shape': list(index.shape)},
+        'arrays': {},
+    }
+    offset = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        meta['arrays'][name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+        offset += -(-arr.nbytes // ALIGN) * ALIGN
+
+    header = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    header_size = -(-(len(header) + HEADER_SLACK) // ALIGN) * ALIGN
+    data_start = -(-(len(MAGIC) + 8 + header_size) // ALIGN) * ALIGN
+
+    # 같은 캐시를 동시에 만드는 프로세스끼리 임시 파일이 겹치지 않도록 고유 이름 사용
+    cache = cache_path(path)
+    f = tempfile.NamedTemporaryFile(dir=os.path.dirname(cache) or '.',
+                                    prefix=os.path.basename(cache) + '.',
+                                    suffix='.tmp', delete=False)
+    try:
+        with f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', header_size))
+            f.write(header.ljust(header_size, b' '))
+            for name, arr in arrays.items():
+                f.seek(data_start + meta['arrays'][name]['offset'])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(f.name, cache)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+
+def _read_meta(cache_file):
+    with open(cache_file, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None, 0, 0
+        header_size, = struct.unpack('<Q', f.read(8))
+        meta = json.loads(f.read(header_size).decode('utf-8'))
+    data_start = -(-(len(MAGIC) + 8 + header_size) // ALIGN) * ALIGN
+    return meta, header_size, data_start
+
+
+def _touch_meta(cache_file, meta, header_size, size, mtime_ns):
+    """내용은 같고 mtime 만 바뀐 경우 헤더의 mtime 만 갱신"""
+    meta['source_size'] = size
+    meta['source_mtime_ns'] = mtime_ns
+    header = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    if len(header) <= header_size:
+        with open(cache_file, 'r+b') as f:
+            f.seek(len(MAGIC) + 8)
+            f.write(header.ljust(header_size, b' '))
+
+
+def _valid_meta(path, keep_xml):
+    """사용 가능한 캐시면 (meta, data_start), 아니면 None"""
+    cache_file = cache_path(path)
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        meta, header_size, data_start = _read_meta(cache_file)
+    except (OSError, ValueError, struct.error):
+        return None
+    if meta is None or (keep_xml and not meta['keep_xml']):
+        return None
+    size, mtime_ns = _source_stat(path)
+    if (size, mtime_ns) == (meta['source_size'], meta['source_mtime_ns']):
+        return meta, data_start
+    if size == meta['source_size'] and file_hash(path) == meta['source_sha1']:
+        _touch_meta(cache_file, meta, header_size, size, mtime_ns)
+        return meta, data_start
+    return None
+
+
+def _map_arrays(path, meta, data_start):
+    raw = np.memmap(cache_path(path), dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, info in meta['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape'])) if info['shape'] else 1
+        start = data_start + info['offset']
+        arr = raw[start:start + count * dtype.itemsize].view(dtype)
+        arrays[name] = arr.reshape(info['shape'])
+    return arrays
+
+
+def _mapped(path, keep_xml=False):
+    """(meta, mmap 배열 dict) — 캐시가 없거나 낡았으면 먼저 다시 만듦"""
+    valid = _valid_meta(path, keep_xml)
+    if valid is None:
+        _build(path, keep_xml)
+        valid = _valid_meta(path, keep_xml)
+    meta, data_start = valid
+    return meta, _map_arrays(path, meta, data_start)
+
+
+def _build(path, keep_xml):
+    store = BuildingStore.from_kml(path, keep_xml=keep_xml)
+    index = GridIndex.from_store(store)
+    write_cache(path, store, index)
+    return store, index
+
+
+@profiled('load', items=lambda result: len(result[0]))
+def load(path, keep_xml=False):
+    """(BuildingStore, GridIndex) — 캐시가 유효하면 mmap, 아니면 파싱 후 캐시 생성"""
+    valid = _valid_meta(path, keep_xml)
+    if valid is None:
+        return _build(path, keep_xml)
+    meta, data_start = valid
+    arrays = _map_arrays(path, meta, data_start)
+
+    strings = {}
+    columns = list(STORE_STRINGS) + (['xml'] if meta['keep_xml'] and keep_xml else [])
+    for name in columns:
+        strings[name] = _decode_strings(arrays[name + '_blob'], arrays[name + '_offsets'],
+                                        arrays[name + '_none'])
+    folder_list = [tuple(f) for f in meta['folders']]
+    folders = [folder_list[i] for i in arrays['folder_ids'].tolist()]
+    header = list(ET.fromstring('<Document xmlns="%s">%s</Document>' % (KML_NS, meta['header_xml'])))
+
+    store = BuildingStore(
+        arrays['lon'], arrays['lat'], arrays['alt'], arrays['ring_offsets'],
+        arrays['ring_inner'], arrays['building_rings'],
+        strings['names'], strings['style_urls'], strings['descriptions'],
+        arrays['extrude'], strings['altitude_modes'], folders,
+        xml=strings.get('xml'), header=header, document_name=meta['document_name'],
+        derived={key: arrays[key] for key in DERIVED},
+        inline_styles=strings['inline_styles'], parse_errors=arrays['parse_errors'],
+    )
+    info = meta['index']
+    index = GridIndex(info['origin'], info['cell_size'], info['shape'],
+                      store.centroid_lon, store.centroid_lat, store.bbox,
+                      *(arrays['index_' + name] for name in INDEX_ARRAYS))
+    return store, index
+
+
+def load_store(path, keep_xml=False):
+    return load(path, keep_xml)[0]
+
+
+def load_geometry(path):
+    """
+    좌표 / 링 / 파생 배열만 mmap 으로 연 BuildingStore (문자열 컬럼은 풀지 않고 모두 None)
+    이름 등이 필요 없는 검증 워커용
+    """
+    _, arrays = _mapped(path)
+    n = len(arrays['building_rings']) - 1
+    empty = [None] * n
+    return BuildingStore(
+        arrays['lon'], arrays['lat'], arrays['alt'], arrays['ring_offsets'],
+        arrays['ring_inner'], arrays['building_rings'],
+        empty, empty, empty, arrays['extrude'], empty, [()] * n,
+        derived={key: arrays[key] for key in DERIVED},
+        inline_styles=empty, parse_errors=arrays['parse_errors'],
+    )
+
+
+def load_index(path):
+    """GridIndex 만 (mmap 배열 위에 만들고 문자열 컬럼은 풀지 않음)"""
+    meta, arrays = _mapped(path)
+    info = meta['index']
+    return GridIndex(info['origin'], info['cell_size'], info['shape'],
+                     arrays['centroid_lon'], arrays['centroid_lat'], arrays['bbox'],
+                     *(arrays['index_' + name] for name in INDEX_ARRAYS))
+
+
+def load_names(path):
+    """NameIndex (mmap 배열 그대로, 이름은 검색 후보만 풂)"""
+    _, arrays = _mapped(path)
+    return NameIndex(arrays['names_blob'], arrays['names_offsets'], arrays['names_none'],
+                     *(arrays['names_' + name] for name in NAME_ARRAYS))
+
+
+def source_hash(path):
+    """캐시에 기록된 원본 파일 sha1 (캐시가 낡았으면 다시 만든 뒤)"""
+    return _mapped(path)[0]['source_sha1']
+
+
+def load_strings(path, column, indices):
+    """문자열 컬럼 (names, style_urls 등) 에서 indices 건물 값만 → 리스트"""
+    _, arrays = _mapped(path)
+    blob, offsets, is_none = (arrays[column + '_blob'], arrays[column + '_offsets'],
+                              arrays[column + '_none'])
+    out = []
+    for i in np.asarray(indices, dtype=np.int64).tolist():
+        out.append(None if is_none[i] else
+                   blob[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8'))
+    return out
+
+
+def placemark_bytes(path, indices):
+    """
+    indices 건물의 원본 Placemark 바이트 → (루트 <kml ...> 시작 태그, 닫는 태그, [Placemark 바이트, ...])
+    루트 태그는 조각을 다시 파싱할 때 네임스페이스 선언을 그대로 쓰기 위함
+    바이트 위치가 없는 파일 (gz / KMZ 압축) 이면 None → 호출한 쪽에서 스트리밍으로 읽음
+    """
+    _, arrays = _mapped(path)
+    spans = arrays['placemark_spans']
+    indices = np.asarray(indices, dtype=np.int64)
+    selected = spans[indices]
+    if (selected < 0).any():
+        return None
+    with open(path, 'rb') as f:
+        root = _ROOT.search(f.read(1 << 16))
+        if root is None:
+            raise ValueError('<kml> 루트 태그를 찾을 수 없음: %s' % path)
+        fragments = []
+        # 파일 순서대로 읽고 요청 순서로 돌려줌
+        for k in np.argsort(selected[:, 0], kind='stable').tolist():
+            start, end = selected[k].tolist()
+            f.seek(start)
+            fragments.append((k, f.read(end - start)))
+    fragments.sort(key=lambda item: item[0])
+    return root.group(0), b'</' + root.group(1) + b'>', [data for _, data in fragments]
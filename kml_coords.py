@@ -0,0 +1,129 @@
+"""
+<coordinates> 텍스트 벡터 파서
+- 블록 전체 (또는 여러 블록) 를 정점별 split/float 없이 한 번에 (N, 3) float64 배열로 변환
+- 'lon,lat' (높이 없음) 은 alt 0, 공백/줄바꿈/탭이 섞인 레이아웃 모두 허용
+- 형식이 잘못된 좌표는 버리고 (블록 안 위치, 원문) 으로 보고
+
+xyz, errors = parse_coords(coords_elem.text)
+xyz, offsets, errors = parse_many([e.text for e in root.iter(_K + 'coordinates')])
+"""
+import warnings
+
+import numpy as np
+
+_COMMA = ord(',')
+_SPACE = ord(' ')
+
+
+def _scan(data):
+    """utf-8 bytes → (토큰 시작 위치, 토큰 끝 위치, 토큰별 쉼표 수)"""
+    b = np.frombuffer(data, dtype=np.uint8)
+    # 공백/탭/줄바꿈 (제어 문자 포함) 여부, 양 끝은 공백으로 둠
+    space = np.ones(len(b) + 2, dtype=bool)
+    np.less_equal(b, _SPACE, out=space[1:-1])
+    edges = np.flatnonzero(space[1:] != space[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    comma_at = np.flatnonzero(b == _COMMA)
+    commas = np.searchsorted(comma_at, ends) - np.searchsorted(comma_at, starts)
+    return starts, ends, commas
+
+
+def _fast(text, commas):
+    """
+    모든 좌표가 'x,y' 또는 'x,y,z' 이고 숫자도 모두 정상이면 (n, 3) 배열, 아니면 None
+    쉼표를 공백으로 바꿔 np.fromstring 한 번으로 읽음
+    """
+    if len(commas) == 0:
+        return np.zeros((0, 3))
+    if not ((commas == 2) | (commas == 1)).all():
+        return None
+    with warnings.catch_warnings():
+        # 숫자가 아닌 값이 있으면 중간에 멈추며 경고 → 느린 경로에서 위치 보고
+        warnings.simplefilter('error')
+        try:
+            values = np.fromstring(text.replace(',', ' '), dtype=np.float64, sep=' ')
+        except (ValueError, DeprecationWarning):
+            return None
+    counts = commas + 1
+    if len(values) != counts.sum():
+        return None
+    if (commas == 2).all():
+        return values.reshape(-1, 3)
+    xyz = np.zeros((len(commas), 3))
+    rows = np.repeat(np.arange(len(commas)), counts)
+    cols = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+    xyz[rows, cols] = values
+    return xyz
+
+
+def _slow(data, starts, ends):
+    """좌표 하나씩 확인 (잘못된 좌표가 있는 블록만)"""
+    rows = []
+    errors = []
+    for position, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        token = data[start:end].decode('utf-8', 'replace')
+        parts = token.split(',')
+        try:
+            if len(parts) == 2:
+                rows.append((float(parts[0]), float(parts[1]), 0.0))
+            elif len(parts) == 3:
+                rows.append((float(parts[0]), float(parts[1]), float(parts[2])))
+            else:
+                errors.append((position, token))
+        except ValueError:
+            errors.append((position, token))
+    xyz = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return xyz, errors
+
+
+def has_altitude(text):
+    """<coordinates> 텍스트에 높이 값이 있는지 (첫 좌표가 'lon,lat' 이면 False)"""
+    tokens = text.split(None, 1)
+    return bool(tokens) and tokens[0].count(',') >= 2
+
+
+def parse_coords(text):
+    """
+    <coordinates> 텍스트 하나 → ((n, 3) 배열, [(위치, 잘못된 좌표 원문), ...])
+    위치는 블록 안에서 몇 번째 좌표인지 (0부터)
+    """
+    text = text or ''
+    data = text.encode('utf-8')
+    starts, ends, commas = _scan(data)
+    xyz = _fast(text, commas)
+    if xyz is not None:
+        return xyz, []
+    return _slow(data, starts, ends)
+
+
+def parse_many(texts):
+    """
+    여러 <coordinates> 블록을 한 번에 → (정점 (V, 3), 블록별 시작 offsets (B+1),
+    [(블록 번호, 위치, 잘못된 좌표 원문), ...])
+    블록을 이어 붙여 한 번에 읽고, 잘못된 좌표가 있을 때만 블록 단위로 다시 읽음
+    """
+    texts = ['' if t is None else t for t in texts]
+    joined = ' '.join(texts)
+    starts, ends, commas = _scan(joined.encode('utf-8'))
+
+    # 블록 경계 (이어 붙인 문자열에서 각 블록의 byte 시작 위치)
+    block_bytes = np.array([len(t.encode('utf-8')) + 1 for t in texts], dtype=np.int64)
+    block_starts = np.concatenate(([0], np.cumsum(block_bytes)[:-1]))
+    block_of_token = np.searchsorted(block_starts, starts, side='right') - 1
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(block_of_token, minlength=len(texts)), out=offsets[1:])
+
+    xyz = _fast(joined, commas)
+    if xyz is not None:
+        return xyz, offsets, []
+
+    parts = []
+    errors = []
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    for block, text in enumerate(texts):
+        block_xyz, block_errors = parse_coords(text)
+        parts.append(block_xyz)
+        offsets[block + 1] = offsets[block] + len(block_xyz)
+        errors.extend((block, position, token) for position, token in block_errors)
+    xyz = np.concatenate(parts) if parts else np.zeros((0, 3))
+    return xyz, offsets, errors
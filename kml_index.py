@@ -0,0 +1,250 @@
+"""
+건물 공간 인덱스 (균일 격자, CSR 버킷)
+- 중심점 격자: 건물마다 칸 하나 → 최근접 / 반경 / 중심점 bbox 검색
+- bbox 격자: 건물 bbox 가 걸치는 모든 칸 → bbox 교차 검색
+- 검색 한 번은 주변 몇 칸만 보므로 건물 수와 거의 무관 (전체 스캔 없음)
+- save/load 로 .npz 파일에 저장해 두고 재사용
+
+store = BuildingStore.from_kml('cheongna_buildings_2.5km_perfect.kml')
+index = GridIndex.from_store(store)
+i, dist_m = index.nearest(126.623173, 37.526670)
+"""
+import numpy as np
+
+from kml_store import haversine_km
+
+# 칸 하나에 들어갈 평균 건물 수
+TARGET_PER_CELL = 4
+METERS_PER_DEG_LAT = 111320.0
+
+
+def _csr(cell_ids, items, n_cells):
+    """(칸 번호, 건물 번호) 쌍 → 칸별 시작 위치 + 칸 순서로 정렬된 건물 번호"""
+    order = np.argsort(cell_ids, kind='stable')
+    starts = np.searchsorted(cell_ids[order], np.arange(n_cells + 1))
+    return starts.astype(np.int64), items[order].astype(np.int64)
+
+
+class GridIndex:
+    """건물 중심점 / bbox 위 균일 격자 인덱스"""
+
+    def __init__(self, origin, cell_size, shape, centroid_lon, centroid_lat, bbox,
+                 point_starts, point_items, box_starts, box_items):
+        self.origin = tuple(origin)
+        self.cell_size = float(cell_size)
+        self.shape = tuple(int(v) for v in shape)
+        self.centroid_lon = centroid_lon
+        self.centroid_lat = centroid_lat
+        self.bbox = bbox
+        self.point_starts = point_starts
+        self.point_items = point_items
+        self.box_starts = box_starts
+        self.box_items = box_items
+
+    # ------------------------------------------------------------------
+    # 생성 / 저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, centroid_lon, centroid_lat, bbox, cell_size=None):
+        centroid_lon = np.asarray(centroid_lon, dtype=np.float64)
+        centroid_lat = np.asarray(centroid_lat, dtype=np.float64)
+        bbox = np.asarray(bbox, dtype=np.float64).reshape(-1, 4)
+        valid = ~np.isnan(centroid_lon) & ~np.isnan(bbox).any(axis=1)
+
+        if valid.any():
+            min_lon = min(bbox[valid, 0].min(), centroid_lon[valid].min())
+            min_lat = min(bbox[valid, 1].min(), centroid_lat[valid].min())
+            max_lon = max(bbox[valid, 2].max(), centroid_lon[valid].max())
+            max_lat = max(bbox[valid, 3].max(), centroid_lat[valid].max())
+        else:
+            min_lon = min_lat = 0.0
+            max_lon = max_lat = 1.0
+        if cell_size is None:
+            area = max((max_lon - min_lon) * (max_lat - min_lat), 1e-12)
+            cell_size = np.sqrt(area * TARGET_PER_CELL / max(valid.sum(), 1))
+        nx = int((max_lon - min_lon) / cell_size) + 1
+        ny = int((max_lat - min_lat) / cell_size) + 1
+
+        index = cls((min_lon, min_lat), cell_size, (nx, ny), centroid_lon, centroid_lat, bbox,
+                    None, None, None, None)
+        ids = np.flatnonzero(valid)
+
+        # 중심점 격자
+        cx, cy = index._cell(centroid_lon[ids], centroid_lat[ids])
+        index.point_starts, index.point_items = _csr(cy * nx + cx, ids, nx * ny)
+
+        # bbox 격자
+        index.box_starts, index.box_items = index._box_csr(bbox[ids], ids)
+        return index
+
+    @classmethod
+    def from_store(cls, store, cell_size=None):
+        return cls.build(store.centroid_lon, store.centroid_lat, store.bbox, cell_size)
+
+    def save(self, path):
+        np.savez(path, origin=self.origin, cell_size=self.cell_size, shape=self.shape,
+                 centroid_lon=self.centroid_lon, centroid_lat=self.centroid_lat, bbox=self.bbox,
+                 point_starts=self.point_starts, point_items=self.point_items,
+                 box_starts=self.box_starts, box_items=self.box_items)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['origin'], data['cell_size'], data['shape'],
+                       data['centroid_lon'], data['centroid_lat'], data['bbox'],
+                       data['point_starts'], data['point_items'],
+                       data['box_starts'], data['box_items'])
+
+    # ------------------------------------------------------------------
+    # 내부
+    # ------------------------------------------------------------------
+    def _cell(self, lon, lat):
+        nx, ny = self.shape
+        cx = np.clip(((np.asarray(lon) - self.origin[0]) / self.cell_size).astype(np.int64), 0, nx - 1)
+        cy = np.clip(((np.asarray(lat) - self.origin[1]) / self.cell_size).astype(np.int64), 0, ny - 1)
+        return cx, cy
+
+    def _box_csr(self, boxes, ids):
+        """건물 bbox (M,4) 마다 걸치는 칸 전부를 한 번에 펼침 → (칸별 시작 위치, 건물 번호)"""
+        nx, ny = self.shape
+        x0, y0 = self._cell(boxes[:, 0], boxes[:, 1])
+        x1, y1 = self._cell(boxes[:, 2], boxes[:, 3])
+        w = x1 - x0 + 1
+        h = y1 - y0 + 1
+        counts = w * h
+        owner = np.repeat(np.arange(len(ids)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (y0[owner] + local // w[owner]) * nx + (x0[owner] + local % w[owner])
+        return _csr(cells, ids[owner], nx * ny)
+
+    def _gather(self, starts, items, x0, y0, x1, y1):
+        """칸 범위 [x0..x1] × [y0..y1] 에 든 건물 번호"""
+        nx, ny = self.shape
+        x0, x1 = max(x0, 0), min(x1, nx - 1)
+        y0, y1 = max(y0, 0), min(y1, ny - 1)
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+        chunks = [items[starts[row * nx + x0]:starts[row * nx + x1 + 1]]
+                  for row in range(y0, y1 + 1)]
+        return np.concatenate(chunks)
+
+    def _ring(self, cx, cy, r):
+        """중심 칸에서 체비셰프 거리 r 인 칸들의 건물 번호"""
+        if r == 0:
+            return self._gather(self.point_starts, self.point_items, cx, cy, cx, cy)
+        parts = [
+            self._gather(self.point_starts, self.point_items, cx - r, cy - r, cx + r, cy - r),
+            self._gather(self.point_starts, self.point_items, cx - r, cy + r, cx + r, cy + r),
+            self._gather(self.point_starts, self.point_items, cx - r, cy - r + 1, cx - r, cy + r - 1),
+            self._gather(self.point_starts, self.point_items, cx + r, cy - r + 1, cx + r, cy + r - 1),
+        ]
+        return np.concatenate(parts)
+
+    # ------------------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.centroid_lon)
+
+    def query_bbox(self, min_lon, min_lat, max_lon, max_lat, centroids=False):
+        """
+        bbox 와 겹치는 건물 번호 (정렬됨)
+        centroids=True 면 중심점이 bbox 안에 있는 건물만
+        """
+        x0, y0 = self._cell(min_lon, min_lat)
+        x1, y1 = self._cell(max_lon, max_lat)
+        if centroids:
+            cand = self._gather(self.point_starts, self.point_items, x0, y0, x1, y1)
+            lon, lat = self.centroid_lon[cand], self.centroid_lat[cand]
+            hit = (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        else:
+            cand = np.unique(self._gather(self.box_starts, self.box_items, x0, y0, x1, y1))
+            b = self.bbox[cand]
+            hit = (b[:, 0] <= max_lon) & (b[:, 2] >= min_lon) & (b[:, 1] <= max_lat) & (b[:, 3] >= min_lat)
+        return np.sort(cand[hit])
+
+    def query_radius(self, lon, lat, radius_m):
+        """중심점이 (lon, lat) 에서 radius_m 이내인 건물 번호와 거리(m), 거리순"""
+        dlat = radius_m / METERS_PER_DEG_LAT
+        dlon = radius_m / (METERS_PER_DEG_LAT * np.cos(np.radians(lat)))
+        cand = self.query_bbox(lon - dlon, lat - dlat, lon + dlon, lat + dlat, centroids=True)
+        dist = haversine_km(self.centroid_lon[cand], self.centroid_lat[cand], lon, lat) * 1000
+        keep = dist <= radius_m
+        order = np.argsort(dist[keep], kind='stable')
+        return cand[keep][order], dist[keep][order]
+
+    def nearest(self, lon, lat, k=1, max_distance_m=None):
+        """
+        중심점 기준 최근접 건물 k 개 (번호, 거리 m), 거리순
+        k=1 이면 (번호, 거리) 스칼라, 없으면 (None, None)
+        """
+        cx, cy = self._cell(lon, lat)
+        cx, cy = int(cx), int(cy)
+        # 한 칸 폭의 최소 거리 (경도 방향이 더 짧음)
+        cell_m = self.cell_size * METERS_PER_DEG_LAT * np.cos(np.radians(lat))
+        max_ring = max(self.shape)
+
+        found = []
+        best = np.zeros(0)
+        for r in range(max_ring + 1):
+            ids = self._ring(cx, cy, r)
+            if len(ids):
+                found.append(ids)
+                cand = np.concatenate(found)
+                best = np.sort(haversine_km(self.centroid_lon[cand], self.centroid_lat[cand], lon, lat))
+            # 아직 안 본 칸은 모두 r*cell_m 보다 멂 → k 번째 후보가 그보다 가까우면 종료
+            if len(best) >= k and best[k - 1] * 1000 <= r * cell_m:
+                break
+            if max_distance_m is not None and r * cell_m > max_distance_m:
+                break
+
+        if not found:
+            return (None, None) if k == 1 else (np.zeros(0, dtype=np.int64), np.zeros(0))
+        cand = np.concatenate(found)
+        dist = haversine_km(self.centroid_lon[cand], self.centroid_lat[cand], lon, lat) * 1000
+        order = np.argsort(dist, kind='stable')[:k]
+        ids, dist = cand[order], dist[order]
+        if max_distance_m is not None:
+            ids, dist = ids[dist <= max_distance_m], dist[dist <= max_distance_m]
+        if k == 1:
+            return (int(ids[0]), float(dist[0])) if len(ids) else (None, None)
+        return ids, dist
+
+    def overlapping_pairs(self, tolerance=0.0):
+        """
+        bbox 가 겹치는 모든 건물 쌍 (a < b 인 번호 배열 두 개) — 전체 데이터 spatial join
+        같은 bbox 칸에 든 건물끼리만 비교하므로 전체 쌍 O(N²) 비교 없음
+        tolerance: bbox 를 각 방향으로 넓히는 양 (도) — 넓힌 bbox 로 칸을 다시 나눠서 후보를 찾으므로
+        다른 칸에 있는 tolerance 이내 건물도 찾음 (칸 크기보다 커도 됨)
+        """
+        starts, items = self.box_starts, self.box_items
+        if tolerance > 0:
+            ids = np.flatnonzero(~np.isnan(self.centroid_lon) & ~np.isnan(self.bbox).any(axis=1))
+            grown = self.bbox[ids] + np.array([-tolerance, -tolerance, tolerance, tolerance])
+            starts, items = self._box_csr(grown, ids)
+        sizes = np.diff(starts)
+        # 칸마다 (앞 건물, 뒤 건물) 쌍을 한 번에 펼침
+        position = np.arange(len(items))
+        after = np.repeat(starts[1:], sizes) - position - 1
+        left = np.repeat(position, after)
+        right = left + 1 + (np.arange(after.sum()) - np.repeat(np.cumsum(after) - after, after))
+        a = np.minimum(items[left], items[right])
+        b = np.maximum(items[left], items[right])
+        # 여러 칸에 걸친 쌍은 한 번만
+        key = np.unique(a * len(self) + b)
+        a, b = key // len(self), key % len(self)
+
+        ba, bb = self.bbox[a], self.bbox[b]
+        hit = ((ba[:, 0] <= bb[:, 2] + tolerance) & (ba[:, 2] + tolerance >= bb[:, 0]) &
+               (ba[:, 1] <= bb[:, 3] + tolerance) & (ba[:, 3] + tolerance >= bb[:, 1]))
+        return a[hit], b[hit]
+
+    def nearest_many(self, lons, lats, max_distance_m=None):
+        """여러 위치의 최근접 건물 (번호 배열, 거리 배열), 못 찾으면 -1 / nan"""
+        ids = np.full(len(lons), -1, dtype=np.int64)
+        dist = np.full(len(lons), np.nan)
+        for j, (lon, lat) in enumerate(zip(lons, lats)):
+            i, d = self.nearest(lon, lat, max_distance_m=max_distance_m)
+            if i is not None:
+                ids[j], dist[j] = i, d
+        return ids, dist
@@ -0,0 +1,351 @@
+"""
+기준 KML 위에 쌓는 편집 기록 (append-only journal)
+- 편집 (delete / copy / move / restyle / restore) 은 '<기준 파일>.journal' (JSON Lines) 끝에 한 줄씩 추가만 함
+  → 작은 편집은 전체 파싱 / 전체 다시 쓰기 없이 한 줄 쓰기 비용
+- 현재 상태 = 캐시 (kml_cache, mmap) 로 읽은 기준 저장소 + 기록을 순서대로 적용 (replay)
+- 건물 번호: 기준 파일 순서 (0 ~ N-1), 복사 / 복원한 건물은 그 뒤에 추가된 순서대로 (삭제해도 번호는 유지)
+- restore: 다른 KML 의 건물을 원본 Placemark 바이트 구간만 읽어서 추가 (kml_restore), 원본 sha1 도 기록
+- names(): 현재 상태의 이름 역색인 (kml_names, 기준 파일 부분은 캐시에 저장된 색인)
+- compact(): 현재 상태를 새 기준 파일로 저장, 이전 기준 + 기록은 '<기준 파일>.history/' 에 세대별로 보관
+  → 모든 편집에 전체 순번 (seq) 이 있어 at(seq) 로 어느 시점 상태든 다시 만들 수 있음
+  (compact 후에는 삭제된 건물이 빠지므로 새 세대의 건물 번호는 새 기준 파일 순서)
+- rewriting(): 기준 파일을 기록 밖에서 직접 다시 쓰는 스크립트용 (쓰기 전에 compact, 쓴 뒤 새 세대)
+- reset(): rewriting() 없이 기준 파일이 바뀌어 기록이 맞지 않을 때 (ValueError) 기록을 보관하고 새로 시작
+  → Journal(base, check_base=False).reset()
+
+journal = Journal('cheongna_buildings_2.5km_perfect.kml')
+store = journal.state()
+journal.delete(journal.names().mask('푸르지오'))
+journal.copy(i, lons, lats, names)
+journal.compact()
+
+with Journal(KML_FILE).rewriting():
+    tree = parse_kml(KML_FILE)
+    ...
+    tree.write(KML_FILE)
+"""
+import contextlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from kml_cache import file_hash, load_names, load_store, source_hash
+from kml_names import NameIndex
+from kml_restore import fetch
+from kml_store import BuildingStore
+
+JOURNAL_SUFFIX = '.journal'
+HISTORY_SUFFIX = '.history'
+
+# 편집이 이만큼 쌓이면 append 할 때 자동으로 compact (None 이면 자동 compact 안 함)
+COMPACT_EVERY = 1000
+
+OPS = ('delete', 'copy', 'move', 'restyle', 'restore')
+
+
+def journal_path(base):
+    return base + JOURNAL_SUFFIX
+
+
+def history_dir(base):
+    return base + HISTORY_SUFFIX
+
+
+def _ids(indices):
+    indices = np.asarray(indices)
+    if indices.dtype == bool:
+        indices = np.flatnonzero(indices)
+    return [int(i) for i in indices.tolist()]
+
+
+def _base_stat(base):
+    st = os.stat(base)
+    return st.st_size, st.st_mtime_ns
+
+
+def _new_header(base, generation, first_seq):
+    size, mtime_ns = _base_stat(base)
+    return {'journal': 1, 'generation': generation, 'first_seq': first_seq,
+            'base_size': size, 'base_mtime_ns': mtime_ns, 'base_sha1': file_hash(base)}
+
+
+def read_journal(path):
+    """기록 파일 → (header dict, 편집 목록), 마지막 줄이 끊겨 있으면 (쓰다 중단) 그 줄은 버림"""
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().split('\n')
+    header = json.loads(lines[0])
+    entries = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            break
+    return header, entries
+
+
+def apply(store, entry):
+    """편집 하나를 저장소에 적용 → 저장소 (copy 는 새 저장소, 나머지는 제자리 수정)"""
+    op = entry['op']
+    # 빈 목록 ([]) 도 정수 번호 배열로
+    ids = np.asarray(entry.get('ids', ()), dtype=np.int64)
+    if op == 'delete':
+        store.delete(ids)
+    elif op == 'copy':
+        copies = store.clone(entry['id'], entry['lons'], entry['lats'], names=entry.get('names'))
+        store = BuildingStore.concat([store, copies])
+    elif op == 'move':
+        store.move(ids, entry['dlon'], entry['dlat'])
+    elif op == 'restyle':
+        store.style_urls[ids] = entry['style_url']
+        # 인라인 스타일이 styleUrl 보다 우선하므로 함께 제거, 원본 xml 은 다시 직렬화하도록 버림
+        store.inline_styles[ids] = None
+        if store.xml is not None:
+            store.xml[ids] = None
+    elif op == 'restore':
+        if source_hash(entry['source']) != entry['source_sha1']:
+            raise ValueError('복원 원본이 기록한 뒤 바뀜: %s' % entry['source'])
+        store = BuildingStore.concat([store, fetch(entry['source'], entry['ids'])])
+    else:
+        raise ValueError('알 수 없는 편집: %r' % (op,))
+    return store
+
+
+def replay(store, entries):
+    """
+    편집 목록을 순서대로 적용 → 저장소
+    연속된 copy 는 (복사 원본이 이미 있는 건물이면) concat 한 번으로 모아서 붙임
+    """
+    pending = []
+    for entry in entries:
+        if entry['op'] == 'copy' and entry['id'] < len(store):
+            pending.append(store.clone(entry['id'], entry['lons'], entry['lats'],
+                                       names=entry.get('names')))
+            continue
+        if pending:
+            store = BuildingStore.concat([store] + pending)
+            pending = []
+        store = apply(store, entry)
+    if pending:
+        store = BuildingStore.concat([store] + pending)
+    return store
+
+
+class Journal:
+    """
+    기준 파일 하나의 편집 기록 (없으면 첫 편집 때 만듦)
+    편집 메서드는 기록에 한 줄 추가 + (이미 불러온) 현재 상태에도 바로 적용
+    """
+
+    def __init__(self, base, compact_every=COMPACT_EVERY, check_base=True):
+        self.base = base
+        self.path = journal_path(base)
+        self.compact_every = compact_every
+        if os.path.exists(self.path):
+            self.header, self.entries = read_journal(self.path)
+            if check_base:
+                self._check_base()
+        else:
+            self.header, self.entries = None, []
+        self._state = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def generation(self):
+        return self.header['generation'] if self.header else 0
+
+    @property
+    def next_seq(self):
+        first = self.header['first_seq'] if self.header else 0
+        return first + len(self.entries)
+
+    def _check_base(self):
+        """기록을 만든 뒤 기준 파일이 (compact 가 아닌 방법으로) 바뀌었으면 ValueError"""
+        size, mtime_ns = _base_stat(self.base)
+        if (size, mtime_ns) == (self.header['base_size'], self.header['base_mtime_ns']):
+            return
+        if size != self.header['base_size'] or file_hash(self.base) != self.header['base_sha1']:
+            raise ValueError('기준 파일이 기록을 만든 뒤 바뀜: %s (기록: %s, '
+                             'Journal(base, check_base=False).reset() 으로 새로 시작)'
+                             % (self.base, self.path))
+
+    # ------------------------------------------------------------------
+    # 상태
+    # ------------------------------------------------------------------
+    def state(self):
+        """현재 상태 (기준 캐시 + 모든 편집), 한 번 만든 뒤에는 편집마다 바로 갱신"""
+        if self._state is None:
+            self._state = replay(load_store(self.base, keep_xml=True), self.entries)
+        return self._state
+
+    def names(self):
+        """
+        현재 상태의 이름 역색인 (NameIndex) — 기준 파일 부분은 캐시 것을 그대로, 복사 / 복원한 건물만 새로 색인
+        삭제된 건물도 들어 있으므로 필요하면 query(within=state().live())
+        """
+        store = self.state()
+        index = load_names(self.base)
+        if len(store) > len(index):
+            index = NameIndex.concat([index, NameIndex.build(store.names[len(index):])])
+        return index
+
+    def at(self, seq):
+        """
+        편집 seq 까지 (포함) 적용한 상태, seq=-1 이면 첫 기준 파일 그대로
+        이전 세대의 편집이면 history 에 보관한 그 세대 기준 + 기록으로 다시 만듦
+        """
+        first = self.header['first_seq'] if self.header else 0
+        if seq >= first - 1:
+            entries = [e for e in self.entries if e['seq'] <= seq]
+            return replay(load_store(self.base, keep_xml=True), entries)
+        for generation in range(self.generation - 1, -1, -1):
+            base, journal = self._archived(generation)
+            header, entries = read_journal(journal)
+            if seq >= header['first_seq'] - 1:
+                if not os.path.exists(base):
+                    raise ValueError('reset 으로 기준 파일 없이 보관된 세대의 편집: %d' % seq)
+                return replay(load_store(base, keep_xml=True),
+                              [e for e in entries if e['seq'] <= seq])
+        raise ValueError('보관된 기록에 없는 편집 번호: %d' % seq)
+
+    def history(self):
+        """보관된 세대 + 현재 세대의 모든 편집 (seq 순서)"""
+        entries = []
+        for generation in range(self.generation):
+            entries.extend(read_journal(self._archived(generation)[1])[1])
+        return entries + self.entries
+
+    def write(self, path, **options):
+        """현재 상태를 다른 파일로 저장 (기준 파일 / 기록은 그대로)"""
+        self.state().write(path, **options)
+
+    # ------------------------------------------------------------------
+    # 편집
+    # ------------------------------------------------------------------
+    def _append(self, op, **fields):
+        if self.header is None:
+            self.header = _new_header(self.base, 0, 0)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.header, ensure_ascii=False) + '\n')
+        entry = dict(seq=self.next_seq, time=time.time(), op=op, **fields)
+        # 한 줄씩 추가만 함 (기존 기록은 다시 쓰지 않음)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.entries.append(entry)
+        if self._state is not None:
+            self._state = apply(self._state, entry)
+        if self.compact_every is not None and len(self.entries) >= self.compact_every:
+            self.compact()
+        return entry
+
+    def delete(self, indices):
+        """건물 삭제 → 새로 삭제된 건물 수"""
+        ids = _ids(indices)
+        before = int(self.state().deleted.sum())
+        self._append('delete', ids=ids)
+        return int(self.state().deleted.sum()) - before
+
+    def copy(self, i, lons, lats, names=None):
+        """건물 i 를 (lons[k], lats[k]) 마다 복사 → 복사본 건물 번호"""
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64)).tolist()
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64)).tolist()
+        start = len(self.state())
+        self._append('copy', id=int(i), lons=lons, lats=lats,
+                     names=None if names is None else [str(n) for n in names])
+        return np.arange(start, start + len(lons))
+
+    def move(self, indices, dlon, dlat):
+        """건물 평행이동 (dlon / dlat 은 하나 또는 건물별 값)"""
+        ids = _ids(indices)
+        dlon = np.broadcast_to(np.asarray(dlon, dtype=np.float64), (len(ids),)).tolist()
+        dlat = np.broadcast_to(np.asarray(dlat, dtype=np.float64), (len(ids),)).tolist()
+        self._append('move', ids=ids, dlon=dlon, dlat=dlat)
+
+    def restyle(self, indices, style_url):
+        """건물 styleUrl 변경 (인라인 스타일은 제거)"""
+        self._append('restyle', ids=_ids(indices), style_url=style_url)
+
+    def restore(self, source, indices):
+        """다른 KML (source) 의 건물 indices 를 끝에 추가 → 추가된 건물 번호"""
+        ids = _ids(indices)
+        start = len(self.state())
+        if not ids:
+            return np.arange(start, start)
+        self._append('restore', source=source, source_sha1=source_hash(source), ids=ids)
+        return np.arange(start, start + len(ids))
+
+    # ------------------------------------------------------------------
+    # compact
+    # ------------------------------------------------------------------
+    def _archived(self, generation):
+        directory = history_dir(self.base)
+        ext = os.path.splitext(self.base)[1]
+        return (os.path.join(directory, '%04d%s' % (generation, ext)),
+                os.path.join(directory, '%04d%s' % (generation, JOURNAL_SUFFIX)))
+
+    def compact(self, **options):
+        """
+        현재 상태를 기준 파일로 저장하고 기록을 비움 → 저장한 건물 수
+        이전 기준 파일과 기록은 history 디렉터리에 세대 번호로 보관 (at() 으로 재현 가능)
+        options 는 KmlWriter 로 (precision 등, 기본은 원본 Placemark 그대로)
+        """
+        if not self.entries:
+            return len(self.state().live())
+        store = self.state()
+        tmp = self.base + '.tmp' + os.path.splitext(self.base)[1]
+        store.write(tmp, **options)
+
+        os.makedirs(history_dir(self.base), exist_ok=True)
+        archived_base, archived_journal = self._archived(self.generation)
+        shutil.copy2(self.base, archived_base)
+        os.replace(self.path, archived_journal)
+        os.replace(tmp, self.base)
+        self._next_generation()
+        return len(store.live())
+
+    def _next_generation(self):
+        self.header = _new_header(self.base, self.generation + 1, self.next_seq)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.header, ensure_ascii=False) + '\n')
+        self.entries = []
+        # 삭제된 건물이 빠지고 번호가 바뀌므로 새 기준 파일에서 다시 읽음
+        self._state = None
+
+    def reset(self):
+        """
+        쌓인 편집을 버리고 지금 기준 파일로 새 세대 시작 → 버린 편집 수
+        기준 파일을 rewriting() 없이 다시 만들어 기록이 맞지 않을 때 복구용 (check_base=False 로 열기)
+        버린 기록은 history 에 보관하지만 그 세대 기준 파일은 이미 없으므로 at() 으로 재현할 수 없음
+        """
+        if self.header is None:
+            return 0
+        dropped = len(self.entries)
+        os.makedirs(history_dir(self.base), exist_ok=True)
+        os.replace(self.path, self._archived(self.generation)[1])
+        self._next_generation()
+        return dropped
+
+    @contextlib.contextmanager
+    def rewriting(self):
+        """
+        with 블록 안에서 기준 파일을 직접 다시 써도 기록이 깨지지 않게 함
+        들어갈 때 쌓인 편집을 compact 해서 기준 파일에 반영 (블록 안에서 읽는 파일이 현재 상태),
+        나올 때 다시 쓴 파일을 새 세대 기준으로 기록 (이전 기준은 history 에 보관, at() 으로 재현 가능)
+        기록이 없던 파일은 아무것도 하지 않음
+        """
+        if self.header is None:
+            yield
+            return
+        self.compact()
+        os.makedirs(history_dir(self.base), exist_ok=True)
+        archived_base, archived_journal = self._archived(self.generation)
+        shutil.copy2(self.base, archived_base)
+        yield
+        os.replace(self.path, archived_journal)
+        self._next_generation()
@@ -0,0 +1,55 @@
+"""
+건물 복사 위치 생성기 (BuildingStore.clone 에 그대로 전달)
+- grid_positions: 기준점 주변 rows × cols 격자 (간격 m, 회전 각도)
+- path_positions: 경로 (꺾은선) 를 따라 일정 간격 m 마다
+
+lons, lats = grid_positions(126.637, 37.535, rows=2, cols=4, spacing_m=80)
+copies = store.clone(i, lons, lats)
+"""
+import numpy as np
+
+from kml_index import METERS_PER_DEG_LAT
+
+
+def _meters_per_deg_lon(lat):
+    return METERS_PER_DEG_LAT * np.cos(np.radians(lat))
+
+
+def grid_positions(center_lon, center_lat, rows, cols, spacing_m, spacing_y_m=None,
+                   angle_deg=0.0):
+    """
+    (center_lon, center_lat) 를 중심으로 한 rows × cols 격자 위치 (lons, lats), 행 우선 순서
+    spacing_m: 열 간격 (동서), spacing_y_m: 행 간격 (남북, 없으면 spacing_m)
+    angle_deg: 격자를 반시계 방향으로 회전
+    """
+    if spacing_y_m is None:
+        spacing_y_m = spacing_m
+    x = (np.arange(cols) - (cols - 1) / 2) * spacing_m
+    y = (np.arange(rows) - (rows - 1) / 2) * spacing_y_m
+    xx, yy = np.meshgrid(x, y)
+    angle = np.radians(angle_deg)
+    east = xx * np.cos(angle) - yy * np.sin(angle)
+    north = xx * np.sin(angle) + yy * np.cos(angle)
+    lons = center_lon + east.ravel() / _meters_per_deg_lon(center_lat)
+    lats = center_lat + north.ravel() / METERS_PER_DEG_LAT
+    return lons, lats
+
+
+def path_positions(path, spacing_m, include_end=False):
+    """
+    path: [(lon, lat), ...] 꺾은선을 따라 시작점부터 spacing_m 마다 위치 (lons, lats)
+    include_end=True 면 마지막 점도 포함 (간격이 맞지 않아도)
+    """
+    path = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+    lat0 = path[:, 1].mean()
+    # 경로 근처에서는 평면 근사 (m 단위)
+    xy = np.column_stack([path[:, 0] * _meters_per_deg_lon(lat0),
+                          path[:, 1] * METERS_PER_DEG_LAT])
+    segment = np.hypot(*np.diff(xy, axis=0).T)
+    along = np.concatenate(([0.0], np.cumsum(segment)))
+    stations = np.arange(0.0, along[-1] + 1e-9, spacing_m)
+    if include_end and (len(stations) == 0 or along[-1] - stations[-1] > 1e-6):
+        stations = np.append(stations, along[-1])
+    lons = np.interp(stations, along, path[:, 0])
+    lats = np.interp(stations, along, path[:, 1])
+    return lons, lats
@@ -0,0 +1,312 @@
+"""
+건물 이름 역색인 (문자 2-gram inverted index) + 이름에서 읽은 메타데이터
+- 이름마다 연속한 두 글자 (2-gram) → 그 2-gram 이 들어간 건물 번호 목록 (CSR, 번호 오름차순)
+  '푸르지오' 검색 = '푸르' / '르지' / '지오' 목록의 교집합 → 후보 이름만 실제 부분 문자열 확인
+  → 전체 이름을 훑지 않음 (한 글자 / 두 글자 검색은 목록 자체가 정답)
+- 높이: 이름 끝의 '(12.0m)' (복사본이면 원본 이름 부분의 높이), 없으면 nan
+- 복사 계보: '원본 이름 - 표시' 형태 (원본 이름이 높이로 끝나거나, 표시에 'Copy' 가 있거나, 원본도 복사본)
+  → copy_of() 로 원본 건물 번호, root_of() 로 맨 처음 원본
+- 캐시 (kml_cache) 에 함께 저장되므로 load_names(path) 는 파싱 / 색인 없이 mmap 으로 바로 사용
+- query() 는 이름 조건 + 높이 + 복사 여부 + 후보 번호 (GridIndex 반경 검색 결과 등) 를 한 번에 결합
+
+names = load_names('cheongna_buildings_2.5km_perfect.kml')
+ids = names.contains('푸르지오')
+ids = names.query('청라푸르지오라피아노', any_of=('1단지', '2단지'), copies=False,
+                  within=index.query_radius(lon, lat, 2500)[0])
+ids = names.query(min_height=100)
+"""
+import hashlib
+import re
+
+import numpy as np
+
+from kml_profile import stage
+
+# 2-gram 키 = (앞 글자 코드 << 21) | 뒤 글자 코드 (유니코드 코드 포인트는 21비트 이내)
+CODE_BITS = 21
+
+# 이름 끝의 높이 '(12.0m)' / '(192m)'
+_HEIGHT = re.compile(r'\((\d+(?:\.\d+)?)\s*m\)\s*$')
+COPY_SEPARATOR = ' - '
+
+# 확인할 후보가 이보다 많으면 이름 blob 전체를 한 번 복사해서 위치 범위로 검색
+VERIFY_SLICE_LIMIT = 4096
+
+ARRAYS = ('gram_keys', 'gram_starts', 'gram_items', 'height', 'name_hash', 'parent_hash')
+
+
+def split_copy(name):
+    """
+    복사본 이름 → (원본 이름, 복사 표시), 복사본이 아니면 (name, None)
+    '청라더샵레이크파크 (192m) - Copy 1' → ('청라더샵레이크파크 (192m)', 'Copy 1')
+    '청라 신축 타워 - 1층 (10002.1㎡)' 처럼 ' - ' 앞이 높이로 끝나지 않는 이름은 복사본 아님
+    """
+    parent, sep, label = name.rpartition(COPY_SEPARATOR)
+    if not sep:
+        return name, None
+    if _HEIGHT.search(parent) or 'copy' in label.lower() or split_copy(parent)[1] is not None:
+        return parent, label
+    return name, None
+
+
+def parse_name(name):
+    """이름 → (원본 이름 또는 None, 높이 m 또는 nan)"""
+    if name is None:
+        return None, np.nan
+    if COPY_SEPARATOR not in name:
+        height = _HEIGHT.search(name)
+        return None, (float(height.group(1)) if height else np.nan)
+    parent, label = split_copy(name)
+    root, rest = parent, label
+    while rest is not None:
+        root, rest = split_copy(root)
+    height = _HEIGHT.search(root)
+    return (parent if label is not None else None), (float(height.group(1)) if height else np.nan)
+
+
+def name_hash(name):
+    """이름 → 0 이 아닌 64비트 해시 (None 은 0)"""
+    if name is None:
+        return 0
+    digest = hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+def _encode(names):
+    """이름 목록 → (utf-8 blob, offsets, None 마스크) — kml_cache 의 문자열 컬럼과 같은 형식"""
+    encoded = [b'' if n is None else n.encode('utf-8') for n in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    is_none = np.array([n is None for n in names], dtype=bool)
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets, is_none
+
+
+def _postings(keys, items):
+    """(2-gram 키, 건물 번호) 쌍 → 중복 없는 (키 목록, 시작 위치, 키 순서 / 번호 순서 건물 번호)"""
+    # 같은 키 안에서는 들어온 순서 (건물 번호 오름차순) 유지
+    order = np.argsort(keys, kind='stable')
+    keys, items = keys[order], items[order]
+    if len(keys):
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = (keys[1:] != keys[:-1]) | (items[1:] != items[:-1])
+        keys, items = keys[first], items[first]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, int)
+    return (keys[starts].astype(np.int64), np.append(starts, len(keys)).astype(np.int64),
+            items.astype(np.int64))
+
+
+def _gram_pairs(names):
+    """이름 목록 → 모든 (2-gram 키, 건물 번호) 쌍 (한 번의 배열 연산)"""
+    names = ['' if n is None else n for n in names]
+    lengths = np.array([len(n) for n in names], dtype=np.int64)
+    # 이름 사이를 '\0' 으로 이어 붙임 → 이름의 마지막 글자도 (글자, '\0') 2-gram 을 가짐
+    codes = np.frombuffer(('\0'.join(names) + '\0').encode('utf-32-le'),
+                          dtype=np.uint32).astype(np.int64)
+    owner = np.repeat(np.arange(len(names), dtype=np.int64), lengths + 1)
+    valid = codes[:-1] != 0
+    keys = (codes[:-1] << CODE_BITS) | codes[1:]
+    return keys[valid], owner[:-1][valid]
+
+
+class NameIndex:
+    """건물 이름 2-gram 역색인 + 높이 / 복사 계보 (건물 번호는 저장소 순서)"""
+
+    def __init__(self, name_blob, name_offsets, name_none, gram_keys, gram_starts, gram_items,
+                 height, name_hash, parent_hash):
+        self.name_blob = name_blob
+        self.name_offsets = name_offsets
+        self.name_none = name_none
+        self.gram_keys = gram_keys
+        self.gram_starts = gram_starts
+        self.gram_items = gram_items
+        self.height = height
+        self.name_hash = name_hash
+        self.parent_hash = parent_hash
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, names):
+        names = list(names)
+        with stage('name_index', items=len(names)):
+            blob, offsets, is_none = _encode(names)
+            gram_keys, gram_starts, gram_items = _postings(*_gram_pairs(names))
+            parsed = [parse_name(n) for n in names]
+            height = np.array([h for _, h in parsed], dtype=np.float64).reshape(-1)
+            hashes = np.fromiter((name_hash(n) for n in names), dtype=np.uint64, count=len(names))
+            parents = np.fromiter((name_hash(p) for p, _ in parsed), dtype=np.uint64,
+                                  count=len(names))
+        return cls(blob, offsets, is_none, gram_keys, gram_starts, gram_items,
+                   height, hashes, parents)
+
+    @classmethod
+    def from_store(cls, store):
+        return cls.build(store.names)
+
+    @classmethod
+    def concat(cls, indexes):
+        """여러 색인을 이어 붙인 새 색인 (두 번째부터는 건물 번호를 앞 색인 길이만큼 밀어서)"""
+        indexes = list(indexes)
+        bases = np.cumsum([0] + [len(ix) for ix in indexes[:-1]])
+        blob_bases = np.cumsum([0] + [len(ix.name_blob) for ix in indexes[:-1]])
+        keys = np.concatenate([np.repeat(ix.gram_keys, np.diff(ix.gram_starts))
+                               for ix in indexes])
+        items = np.concatenate([ix.gram_items + base for ix, base in zip(indexes, bases)])
+        gram_keys, gram_starts, gram_items = _postings(keys, items)
+
+        def column(name):
+            return np.concatenate([getattr(ix, name) for ix in indexes])
+
+        return cls(column('name_blob'),
+                   np.concatenate([[0]] + [ix.name_offsets[1:] + base
+                                           for ix, base in zip(indexes, blob_bases)]),
+                   column('name_none'), gram_keys, gram_starts, gram_items,
+                   column('height'), column('name_hash'), column('parent_hash'))
+
+    def __len__(self):
+        return len(self.name_none)
+
+    # ------------------------------------------------------------------
+    # 이름
+    # ------------------------------------------------------------------
+    def _bytes(self, i):
+        return self.name_blob[self.name_offsets[i]:self.name_offsets[i + 1]].tobytes()
+
+    def name(self, i):
+        return None if self.name_none[i] else self._bytes(i).decode('utf-8')
+
+    def names(self, ids):
+        return [self.name(i) for i in np.asarray(ids, dtype=np.int64).tolist()]
+
+    # ------------------------------------------------------------------
+    # 이름 검색
+    # ------------------------------------------------------------------
+    def _gram(self, key):
+        k = np.searchsorted(self.gram_keys, key)
+        if k == len(self.gram_keys) or self.gram_keys[k] != key:
+            return np.empty(0, dtype=np.int64)
+        return self.gram_items[self.gram_starts[k]:self.gram_starts[k + 1]]
+
+    def contains(self, term):
+        """이름에 term 이 들어간 건물 번호 (오름차순)"""
+        if not term:
+            return np.flatnonzero(~np.asarray(self.name_none))
+        codes = [ord(c) for c in term]
+        if len(codes) == 1:
+            # 글자 c 로 시작하는 모든 2-gram 의 합집합 (이름 끝 글자는 (c, '\0'))
+            lo, hi = np.searchsorted(self.gram_keys, [codes[0] << CODE_BITS,
+                                                      (codes[0] + 1) << CODE_BITS])
+            return np.unique(self.gram_items[self.gram_starts[lo]:self.gram_starts[hi]])
+        keys = sorted({(a << CODE_BITS) | b for a, b in zip(codes, codes[1:])})
+        postings = sorted((self._gram(key) for key in keys), key=len)
+        ids = postings[0]
+        for posting in postings[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, posting, assume_unique=True)
+        if len(codes) == 2 or not len(ids):
+            return np.asarray(ids, dtype=np.int64)
+        # 2-gram 이 모두 있어도 연속하지 않을 수 있으므로 후보만 실제 확인
+        needle = term.encode('utf-8')
+        if len(ids) < VERIFY_SLICE_LIMIT:
+            found = (needle in self._bytes(i) for i in ids.tolist())
+        else:
+            data = self.name_blob.tobytes()
+            found = (data.find(needle, start, end) >= 0 for start, end in
+                     zip(self.name_offsets[ids].tolist(), self.name_offsets[ids + 1].tolist()))
+        return ids[np.fromiter(found, dtype=bool, count=len(ids))]
+
+    def mask(self, term, exclude=None):
+        """BuildingStore.name_mask 와 같은 결과 (이름에 term 이 있고 exclude 는 없는 건물)"""
+        out = np.zeros(len(self), dtype=bool)
+        out[self.contains(term)] = True
+        if exclude is not None:
+            out[self.contains(exclude)] = False
+        return out
+
+    # ------------------------------------------------------------------
+    # 복사 계보
+    # ------------------------------------------------------------------
+    @property
+    def is_copy(self):
+        return self.parent_hash != 0
+
+    def copy_of(self):
+        """
+        건물마다 복사 원본 건물 번호, 복사본이 아니거나 원본이 없으면 -1
+        원본 이름인 건물이 여럿이면 저장소에서 처음 나오는 것
+        """
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        order = np.argsort(self.name_hash, kind='stable')
+        sorted_hash = self.name_hash[order]
+        pos = np.minimum(np.searchsorted(sorted_hash, self.parent_hash), len(self) - 1)
+        found = self.is_copy & (sorted_hash[pos] == self.parent_hash)
+        return np.where(found, order[pos], -1).astype(np.int64)
+
+    def root_of(self):
+        """건물마다 계보의 맨 처음 원본 번호 (복사본이 아니거나 원본이 없으면 자기 자신)"""
+        parent = self.copy_of()
+        root = np.arange(len(self), dtype=np.int64)
+        # 복사의 복사 깊이만큼만 반복 (순환 계보는 깊이 len 에서 멈춤)
+        for _ in range(len(self)):
+            up = parent[root]
+            step = up >= 0
+            if not step.any():
+                break
+            root = np.where(step, up, root)
+        return root
+
+    def copies_of(self, i, recursive=True):
+        """건물 i 의 복사본 번호 (recursive 면 복사본의 복사본까지)"""
+        if recursive:
+            roots = self.root_of()
+            return np.flatnonzero((roots == roots[i]) & (np.arange(len(self)) != i))
+        return np.flatnonzero(self.copy_of() == i)
+
+    # ------------------------------------------------------------------
+    # 결합 검색
+    # ------------------------------------------------------------------
+    def query(self, *terms, any_of=(), exclude=(), copies=None, min_height=None,
+              max_height=None, within=None):
+        """
+        조건을 모두 만족하는 건물 번호 (오름차순)
+        - terms: 이름에 모두 들어가야 하는 문자열, any_of: 하나 이상 들어가야 하는 문자열
+        - exclude: 하나라도 들어가면 제외 (문자열 하나 또는 목록)
+        - copies: True 면 복사본만, False 면 원본만
+        - min_height / max_height: 이름의 높이 범위 (높이 없는 이름은 제외)
+        - within: 후보 건물 번호나 bool 마스크 (GridIndex 반경 / bbox 검색 결과, store.live() 등)
+        이름 조건 목록을 먼저 교집합하고 나머지 조건은 남은 후보에만 적용
+        """
+        ids = None
+        for term in terms:
+            found = self.contains(term)
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        if any_of:
+            found = np.unique(np.concatenate([self.contains(term) for term in any_of]))
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        if within is not None:
+            within = np.asarray(within)
+            if within.dtype != bool:
+                mask = np.zeros(len(self), dtype=bool)
+                mask[within] = True
+                within = mask
+            ids = np.flatnonzero(within) if ids is None else ids[within[ids]]
+        if ids is None:
+            ids = np.arange(len(self), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+
+        keep = np.ones(len(ids), dtype=bool)
+        if min_height is not None:
+            keep &= self.height[ids] >= min_height
+        if max_height is not None:
+            keep &= self.height[ids] <= max_height
+        if copies is not None:
+            keep &= self.is_copy[ids] == bool(copies)
+        ids = ids[keep]
+
+        for term in ([exclude] if isinstance(exclude, str) else exclude):
+            if len(ids):
+                ids = np.setdiff1d(ids, self.contains(term), assume_unique=True)
+        return ids
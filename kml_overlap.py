@@ -0,0 +1,308 @@
+"""
+건물 겹침 / z-fighting 검출 (전체 데이터)
+- GridIndex.overlapping_pairs 로 bbox 가 겹치는 후보 쌍만 추림 (spatial join)
+- 후보 쌍마다 겹친 면적을 정확히 계산: 서로의 안에 든 변 조각들로 겹친 영역 경계를 만들어 shoelace
+  (교차점 / 점-다각형 판정은 쌍 여러 개의 (변, 변) 조합을 묶어서 한 번에)
+- 최고 높이가 같은 (동일 평면 지붕) 겹침은 Google Earth 깜빡임 원인 → same_top 으로 표시
+- 건물 내부 문제 (연속 / 떨어진 중복 정점, 여러 Polygon) 도 전체 건물에 대해 벡터 연산으로 확인
+
+store, index = load('cheongna_buildings_5km.kml')
+report = overlap_report(store, index)
+"""
+import numpy as np
+
+from kml_index import METERS_PER_DEG_LAT
+from kml_store import _ranges
+
+# 쌍 묶음 하나에서 만드는 (변, 변) 조합 수 상한
+CHUNK_CELLS = 4_000_000
+# 변 조각 중점이 상대 다각형 변에서 이 거리 (m) 이내면 경계 위로 봄
+BOUNDARY_M = 1e-6
+
+
+def _next_vertex(store):
+    """정점마다 같은 링의 다음 정점 번호 (마지막 정점은 링 처음으로)"""
+    nxt = np.arange(1, len(store.lon) + 1)
+    ring_end = store.ring_offsets[1:]
+    ring_start = store.ring_offsets[:-1]
+    nonempty = ring_end > ring_start
+    nxt[ring_end[nonempty] - 1] = ring_start[nonempty]
+    return nxt
+
+
+def footprint_areas(store):
+    """건물별 외곽선 (첫 링) 면적 m² — 건물 중심 위도 기준 평면 근사, shoelace 공식"""
+    nxt = _next_vertex(store)
+    first_ring = np.minimum(store.building_rings[:-1], max(len(store.ring_inner) - 1, 0))
+    areas = np.zeros(len(store))
+    if not len(store.ring_inner):
+        return areas
+    start = store.ring_offsets[first_ring]
+    end = np.where(store.vertex_count > 0, store.ring_offsets[first_ring + 1], start)
+    # 큰 경위도 값끼리 곱할 때의 정밀도 손실을 피하려고 기준점을 빼고 계산
+    x = store.lon - np.nanmean(store.centroid_lon)
+    y = store.lat - np.nanmean(store.centroid_lat)
+    cross = x * y[nxt] - x[nxt] * y
+    counts = end - start
+    owner = np.repeat(np.arange(len(store)), counts)
+    sums = np.bincount(owner, weights=cross[_ranges(start, end)], minlength=len(store))
+    scale = METERS_PER_DEG_LAT ** 2 * np.cos(np.radians(np.nan_to_num(store.centroid_lat)))
+    return np.abs(sums) / 2 * scale
+
+
+def _flipped_rings(store):
+    """
+    정점마다 그 링의 변 방향을 뒤집어야 하는지 (외곽선은 반시계, 구멍은 시계 방향으로 맞춤)
+    링 첫 정점 기준 shoelace 부호로 판정
+    """
+    n_rings = len(store.ring_inner)
+    ring = np.repeat(np.arange(n_rings), np.diff(store.ring_offsets))
+    if not len(ring):
+        return np.zeros(0, dtype=bool)
+    nxt = _next_vertex(store)
+    origin = store.ring_offsets[ring]
+    x, y = store.lon - store.lon[origin], store.lat - store.lat[origin]
+    signed = np.bincount(ring, weights=x * y[nxt] - x[nxt] * y, minlength=n_rings)
+    flip = np.where(store.ring_inner, signed > 0, signed < 0)
+    return flip[ring]
+
+
+def _edges(store, nxt, flip, buildings, origin_lon, origin_lat, cos_lat):
+    """
+    쌍 k 의 건물 buildings[k] 의 모든 변 → (쌍별 변 시작 위치, 쌍별 변 수, 쌍 번호, x0, y0, x1, y1)
+    좌표는 쌍마다 원점 기준 평면 근사 (m), 변 방향은 _flipped_rings 로 맞춤
+    """
+    v_start, v_end = store.vertex_bounds()
+    counts = v_end[buildings] - v_start[buildings]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    edges = _ranges(v_start[buildings], v_end[buildings])
+    owner = np.repeat(np.arange(len(buildings)), counts)
+    i0 = np.where(flip[edges], nxt[edges], edges)
+    i1 = np.where(flip[edges], edges, nxt[edges])
+    kx = METERS_PER_DEG_LAT * cos_lat[owner]
+    x0 = (store.lon[i0] - origin_lon[owner]) * kx
+    x1 = (store.lon[i1] - origin_lon[owner]) * kx
+    y0 = (store.lat[i0] - origin_lat[owner]) * METERS_PER_DEG_LAT
+    y1 = (store.lat[i1] - origin_lat[owner]) * METERS_PER_DEG_LAT
+    return starts, counts, owner, x0, y0, x1, y1
+
+
+def _combos(count_p, count_q, start_p, start_q):
+    """쌍마다 (p 항목, q 항목) 모든 조합 → (쌍 번호, p 번호, q 번호) 평평한 배열"""
+    sizes = count_p * count_q
+    pair = np.repeat(np.arange(len(sizes)), sizes)
+    local = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    q = count_q[pair]
+    return pair, start_p[pair] + local // q, start_q[pair] + local % q
+
+
+def _clipped_boundary(p, q, keep_shared):
+    """
+    p 의 변을 q 의 변과 만나는 점에서 나눈 조각 중 q 안에 든 것의 shoelace 합 (쌍별, m²)
+    q 경계 위에 놓인 조각은 방향이 같고 keep_shared 일 때만 포함 (두 번 세지 않도록)
+    """
+    p_start, p_count, p_owner, px0, py0, px1, py1 = p
+    q_start, q_count, _, qx0, qy0, qx1, qy1 = q
+    n_pairs = len(p_count)
+
+    # 1. p 의 변마다 q 의 변과 만나는 위치 t (0 < t < 1)
+    _, i, j = _combos(p_count, q_count, p_start, q_start)
+    rx, ry = px1[i] - px0[i], py1[i] - py0[i]
+    sx, sy = qx1[j] - qx0[j], qy1[j] - qy0[j]
+    wx, wy = qx0[j] - px0[i], qy0[j] - py0[i]
+    denom = rx * sy - ry * sx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (wx * sy - wy * sx) / denom
+        u = (wx * ry - wy * rx) / denom
+    cross = (denom != 0) & (t > 0) & (t < 1) & (u >= 0) & (u <= 1)
+    split_edge, split_t = [i[cross]], [t[cross]]
+    # 같은 직선 위에 겹쳐 놓인 변은 q 변의 끝점에서 나눔
+    rr = rx * rx + ry * ry
+    collinear = (denom == 0) & (wx * ry - wy * rx == 0) & (rr > 0)
+    safe = np.where(collinear, rr, 1.0)
+    for ex, ey in ((qx0[j], qy0[j]), (qx1[j], qy1[j])):
+        at = ((ex - px0[i]) * rx + (ey - py0[i]) * ry) / safe
+        hit = collinear & (at > 0) & (at < 1)
+        split_edge.append(i[hit])
+        split_t.append(at[hit])
+
+    # 2. 변마다 0, 나눈 위치들, 1 을 정렬해서 조각 (길이 0 조각은 버림)
+    all_edges = np.arange(len(px0))
+    e = np.concatenate([all_edges, all_edges] + split_edge)
+    tv = np.concatenate([np.zeros(len(px0)), np.ones(len(px0))] + split_t)
+    order = np.lexsort((tv, e))
+    e, tv = e[order], tv[order]
+    piece = (e[1:] == e[:-1]) & (tv[1:] > tv[:-1])
+    pe, t0, t1 = e[:-1][piece], tv[:-1][piece], tv[1:][piece]
+    dx, dy = px1[pe] - px0[pe], py1[pe] - py0[pe]
+    ax, ay = px0[pe] + dx * t0, py0[pe] + dy * t0
+    bx, by = px0[pe] + dx * t1, py0[pe] + dy * t1
+    mx, my = (ax + bx) / 2, (ay + by) / 2
+
+    # 3. 조각 중점이 q 안인지 (짝홀 규칙) / q 경계 위인지
+    owner = p_owner[pe]
+    piece_count = np.bincount(owner, minlength=n_pairs)
+    piece_start = np.concatenate(([0], np.cumsum(piece_count)[:-1]))
+    _, k, j = _combos(piece_count, q_count, piece_start, q_start)
+    y0, y1 = qy0[j], qy1[j]
+    straddle = (y0 > my[k]) != (y1 > my[k])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = qx0[j] + (my[k] - y0) * (qx1[j] - qx0[j]) / (y1 - y0)
+    parity = np.bincount(k, weights=straddle & (mx[k] < x_cross), minlength=len(pe)) % 2 == 1
+    sx, sy = qx1[j] - qx0[j], qy1[j] - qy0[j]
+    ss = sx * sx + sy * sy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        at = np.clip(np.where(ss > 0, ((mx[k] - qx0[j]) * sx + (my[k] - qy0[j]) * sy) / ss, 0.0),
+                     0.0, 1.0)
+    on = np.hypot(mx[k] - qx0[j] - at * sx, my[k] - qy0[j] - at * sy) <= BOUNDARY_M
+    on_edge = np.zeros(len(pe), dtype=bool)
+    on_edge[k[on]] = True
+    same = np.zeros(len(pe), dtype=bool)
+    same[k[on & (dx[k] * sx + dy[k] * sy > 0)]] = True
+
+    inside = (parity & ~on_edge) | (on_edge & same & keep_shared)
+    area = (ax * by - bx * ay) / 2
+    return np.bincount(owner[inside], weights=area[inside], minlength=n_pairs)
+
+
+def overlap_areas(store, a, b):
+    """
+    쌍 (a[k], b[k]) 의 footprint 겹친 면적 m² (표본점 추정이 아닌 정확한 값, 구멍 포함)
+    겹친 영역의 경계 = b 안에 든 a 의 변 조각 + a 안에 든 b 의 변 조각
+    → 두 다각형이 볼록하지 않아도 조각들의 shoelace 합이 겹친 면적
+    (평면 근사는 쌍의 bbox 교집합 기준, 경계가 겹치는 조각은 한 번만 셈)
+    """
+    a = np.asarray(a)
+    b = np.asarray(b)
+    out = np.zeros(len(a))
+    if not len(a):
+        return out
+    nxt = _next_vertex(store)
+    flip = _flipped_rings(store)
+    lo = np.maximum(store.bbox[a, :2], store.bbox[b, :2])
+    hi = np.minimum(store.bbox[a, 2:], store.bbox[b, 2:])
+    cos_lat = np.cos(np.radians((lo[:, 1] + hi[:, 1]) / 2))
+
+    # (변, 변) 조합 수 기준으로 쌍을 묶어서 계산
+    v_start, v_end = store.vertex_bounds()
+    n_a, n_b = (v_end - v_start)[a], (v_end - v_start)[b]
+    cost = np.cumsum((n_a + 2) * (n_b + 1) + (n_b + 2) * (n_a + 1))
+    bounds = (np.flatnonzero(np.diff(cost // CHUNK_CELLS)) + 1).tolist()
+    for start, end in zip([0] + bounds, bounds + [len(a)]):
+        sl = slice(start, end)
+        origin = (lo[sl, 0], lo[sl, 1], cos_lat[sl])
+        edges_a = _edges(store, nxt, flip, a[sl], *origin)
+        edges_b = _edges(store, nxt, flip, b[sl], *origin)
+        out[sl] = (_clipped_boundary(edges_a, edges_b, True) +
+                   _clipped_boundary(edges_b, edges_a, False))
+    return np.clip(out, 0, None)
+
+
+def find_overlaps(store, index, min_overlap=0.05, identical_iou=0.9, alt_tolerance=0.1):
+    """
+    겹치는 건물 쌍 목록 (dict 배열 묶음)
+    min_overlap: 작은 건물 면적 대비 겹친 비율이 이 이상이면 겹침
+    identical_iou: IoU 가 이 이상이면 거의 같은 footprint (중복 건물)
+    alt_tolerance: 최고 높이 차이가 이 이하 (m) 면 same_top
+    """
+    a, b = index.overlapping_pairs()
+    areas = footprint_areas(store)
+    overlap = overlap_areas(store, a, b)
+    smaller = np.minimum(areas[a], areas[b])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(smaller > 0, overlap / smaller, 0.0)
+        iou = np.where(overlap > 0, overlap / (areas[a] + areas[b] - overlap), 0.0)
+    keep = ratio >= min_overlap
+    top_a, top_b = store.top_alt[a], store.top_alt[b]
+    return {
+        'candidates': len(a),
+        'a': a[keep],
+        'b': b[keep],
+        'overlap_m2': overlap[keep],
+        'overlap_ratio': np.clip(ratio[keep], 0, 1),
+        'iou': np.clip(iou[keep], 0, 1),
+        'identical': iou[keep] >= identical_iou,
+        'same_top': np.abs(top_a - top_b)[keep] <= alt_tolerance,
+    }
+
+
+def vertex_issues(store):
+    """
+    건물별 내부 문제 (기존 diagnose_zfighting 의 검사를 전체 건물에)
+    consecutive_same: 링 안에서 연속 정점이 같은 좌표 (시작=끝 닫힘 제외)
+    duplicate_coords: 떨어져 있어도 같은 좌표가 또 나오는 링 수 (닫힘 시작=끝 한 쌍은 제외)
+    polygons: 외곽선 링 수 (2개 이상이면 MultiGeometry)
+    """
+    n = len(store)
+    n_rings = len(store.ring_inner)
+    same = np.zeros(len(store.lon), dtype=bool)
+    same[:-1] = ((store.lon[1:] == store.lon[:-1]) & (store.lat[1:] == store.lat[:-1]) &
+                 (store.alt[1:] == store.alt[:-1]))
+    # 링 경계를 넘는 비교 제외
+    same[store.ring_offsets[1:] - 1] = False
+    ring_of_vertex = np.searchsorted(store.ring_offsets, np.arange(len(store.lon)), side='right') - 1
+    building_of_ring = np.searchsorted(store.building_rings, np.arange(n_rings),
+                                       side='right') - 1
+    consecutive = np.bincount(building_of_ring[ring_of_vertex[same]], minlength=n)
+    outer = np.bincount(building_of_ring[~store.ring_inner], minlength=n)
+
+    # 링 번호 + 좌표로 정렬하면 같은 링의 같은 좌표가 이웃 → 링별 중복 수
+    order = np.lexsort((store.alt, store.lat, store.lon, ring_of_vertex))
+    r = ring_of_vertex[order]
+    equal = ((r[1:] == r[:-1]) & (store.lon[order][1:] == store.lon[order][:-1]) &
+             (store.lat[order][1:] == store.lat[order][:-1]) &
+             (store.alt[order][1:] == store.alt[order][:-1]))
+    repeats = np.bincount(r[1:][equal], minlength=n_rings)
+    first, last = store.ring_offsets[:-1], store.ring_offsets[1:] - 1
+    closed = np.zeros(n_rings, dtype=np.int64)
+    nonempty = last > first
+    f, l = first[nonempty], last[nonempty]
+    closed[nonempty] = ((store.lon[f] == store.lon[l]) & (store.lat[f] == store.lat[l]) &
+                        (store.alt[f] == store.alt[l]))
+    duplicate = np.bincount(building_of_ring[repeats > closed], minlength=n)
+    return {'consecutive_same': consecutive, 'duplicate_coords': duplicate, 'polygons': outer}
+
+
+def overlap_report(store, index, source=None, **options):
+    """JSON 으로 저장할 수 있는 보고서 dict"""
+    found = find_overlaps(store, index, **options)
+    issues = vertex_issues(store)
+    pairs = []
+    # 같은 높이 지붕 (z-fighting) 먼저, 그 안에서는 겹친 비율 순
+    for k in np.lexsort((-found['overlap_ratio'], ~found['same_top'])).tolist():
+        i, j = int(found['a'][k]), int(found['b'][k])
+        pairs.append({
+            'a': i, 'b': j,
+            'name_a': store.names[i], 'name_b': store.names[j],
+            'overlap_m2': round(float(found['overlap_m2'][k]), 2),
+            'overlap_ratio': round(float(found['overlap_ratio'][k]), 4),
+            'iou': round(float(found['iou'][k]), 4),
+            'identical': bool(found['identical'][k]),
+            'same_top': bool(found['same_top'][k]),
+            'top_alt_a': float(store.top_alt[i]), 'top_alt_b': float(store.top_alt[j]),
+        })
+    buildings = []
+    flagged = np.flatnonzero((issues['consecutive_same'] > 0) | (issues['duplicate_coords'] > 0) |
+                             (issues['polygons'] > 1))
+    for i in flagged.tolist():
+        buildings.append({
+            'index': i, 'name': store.names[i],
+            'consecutive_same': int(issues['consecutive_same'][i]),
+            'duplicate_coords': int(issues['duplicate_coords'][i]),
+            'polygons': int(issues['polygons'][i]),
+        })
+    return {
+        'source': source,
+        'buildings': len(store),
+        'candidate_pairs': int(found['candidates']),
+        'summary': {
+            'overlapping_pairs': len(pairs),
+            'identical_pairs': int(found['identical'].sum()),
+            'same_top_pairs': int(found['same_top'].sum()),
+            'consecutive_same_buildings': int((issues['consecutive_same'] > 0).sum()),
+            'duplicate_coords_buildings': int((issues['duplicate_coords'] > 0).sum()),
+            'multi_polygon_buildings': int((issues['polygons'] > 1).sum()),
+        },
+        'pairs': pairs,
+        'self_issues': buildings,
+    }
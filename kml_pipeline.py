@@ -0,0 +1,319 @@
+"""
+한 번 읽고 한 번 쓰는 KML 처리 파이프라인
+- fix_kml_clean / convert_to_sample_format / filter_radius / optimize_kml 단계를
+  하나의 건물 스트림 위에서 차례로 적용 (중간 파일 없음)
+- 단계별 입력/출력/제거/수정 개수를 집계
+
+pipeline = Pipeline([CleanStage(), RestyleStage(), RadiusStage(126.633973, 37.533053, 2.5),
+                     RoundStage(6), ExtrudeStage(None)])
+pipeline.run('cheongna_buildings_5km.kml', 'cheongna_buildings_2.5km_optimized.kml')
+pipeline.print_report()
+"""
+import math
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from kml_coords import has_altitude
+from kml_profile import stage, timed, timed_iter
+from kml_simplify import TOLERANCE_M, simplify_mask
+from kml_stream import KML_NS, PARSE_BATCH, KmlReader, fragment
+from kml_writer import KmlWriter
+from kml_store import EARTH_RADIUS_KM
+
+_K = '{%s}' % KML_NS
+
+
+class Stage:
+    """
+    파이프라인 단계 기본형
+    process(pm) 는 Placemark 를 그대로/수정해서 돌려주거나, 제거하려면 None
+    process_batch(pms) 는 묶음 전체를 한 번에 (기본은 process 를 하나씩, 배열 연산 단계가 재정의)
+    header(elems) 는 Document 의 Style 등을 고칠 때 사용
+    """
+    name = 'stage'
+
+    def __init__(self):
+        self.counters = {'in': 0, 'out': 0, 'dropped': 0, 'changed': 0}
+
+    def header(self, elems):
+        pass
+
+    def process(self, pm):
+        return pm
+
+    def process_batch(self, pms):
+        return [self.process(pm) for pm in pms]
+
+    def __call__(self, pm):
+        return self.batch([pm])[0]
+
+    def batch(self, pms):
+        """Placemark 묶음 → 같은 길이 결과 목록 (제거된 건물은 None), 개수 집계"""
+        results = self.process_batch(pms)
+        for pm, result in zip(pms, results):
+            self.counters['in'] += 1
+            if result is None:
+                self.counters['dropped'] += 1
+            else:
+                self.counters['out'] += 1
+                if result is not pm:
+                    self.counters['changed'] += 1
+        return results
+
+
+def _round_ring(ring, decimal_places, alt_places):
+    rounded = np.round(ring, decimal_places)
+    if ring.shape[1] > 2:
+        rounded[:, 2] = np.round(ring[:, 2], alt_places)
+    return rounded
+
+
+class CleanStage(Stage):
+    """
+    fix_kml_clean.py: 좌표 정규화, 파싱 오류/범위 밖/3점 미만 좌표 블록이 있는 건물 제거
+    원본에 높이가 없던 ('lon,lat') 블록은 높이 없이 그대로 씀
+    fixed_blocks: 정상으로 정규화된 <coordinates> 블록 수 (원래 스크립트의 '수정된 건물')
+    """
+    name = 'clean'
+
+    def __init__(self, decimal_places=7):
+        super().__init__()
+        self.decimal_places = decimal_places
+        self.error_coords = 0
+        self.fixed_blocks = 0
+
+    def process(self, pm):
+        errors = [0] * len(pm.rings)
+        for k, _, _ in pm.errors:
+            errors[k] += 1
+        rings = []
+        keep = True
+        for k, ring in enumerate(pm.rings):
+            bad = int(((np.abs(ring[:, 1]) > 90) | (np.abs(ring[:, 0]) > 180)).sum())
+            self.error_coords += bad + errors[k]
+            if bad or errors[k] or len(ring) < 3:
+                keep = False
+                continue
+            self.fixed_blocks += 1
+            if not has_altitude(pm.coord_texts[k]):
+                ring = ring[:, :2]
+            rings.append(_round_ring(ring, self.decimal_places, 1))
+        if not keep:
+            return None
+        return pm._replace(rings=rings, xml=None)
+
+
+class RoundStage(Stage):
+    """좌표 정밀도 조정 (optimize_kml.py: 6자리, 샘플 양식: 7자리), 높이는 1자리"""
+    name = 'round'
+
+    def __init__(self, decimal_places=6, alt_places=1):
+        super().__init__()
+        self.decimal_places = decimal_places
+        self.alt_places = alt_places
+
+    def process(self, pm):
+        rings = [_round_ring(r, self.decimal_places, self.alt_places) for r in pm.rings]
+        return pm._replace(rings=rings, xml=None)
+
+
+class SimplifyStage(Stage):
+    """
+    외곽선 단순화 (kml_simplify): 중복 / 일직선 정점 제거 + dp 또는 vw, 정점 수 집계
+    묶음 (PARSE_BATCH 개 건물) 의 링을 simplify_mask 한 번으로 처리
+    """
+    name = 'simplify'
+
+    def __init__(self, tolerance_m=TOLERANCE_M, method='dp', **options):
+        super().__init__()
+        self.tolerance_m = tolerance_m
+        self.method = method
+        self.options = options
+        self.vertices_in = 0
+        self.vertices_out = 0
+
+    def process(self, pm):
+        return self.process_batch([pm])[0]
+
+    def process_batch(self, pms):
+        # 묶음의 모든 링을 이어 붙여 simplify_mask 한 번으로 (2D / 3D 링이 섞여도 경위도만 사용)
+        rings = [ring for pm in pms for ring in pm.rings]
+        if not rings:
+            return list(pms)
+        offsets = np.concatenate(([0], np.cumsum([len(r) for r in rings])))
+        keep = simplify_mask(np.concatenate([r[:, 0] for r in rings]),
+                             np.concatenate([r[:, 1] for r in rings]),
+                             offsets, self.tolerance_m, self.method, **self.options)
+        self.vertices_in += len(keep)
+        self.vertices_out += int(keep.sum())
+
+        results = []
+        r = 0
+        for pm in pms:
+            a, b = offsets[r], offsets[r + len(pm.rings)]
+            if keep[a:b].all():
+                results.append(pm)
+            else:
+                simplified = [ring[keep[offsets[k]:offsets[k + 1]]]
+                              for k, ring in enumerate(pm.rings, r)]
+                results.append(pm._replace(rings=simplified, xml=None))
+            r += len(pm.rings)
+        return results
+
+
+class ExtrudeStage(Stage):
+    """extrude 값 변경 (None 이면 제거 → optimize_kml.py / fix_kml.py)"""
+    name = 'extrude'
+
+    def __init__(self, extrude=None):
+        super().__init__()
+        self.extrude = extrude
+
+    def process(self, pm):
+        if pm.extrude == self.extrude or not pm.rings:
+            return pm
+        return pm._replace(extrude=self.extrude, xml=None)
+
+
+class RadiusStage(Stage):
+    """filter_radius.py: 중심점이 반경 밖인 건물 제거 (좌표 없는 건물은 유지)"""
+    name = 'radius'
+
+    def __init__(self, center_lon, center_lat, radius_km):
+        super().__init__()
+        self.center_lon = center_lon
+        self.center_lat = center_lat
+        self.radius_km = radius_km
+        self._cos_center = math.cos(math.radians(center_lat))
+
+    def process(self, pm):
+        if not pm.rings or not len(pm.rings[0]):
+            return pm
+        lon, lat = pm.rings[0][:, :2].mean(axis=0).tolist()
+        dlon = math.radians(lon - self.center_lon)
+        dlat = math.radians(lat - self.center_lat)
+        a = (math.sin(dlat / 2) ** 2 +
+             self._cos_center * math.cos(math.radians(lat)) * math.sin(dlon / 2) ** 2)
+        distance = EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+        return pm if distance <= self.radius_km else None
+
+
+class RestyleStage(Stage):
+    """
+    convert_to_sample_format.py: PolyStyle 불투명도/fill/outline 변경
+    Document 의 Style 은 header() 에서, Placemark 안의 <Style> 은 process() 에서 고침
+    """
+    name = 'restyle'
+
+    def __init__(self, alpha='ff', fill=1, outline=1):
+        super().__init__()
+        self.alpha = alpha
+        self.fill = fill
+        self.outline = outline
+        self.styles_changed = 0
+
+    def _restyle(self, elem):
+        """elem 아래 모든 PolyStyle 수정, 값이 실제로 바뀌었으면 True"""
+        changed = False
+        for poly_style in elem.iter(_K + 'PolyStyle'):
+            color = poly_style.find(_K + 'color')
+            if self.alpha and color is not None and color.text and len(color.text) == 8:
+                new = self.alpha + color.text[2:]
+                changed |= new != color.text
+                color.text = new
+            for tag, value in (('fill', self.fill), ('outline', self.outline)):
+                child = poly_style.find(_K + tag)
+                if value is not None and child is not None:
+                    changed |= child.text != str(value)
+                    child.text = str(value)
+            self.styles_changed += 1
+        return changed
+
+    def header(self, elems):
+        for elem in elems:
+            self._restyle(elem)
+
+    def process(self, pm):
+        if pm.inline_style is None or 'PolyStyle' not in pm.inline_style:
+            return pm
+        # fragment() 가 기본 네임스페이스 선언을 뺐으므로 감싸서 다시 읽음
+        wrapper = ET.fromstring('<Document xmlns="%s">%s</Document>' % (KML_NS, pm.inline_style))
+        style = wrapper[0]
+        if not self._restyle(style):
+            return pm
+        style.tail = None
+        return pm._replace(inline_style=fragment(style).strip(), xml=None)
+
+
+class Pipeline:
+    """단계들을 순서대로 적용하며 파일을 한 번 읽고 한 번 씀"""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.read = 0
+        self.written = 0
+
+    def _stream(self, reader):
+        # 건물을 PARSE_BATCH 개씩 모아 단계마다 묶음으로 처리 (SimplifyStage 는 묶음 전체를 한 번에)
+        # 계측이 켜져 있으면 읽기 / 단계마다 호출 시간을 합산 (꺼져 있으면 원래 메서드 그대로)
+        stages = [timed(s.batch, 'pipeline.' + s.name, items=len) for s in self.stages]
+        pending = []
+        for pm in timed_iter(reader, 'parse'):
+            self.read += 1
+            pending.append(pm)
+            if len(pending) >= PARSE_BATCH:
+                yield from self._process(stages, pending)
+                pending = []
+        if pending:
+            yield from self._process(stages, pending)
+
+    def _process(self, stages, pms):
+        for process in stages:
+            pms = [pm for pm in process(pms) if pm is not None]
+            if not pms:
+                return
+        self.written += len(pms)
+        yield from pms
+
+    def run(self, source, output, document_name=None, **writer_options):
+        """writer_options 는 KmlWriter 로 전달 (precision, alt_precision, compact)"""
+        with stage('pipeline') as s:
+            reader = KmlReader(source, keep_xml=True)
+            buildings = self._stream(reader)
+
+            # 첫 묶음을 읽어야 그 앞의 Style 등 header 가 모두 모임
+            first = next(buildings, None)
+            for each in self.stages:
+                each.header(reader.header)
+            written = len(reader.header)
+
+            with KmlWriter(output, **writer_options) as writer:
+                writer.write_header(reader.header, document_name)
+                write = timed(writer.write_placemark, 'serialize')
+                if first is not None:
+                    write(first)
+                for pm in buildings:
+                    write(pm)
+                # 첫 건물 뒤에 나온 Document 수준 Style / StyleMap / Schema 는 끝에 붙임
+                late = reader.header[written:]
+                if late:
+                    for each in self.stages:
+                        each.header(late)
+                    writer.write_elements(late)
+            s.items = self.read
+        return self.report()
+
+    def report(self):
+        return {
+            'read': self.read,
+            'written': self.written,
+            'stages': [dict(name=s.name, **s.counters) for s in self.stages],
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"읽은 건물: {report['read']}개 → 저장: {report['written']}개")
+        for stage in report['stages']:
+            print(f"  [{stage['name']:>8}] 입력 {stage['in']:>7} | 출력 {stage['out']:>7} | "
+                  f"제거 {stage['dropped']:>6} | 수정 {stage['changed']:>7}")
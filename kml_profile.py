@@ -0,0 +1,303 @@
+"""
+단계별 시간 / 메모리 계측
+- stage(name): with 블록의 경과 시간, CPU 시간, 최대 RSS, 처리 개수 (items) 를 기록
+  같은 이름의 단계는 합산 (calls 증가), 단계 안의 단계는 따로 기록 (바깥 단계 시간에 포함)
+- @profiled(name, items=len): 함수 호출 전체를 단계로 (items 는 결과에서 개수를 세는 함수)
+- timed(func, name) / timed_iter(iterable, name): 건물마다 호출되는 함수나 스트림을 호출 단위로 합산
+  (호출마다 RSS 를 읽지 않으므로 max_rss_mb 는 null)
+- timed_stream(raw, name): 바이너리 출력 스트림의 write/close 시간 (gzip / KMZ 압축)
+- 꺼져 있으면 (기본) stage() 는 미리 만든 빈 컨텍스트, timed* 는 받은 객체를 그대로 돌려줌
+  → 계측 지점이 있어도 비용이 거의 없음
+- 환경 변수 KML_PROFILE=profile.json 이면 import 시 켜지고 프로세스 끝날 때 JSON 저장
+  KML_PROFILE_STAGE=parse 면 그 단계만 cProfile 로 돌려 profile_parse.prof 로 저장 (pstats / snakeviz)
+
+KML_PROFILE=filter_profile.json python filter_radius.py
+
+enable('filter_profile.json', cprofile_stage='parse')
+with stage('parse') as s:
+    store = BuildingStore.from_kml(path)
+    s.items = len(store)
+save()
+"""
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = 'KML_PROFILE'
+STAGE_ENV = 'KML_PROFILE_STAGE'
+
+_active = None
+
+
+def _max_rss_mb():
+    """프로세스 최대 RSS (MB), 측정할 수 없으면 None"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트
+    return rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024
+
+
+class Profiler:
+    """단계별 합산 기록 (enable 로 만든 것 하나만 사용)"""
+
+    def __init__(self, path=None, cprofile_stage=None):
+        self.path = path
+        self.cprofile_stage = cprofile_stage
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.stages = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._cprofile = None
+
+    def record(self, name):
+        """이름별 합산 dict (처음 보는 이름이면 만듦, 처음 나온 순서 유지)"""
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = dict(calls=0, wall_s=0.0, cpu_s=0.0, items=0,
+                                             max_rss_mb=None, rss_growth_mb=0.0)
+        return entry
+
+    def add(self, name, wall, cpu, items=None, calls=1, rss_before=None, rss_after=None):
+        entry = self.record(name)
+        entry['calls'] += calls
+        entry['wall_s'] += wall
+        entry['cpu_s'] += cpu
+        if items is not None:
+            entry['items'] += items
+        if rss_after is not None:
+            entry['max_rss_mb'] = rss_after
+            entry['rss_growth_mb'] += max(rss_after - rss_before, 0.0)
+
+    def cprofile(self, name):
+        """name 이 cProfile 대상 단계면 (처음 호출 때 만든) cProfile.Profile, 아니면 None"""
+        if name != self.cprofile_stage:
+            return None
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+        return self._cprofile
+
+    def report(self):
+        return {
+            'argv': sys.argv,
+            'started': self.started,
+            'wall_s': time.perf_counter() - self._wall,
+            'cpu_s': time.process_time() - self._cpu,
+            'max_rss_mb': _max_rss_mb(),
+            'cprofile_stage': self.cprofile_stage,
+            'stages': [dict(name=name, **entry) for name, entry in self.stages.items()],
+        }
+
+    def save(self, path=None):
+        """JSON 저장 (cProfile 대상 단계가 실행됐으면 <경로>_<단계>.prof 도) → JSON 경로"""
+        path = path or self.path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        if self._cprofile is not None:
+            self._cprofile.dump_stats('%s_%s.prof' % (os.path.splitext(path)[0],
+                                                      self.cprofile_stage))
+        return path
+
+
+class _Stage:
+    """stage() 가 돌려주는 컨텍스트 (s.items 로 처리 개수 지정)"""
+    __slots__ = ('name', 'items', '_profiler', '_wall', '_cpu', '_rss', '_cprofile')
+
+    def __init__(self, profiler, name, items):
+        self._profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self._rss = _max_rss_mb()
+        self._cprofile = self._profiler.cprofile(self.name)
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._profiler.add(self.name, wall, cpu, self.items,
+                           rss_before=self._rss, rss_after=_max_rss_mb())
+
+
+class _NullStage:
+    """꺼져 있을 때의 stage() (아무것도 기록하지 않음)"""
+    __slots__ = ('items',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NULL = _NullStage()
+
+
+def enabled():
+    return _active is not None
+
+
+def enable(path=None, cprofile_stage=None):
+    """계측 시작 (이전 기록은 버림) → Profiler"""
+    global _active
+    _active = Profiler(path, cprofile_stage)
+    return _active
+
+
+def disable():
+    """계측 끝 → 마지막 Profiler (없으면 None)"""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def save(path=None):
+    """켜져 있으면 JSON 저장 → 경로 (꺼져 있으면 None)"""
+    if _active is None:
+        return None
+    return _active.save(path)
+
+
+def stage(name, items=None):
+    """with stage('parse') as s: ... s.items = n"""
+    if _active is None:
+        return _NULL
+    return _Stage(_active, name, items)
+
+
+def profiled(name, items=None):
+    """함수 호출마다 stage(name) 으로 감싸는 데코레이터 (items(결과) → 처리 개수)"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _Stage(_active, name, None) as s:
+                result = func(*args, **kwargs)
+                if items is not None:
+                    s.items = items(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def timed(func, name, items=None):
+    """
+    호출마다 시간을 name 단계에 합산하는 func (꺼져 있으면 func 그대로)
+    items: 첫 인자에서 처리 개수를 세는 함수 (None 이면 호출 하나 = 1개)
+    """
+    profiler = _active
+    if profiler is None:
+        return func
+    entry = profiler.record(name)
+    cprofile = profiler.cprofile(name)
+    perf_counter, process_time = time.perf_counter, time.process_time
+
+    def wrapper(*args, **kwargs):
+        if cprofile is not None:
+            cprofile.enable()
+        cpu = process_time()
+        wall = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry['wall_s'] += perf_counter() - wall
+            entry['cpu_s'] += process_time() - cpu
+            entry['calls'] += 1
+            entry['items'] += 1 if items is None else items(args[0])
+            if cprofile is not None:
+                cprofile.disable()
+    return wrapper
+
+
+def timed_iter(iterable, name):
+    """다음 항목을 꺼내는 시간을 name 단계에 합산하는 반복자 (꺼져 있으면 그대로)"""
+    if _active is None:
+        return iterable
+    return _timed_iter(iter(iterable), name)
+
+
+def _timed_iter(iterator, name):
+    advance = timed(iterator.__next__, name)
+    entry = _active.record(name)
+    while True:
+        try:
+            item = advance()
+        except StopIteration:
+            # 마지막 StopIteration 은 항목이 아님
+            entry['items'] -= 1
+            return
+        yield item
+
+
+class _TimedStream(io.RawIOBase):
+    """바이너리 스트림 write/flush/close 시간을 합산 (items = 쓴 바이트 수)"""
+
+    def __init__(self, raw, name):
+        self._raw = raw
+        self._entry = _active.record(name)
+
+    def writable(self):
+        return True
+
+    def _run(self, func, *args, size=0):
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._entry['wall_s'] += time.perf_counter() - wall
+            self._entry['cpu_s'] += time.process_time() - cpu
+            self._entry['calls'] += 1
+            self._entry['items'] += size
+
+    def write(self, data):
+        self._run(self._raw.write, data, size=len(data))
+        return len(data)
+
+    def flush(self):
+        if not self.closed and not self._raw.closed:
+            self._run(self._raw.flush)
+
+    def close(self):
+        # raw.close 가 남은 압축 데이터를 씀 (IOBase.close 의 flush 는 raw 를 닫은 뒤라 건너뜀)
+        if not self.closed:
+            try:
+                self._run(self._raw.close)
+            finally:
+                super().close()
+
+
+def timed_stream(raw, name, buffer_size=1 << 16):
+    """바이너리 출력 스트림 → 시간을 합산하는 버퍼 스트림 (꺼져 있으면 raw 그대로)"""
+    if _active is None:
+        return raw
+    return io.BufferedWriter(_TimedStream(raw, name), buffer_size)
+
+
+def _enable_from_env():
+    path = os.environ.get(PROFILE_ENV)
+    if path:
+        enable(path, os.environ.get(STAGE_ENV) or None)
+        atexit.register(save)
+
+
+_enable_from_env()
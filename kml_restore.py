@@ -0,0 +1,93 @@
+"""
+다른 KML (5km 원본) 에서 건물 일부만 골라 작업 파일 (2.5km) 로 복원 / 병합
+- 원본 전체를 파싱하지 않음
+  1. 원본 캐시의 GridIndex 로 반경 안 건물만 후보로 (공간 인덱스)
+  2. 후보의 이름만 캐시에서 풀어 이름 조건 검사 (이름 인덱스)
+  3. 작업 파일에 이미 있는 건물 (같은 이름 + 중심점이 tolerance_m 이내) 은 작업 파일 GridIndex 로 제외
+  4. 남은 건물은 원본 파일의 Placemark 바이트 구간만 읽어서 원본 그대로 가져옴
+     (바이트 위치가 없는 gz / KMZ 원본은 KmlReader 로 스트리밍하며 고른 건물만 모음)
+- 작업 파일에는 편집 기록 (kml_journal 'restore' 편집) 으로 추가
+→ 비용이 원본 파일 크기가 아니라 복원하는 건물 수에 비례 (원본 캐시는 처음 한 번만 만듦)
+
+ids = select(SOURCE, 126.643091, 37.540134, 2.5, lambda name: '라피아노' in name)
+ids = missing_from(journal.state(), SOURCE, ids)
+journal.restore(SOURCE, ids)
+"""
+import io
+
+import numpy as np
+
+from kml_cache import load_index, load_strings, placemark_bytes
+from kml_index import GridIndex
+from kml_store import BuildingStore
+from kml_stream import KmlReader
+
+# 작업 파일에 같은 이름 건물이 중심점 이 거리 (m) 안에 있으면 이미 있는 것으로 봄
+TOLERANCE_M = 1.0
+
+
+def select(source, center_lon, center_lat, radius_km, name_filter=None):
+    """
+    원본에서 중심점이 반경 안이고 name_filter(이름) 가 참인 건물 번호 (문서 순서)
+    반경 밖 건물의 이름은 읽지 않음
+    """
+    index = load_index(source)
+    ids, _ = index.query_radius(center_lon, center_lat, radius_km * 1000)
+    ids = np.sort(ids)
+    if name_filter is None or not len(ids):
+        return ids
+    names = load_strings(source, 'names', ids)
+    keep = np.fromiter((name is not None and bool(name_filter(name)) for name in names),
+                       dtype=bool, count=len(ids))
+    return ids[keep]
+
+
+def missing_from(target, source, ids, tolerance_m=TOLERANCE_M):
+    """
+    ids 중 target 저장소 (삭제되지 않은 건물) 에 아직 없는 것
+    같은 이름 + 중심점 tolerance_m 이내면 이미 있는 것으로 봄
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if not len(ids) or not len(target):
+        return ids
+    source_index = load_index(source)
+    names = load_strings(source, 'names', ids)
+    live = target.live()
+    target_index = GridIndex.build(target.centroid_lon[live], target.centroid_lat[live],
+                                   target.bbox[live])
+    keep = np.ones(len(ids), dtype=bool)
+    for k, (i, name) in enumerate(zip(ids.tolist(), names)):
+        lon, lat = source_index.centroid_lon[i], source_index.centroid_lat[i]
+        if np.isnan(lon):
+            continue
+        near, _ = target_index.query_radius(lon, lat, tolerance_m)
+        if any(target.names[live[j]] == name for j in near.tolist()):
+            keep[k] = False
+    return ids[keep]
+
+
+def _stream(source, ids):
+    """압축 원본: 파일을 스트리밍으로 읽으며 ids 건물만 모음 (마지막 건물을 찾으면 멈춤)"""
+    wanted = set(ids.tolist())
+    found = {}
+    last = max(wanted)
+    for pm in KmlReader(source, keep_xml=True):
+        if pm.index in wanted:
+            found[pm.index] = pm._replace(folder=())
+        if pm.index >= last:
+            break
+    missing = wanted - set(found)
+    if missing:
+        raise IndexError('원본에 없는 건물 번호: %s' % sorted(missing)[:10])
+    return BuildingStore.from_placemarks([found[i] for i in ids.tolist()], keep_xml=True)
+
+
+def fetch(source, ids):
+    """원본 Placemark 바이트만 읽어서 만든 저장소 (keep_xml, ids 순서, 원본 Folder 경로는 없음)"""
+    ids = np.asarray(ids, dtype=np.int64)
+    spans = placemark_bytes(source, ids)
+    if spans is None:
+        return _stream(source, ids)
+    root, close, fragments = spans
+    document = io.BytesIO(root + b'<Document>' + b''.join(fragments) + b'</Document>' + close)
+    return BuildingStore.from_kml(document, keep_xml=True)
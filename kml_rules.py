@@ -0,0 +1,158 @@
+"""
+건물 검증 규칙 엔진
+- find_bad_coords / fix_kml_clean / check_coord_format / diagnose_zfighting 의 검사를
+  규칙 하나 = 건물별 bool 마스크 하나로 정의하고, 컬럼형 좌표 위에서 한 번에 계산
+- 파일은 한 번만 읽음 (kml_cache 사이드카), 큰 파일은 건물 구간으로 나눠 프로세스 풀에서 계산
+  (워커는 같은 캐시 파일의 좌표 배열만 mmap 으로 열기 때문에 복사해 넘기지 않고 문자열도 풀지 않음)
+- 샘플이 아니라 모든 건물에 대한 보고서
+
+store, masks = validate('cheongna_buildings_5km.kml', workers=4)
+report = build_report(store, masks)
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from kml_cache import load_geometry, load_store
+from kml_overlap import vertex_issues
+from kml_profile import stage
+
+# 청라 지역 대략적인 범위 (find_bad_coords.py)
+REGION = (126.6, 37.48, 126.75, 37.58)
+
+# 이 건물 수 이상이면 프로세스 풀로 나눠서 계산
+PARALLEL_MIN = 200_000
+
+Rule = namedtuple('Rule', ['name', 'description', 'check'])
+
+# evaluate 한 번 안에서 여러 규칙이 같이 쓰는 계산 결과 (evaluate 가 끝나면 비움)
+_shared = {}
+
+
+def _any_vertex(store, vertex_mask):
+    """정점 마스크 → 건물별 '하나라도 해당' 마스크"""
+    v_start, v_end = store.vertex_bounds()
+    counts = np.zeros(len(store.lon) + 1, dtype=np.int64)
+    np.cumsum(vertex_mask, out=counts[1:])
+    return counts[v_end] > counts[v_start]
+
+
+def _any_ring(store, ring_mask):
+    """링 마스크 → 건물별 '하나라도 해당' 마스크"""
+    counts = np.zeros(len(store.ring_inner) + 1, dtype=np.int64)
+    np.cumsum(ring_mask, out=counts[1:])
+    return counts[store.building_rings[1:]] > counts[store.building_rings[:-1]]
+
+
+def _ring_lengths(store):
+    return np.diff(store.ring_offsets)
+
+
+def _unclosed(store):
+    first = store.ring_offsets[:-1]
+    last = store.ring_offsets[1:] - 1
+    unclosed = np.zeros(len(first), dtype=bool)
+    nonempty = last >= first
+    f, l = first[nonempty], last[nonempty]
+    unclosed[nonempty] = (store.lon[f] != store.lon[l]) | (store.lat[f] != store.lat[l])
+    return _any_ring(store, unclosed)
+
+
+def _vertex_issues(store):
+    """vertex_issues 는 두 규칙이 쓰므로 같은 저장소면 한 번만 계산"""
+    if _shared.get('store') is not store:
+        _shared.clear()
+        _shared.update(store=store, issues=vertex_issues(store))
+    return _shared['issues']
+
+
+def _outside_region(store, region=REGION):
+    min_lon, min_lat, max_lon, max_lat = region
+    return _any_vertex(store, (store.lon < min_lon) | (store.lon > max_lon) |
+                       (store.lat < min_lat) | (store.lat > max_lat))
+
+
+RULES = [
+    Rule('parse_error', '파싱할 수 없는 좌표가 있음 (fix_kml_clean 에서 제거 대상)',
+         lambda s: s.parse_errors > 0),
+    Rule('invalid_range', '|위도| > 90 또는 |경도| > 180 인 좌표가 있음',
+         lambda s: _any_vertex(s, (np.abs(s.lat) > 90) | (np.abs(s.lon) > 180))),
+    Rule('outside_region', '청라 지역 범위를 벗어난 좌표가 있음 (find_bad_coords)',
+         _outside_region),
+    Rule('no_geometry', '좌표가 없음',
+         lambda s: s.vertex_count == 0),
+    Rule('too_few_vertices', '정점이 3개 미만인 링이 있음',
+         lambda s: _any_ring(s, _ring_lengths(s) < 3)),
+    Rule('unclosed_ring', '링의 시작점과 끝점이 다름',
+         _unclosed),
+    Rule('consecutive_same', '연속으로 같은 좌표가 있음 (diagnose_zfighting)',
+         lambda s: _vertex_issues(s)['consecutive_same'] > 0),
+    Rule('multiple_polygons', 'Polygon 이 2개 이상 (MultiGeometry)',
+         lambda s: _vertex_issues(s)['polygons'] > 1),
+]
+
+
+def evaluate(store, rules=RULES):
+    """모든 규칙을 계산 → {규칙 이름: 건물별 bool 마스크}"""
+    with stage('validate', items=len(store)):
+        try:
+            return {rule.name: np.asarray(rule.check(store), dtype=bool) for rule in rules}
+        finally:
+            _shared.clear()
+
+
+def _evaluate_range(path, start, end):
+    """워커: 캐시의 좌표 배열만 mmap 으로 열고 [start, end) 건물만 계산"""
+    store = load_geometry(path).take(np.arange(start, end))
+    return start, evaluate(store)
+
+
+def validate(path, workers=None, chunk_size=None):
+    """
+    파일 전체 검증 → (store, {규칙 이름: 마스크})
+    workers: 프로세스 수 (None 이면 건물 수가 PARALLEL_MIN 이상일 때 CPU 수만큼)
+    """
+    # 캐시를 먼저 만들어 두면 워커들은 파싱 없이 mmap 만 함
+    store = load_store(path)
+    n = len(store)
+    if workers is None:
+        workers = os.cpu_count() if n >= PARALLEL_MIN else 1
+    if workers <= 1 or n == 0:
+        return store, evaluate(store)
+
+    chunk_size = chunk_size or -(-n // workers)
+    masks = {rule.name: np.zeros(n, dtype=bool) for rule in RULES}
+    # 워커 프로세스 안의 단계는 기록되지 않으므로 풀 전체를 한 단계로
+    with stage('validate', items=n), ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_evaluate_range, path, start, min(start + chunk_size, n))
+                   for start in range(0, n, chunk_size)]
+        for future in futures:
+            start, chunk = future.result()
+            for name, mask in chunk.items():
+                masks[name][start:start + len(mask)] = mask
+    return store, masks
+
+
+def build_report(store, masks, source=None, rules=RULES):
+    """모든 건물에 대한 보고서 dict (JSON 으로 저장 가능)"""
+    failed = np.column_stack([masks[rule.name] for rule in rules]) if rules else \
+        np.zeros((len(store), 0), dtype=bool)
+    names = [rule.name for rule in rules]
+    buildings = []
+    for i, row in enumerate(failed.tolist()):
+        buildings.append({
+            'index': i,
+            'name': store.names[i],
+            'ok': not any(row),
+            'failed': [name for name, bad in zip(names, row) if bad],
+        })
+    return {
+        'source': source,
+        'buildings': len(store),
+        'passed': int((~failed.any(axis=1)).sum()),
+        'rules': {rule.name: {'description': rule.description,
+                              'failed': int(masks[rule.name].sum())} for rule in rules},
+        'results': buildings,
+    }
@@ -0,0 +1,291 @@
+"""
+건물 외곽선 단순화 (정점 수 줄이기)
+- 연속 중복 정점 제거 → 일직선 위 정점 제거 → Douglas–Peucker ('dp') 또는 Visvalingam–Whyatt ('vw')
+- 허용 오차는 m 단위 (링 첫 정점 위도 기준 평면 근사), 모든 링을 한 번에 벡터 연산
+  (dp 는 분할 단계마다, vw / 일직선 제거는 제거 라운드마다 전체 링을 함께 처리)
+- 링의 시작/끝 정점은 항상 유지 (닫힌 링은 닫힌 채로), 닫힌 링은 최소 4점 (삼각형) 유지
+- 단순화 뒤 링 방향이 뒤집히거나 면적이 0 이 되거나, 바뀐 링의 변끼리 교차/접촉하면
+  (자기 교차) 그 링은 원래 정점으로 되돌림
+
+simplified, report = simplify_store(store, tolerance_m=0.5)
+print(report['vertices_before'], '→', report['vertices_after'])
+"""
+import numpy as np
+
+from kml_index import METERS_PER_DEG_LAT
+from kml_profile import stage
+from kml_store import _ranges
+
+# 기본 허용 오차 (m)
+TOLERANCE_M = 0.5
+DUPLICATE_M = 0.01
+COLLINEAR_M = 0.01
+# 자기 교차 검사에서 한 번에 비교할 변 쌍 수 (큰 링은 행 단위로 나눠서)
+_PAIR_BLOCK = 1 << 20
+# dp 에서 허용 오차와 상관없이 항상 나누는 단계 수 (닫힌 링이 삼각형 이상으로 남도록)
+_FORCED_SPLITS = 2
+
+
+def _ring_of_vertex(ring_offsets, n):
+    return np.repeat(np.arange(len(ring_offsets) - 1), np.diff(ring_offsets))[:n]
+
+
+def _project(lon, lat, ring_offsets, ring):
+    """경위도 → 링별 평면 근사 (x, y) m"""
+    first = np.minimum(ring_offsets[:-1], max(len(lat) - 1, 0))
+    lat0 = lat[first][ring] if len(lat) else lat
+    x = lon * METERS_PER_DEG_LAT * np.cos(np.radians(lat0))
+    y = lat * METERS_PER_DEG_LAT
+    return x, y
+
+
+def _closed(x, y, ring_offsets):
+    """링별 닫힘 여부 (첫 정점 == 끝 정점)"""
+    first = ring_offsets[:-1]
+    last = ring_offsets[1:] - 1
+    closed = np.zeros(len(first), dtype=bool)
+    nonempty = last > first
+    f, l = first[nonempty], last[nonempty]
+    closed[nonempty] = (x[f] == x[l]) & (y[f] == y[l])
+    return closed
+
+
+def _signed_areas(x, y, idx, ring, ring_offsets):
+    """idx (링 순서대로 남은 정점) 로 만든 링별 부호 있는 면적 (shoelace)"""
+    n_rings = len(ring_offsets) - 1
+    areas = np.zeros(n_rings)
+    if len(idx) < 2:
+        return areas
+    a, b = idx[:-1], idx[1:]
+    same = ring[a] == ring[b]
+    a, b = a[same], b[same]
+    # 링 첫 정점 기준으로 빼서 큰 좌표값끼리 곱할 때의 정밀도 손실 피함
+    origin = ring_offsets[ring[a]]
+    x0, y0 = x[a] - x[origin], y[a] - y[origin]
+    x1, y1 = x[b] - x[origin], y[b] - y[origin]
+    np.add.at(areas, ring[a], x0 * y1 - x1 * y0)
+    return areas / 2
+
+
+def _chord_distance(x, y, a, b, c):
+    """정점 b 에서 선분 a-c 까지 거리 (a == c 면 점 사이 거리)"""
+    dx, dy = x[c] - x[a], y[c] - y[a]
+    px, py = x[b] - x[a], y[b] - y[a]
+    length2 = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = np.clip(np.where(length2 > 0, (px * dx + py * dy) / length2, 0.0), 0.0, 1.0)
+    return np.hypot(px - t * dx, py - t * dy)
+
+
+def _triangle_area(x, y, a, b, c):
+    return np.abs((x[b] - x[a]) * (y[c] - y[a]) - (x[c] - x[a]) * (y[b] - y[a])) / 2
+
+
+def _orientation(px, py, qx, qy, rx, ry):
+    return (qx - px) * (ry - py) - (qy - py) * (rx - px)
+
+
+def _on_segment(px, py, qx, qy, rx, ry):
+    """(일직선 위의) 점 r 이 선분 p-q 의 bbox 안에 있는지"""
+    return ((np.minimum(px, qx) <= rx) & (rx <= np.maximum(px, qx)) &
+            (np.minimum(py, qy) <= ry) & (ry <= np.maximum(py, qy)))
+
+
+def _self_intersects(x, y, closed):
+    """정점 순서대로 이은 링의 변끼리 교차하거나 닿는지 (끝점을 공유하는 이웃 변은 제외)"""
+    n = len(x) - 1
+    if n < 3:
+        return False
+    ax, ay, bx, by = x[:-1], y[:-1], x[1:], y[1:]
+    j = np.arange(n)
+    rows = max(1, _PAIR_BLOCK // n)
+    for start in range(0, n, rows):
+        i = np.arange(start, min(start + rows, n))[:, None]
+        pairs = j > i + 1
+        if closed:
+            pairs &= ~((i == 0) & (j == n - 1))
+        si, sj = np.nonzero(pairs)
+        if not len(si):
+            continue
+        si = si + start
+        p = (ax[si], ay[si], bx[si], by[si])
+        q = (ax[sj], ay[sj], bx[sj], by[sj])
+        o1 = _orientation(*p, q[0], q[1])
+        o2 = _orientation(*p, q[2], q[3])
+        o3 = _orientation(*q, p[0], p[1])
+        o4 = _orientation(*q, p[2], p[3])
+        hit = (((o1 > 0) != (o2 > 0)) & (o1 != 0) & (o2 != 0) &
+               ((o3 > 0) != (o4 > 0)) & (o3 != 0) & (o4 != 0))
+        hit |= (o1 == 0) & _on_segment(*p, q[0], q[1])
+        hit |= (o2 == 0) & _on_segment(*p, q[2], q[3])
+        hit |= (o3 == 0) & _on_segment(*q, p[0], p[1])
+        hit |= (o4 == 0) & _on_segment(*q, p[2], p[3])
+        if hit.any():
+            return True
+    return False
+
+
+def _drop_duplicates(x, y, keep, ring, ring_offsets, tolerance):
+    """링 안에서 바로 앞 정점과 tolerance 이하로 붙은 정점 제거 (끝 정점 대신 그 앞 정점을 뺌)"""
+    n = len(x)
+    if n < 2:
+        return keep
+    near = np.zeros(n, dtype=bool)
+    near[1:] = (np.hypot(x[1:] - x[:-1], y[1:] - y[:-1]) <= tolerance) & (ring[1:] == ring[:-1])
+    first = ring_offsets[:-1]
+    last = ring_offsets[1:] - 1
+    nonempty = last > first
+    last_near = last[nonempty][near[last[nonempty]]]
+    near[last_near] = False
+    movable = last_near - 1 > first[ring[last_near]]
+    near[last_near[movable] - 1] = True
+    return keep & ~near
+
+
+def _eliminate(x, y, keep, ring, min_keep, measure, threshold):
+    """
+    measure(이전, 정점, 다음) < threshold 인 정점을 라운드마다 제거 (vw / 일직선)
+    같은 라운드에 이웃한 두 정점을 함께 빼지 않고, 링마다 min_keep 개는 남김
+    """
+    while True:
+        idx = np.flatnonzero(keep)
+        if len(idx) < 3:
+            return keep
+        r = ring[idx]
+        interior = np.ones(len(idx), dtype=bool)
+        interior[0] = interior[-1] = False
+        boundary = np.flatnonzero(r[1:] != r[:-1])
+        interior[boundary] = False
+        interior[boundary + 1] = False
+        k = np.flatnonzero(interior)
+        if not len(k):
+            return keep
+        m = np.full(len(idx), np.inf)
+        m[k] = measure(x, y, idx[k - 1], idx[k], idx[k + 1])
+        # 이웃보다 작거나 같은 (국소 최소) 후보, 연속된 후보는 하나 건너 하나만
+        left = np.concatenate(([np.inf], m[:-1]))
+        right = np.concatenate((m[1:], [np.inf]))
+        eligible = (m < threshold) & (m <= left) & (m <= right)
+        if not eligible.any():
+            return keep
+        run_start = eligible & ~np.concatenate(([False], eligible[:-1]))
+        run_first = np.flatnonzero(run_start)[np.maximum(np.cumsum(run_start) - 1, 0)]
+        eligible &= (np.arange(len(idx)) - run_first) % 2 == 0
+        # 링마다 min_keep 개는 남김 (링 안 순서대로 허용 개수까지만)
+        counts = np.bincount(r, minlength=len(min_keep))
+        allowed = np.maximum(counts - min_keep, 0)
+        taken = np.cumsum(eligible)
+        ring_first = np.searchsorted(r, r)
+        rank = taken - (taken[ring_first] - eligible[ring_first]) - 1
+        eligible &= rank < allowed[r]
+        if not eligible.any():
+            return keep
+        keep = keep.copy()
+        keep[idx[eligible]] = False
+
+
+def _douglas_peucker(x, y, keep, ring, n_rings, tolerance):
+    """남은 정점 위에서 Douglas–Peucker, 분할 단계마다 모든 링의 구간을 함께 처리"""
+    idx = np.flatnonzero(keep)
+    if not len(idx):
+        return keep
+    r = ring[idx]
+    starts = np.searchsorted(r, np.arange(n_rings))
+    ends = np.searchsorted(r, np.arange(n_rings), side='right') - 1
+    has = ends > starts
+    seg_s, seg_e = starts[has], ends[has]
+    depth = 0
+    result = np.zeros(len(idx), dtype=bool)
+    result[seg_s] = True
+    result[seg_e] = True
+    while len(seg_s):
+        inner = seg_e - seg_s - 1
+        active = inner > 0
+        seg_s, seg_e, inner = seg_s[active], seg_e[active], inner[active]
+        if not len(seg_s):
+            break
+        points = _ranges(seg_s + 1, seg_e)
+        owner = np.repeat(np.arange(len(seg_s)), inner)
+        d = _chord_distance(x, y, idx[seg_s][owner], idx[points], idx[seg_e][owner])
+        # 구간별 최대 거리 정점 (같으면 앞쪽)
+        order = np.lexsort((-d, owner))
+        first = np.concatenate(([0], np.cumsum(inner)[:-1]))
+        best = order[first]
+        limit = -np.inf if depth < _FORCED_SPLITS else tolerance
+        split = d[best] > limit
+        mid = points[best[split]]
+        result[mid] = True
+        seg_s, seg_e = (np.concatenate((seg_s[split], mid)),
+                        np.concatenate((mid, seg_e[split])))
+        depth += 1
+    out = np.zeros_like(keep)
+    out[idx[result]] = True
+    return out
+
+
+def simplify_mask(lon, lat, ring_offsets, tolerance_m=TOLERANCE_M, method='dp',
+                  duplicate_m=DUPLICATE_M, collinear_m=COLLINEAR_M):
+    """
+    정점 배열 + 링 offsets → 남길 정점 bool 마스크 (V,)
+    method: 'dp' (선분에서 tolerance_m 이내 정점 제거), 'vw' (삼각형 면적 tolerance_m² 미만 제거),
+            None (중복 / 일직선 정점만 제거)
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    n_rings = len(ring_offsets) - 1
+    ring = _ring_of_vertex(ring_offsets, len(lon))
+    x, y = _project(lon, lat, ring_offsets, ring)
+    closed = _closed(x, y, ring_offsets)
+    min_keep = np.where(closed, 4, 3)
+
+    keep = np.ones(len(lon), dtype=bool)
+    if duplicate_m is not None:
+        keep = _drop_duplicates(x, y, keep, ring, ring_offsets, duplicate_m)
+    if collinear_m:
+        keep = _eliminate(x, y, keep, ring, min_keep, _chord_distance, collinear_m)
+    if method == 'dp':
+        keep = _douglas_peucker(x, y, keep, ring, n_rings, tolerance_m)
+    elif method == 'vw':
+        keep = _eliminate(x, y, keep, ring, min_keep, _triangle_area, tolerance_m ** 2)
+    elif method is not None:
+        raise ValueError("method 는 'dp', 'vw', None 중 하나: %r" % (method,))
+
+    # 방향이 뒤집히거나 면적이 없어진 (닫힌) 링은 원래대로
+    before = _signed_areas(x, y, np.arange(len(lon)), ring, ring_offsets)
+    after = _signed_areas(x, y, np.flatnonzero(keep), ring, ring_offsets)
+    broken = closed & (before != 0) & ((np.sign(after) != np.sign(before)) | (after == 0))
+    if broken.any():
+        keep[broken[ring]] = True
+
+    # 정점이 빠진 링만 자기 교차 검사 (링 첫 정점 기준 좌표로)
+    changed = np.bincount(ring[~keep], minlength=n_rings) > 0
+    for r in np.flatnonzero(changed).tolist():
+        a, b = ring_offsets[r], ring_offsets[r + 1]
+        kept = a + np.flatnonzero(keep[a:b])
+        if _self_intersects(x[kept] - x[a], y[kept] - y[a], closed[r]):
+            keep[a:b] = True
+    return keep
+
+
+def simplify_store(store, tolerance_m=TOLERANCE_M, method='dp', **options):
+    """
+    BuildingStore 전체 단순화 → (새 저장소, 보고서)
+    options: duplicate_m, collinear_m (simplify_mask)
+    """
+    with stage('simplify', items=len(store.lon)):
+        keep = simplify_mask(store.lon, store.lat, store.ring_offsets, tolerance_m, method,
+                             **options)
+        simplified = store.keep_vertices(keep)
+    v_start, v_end = store.vertex_bounds()
+    s_start, s_end = simplified.vertex_bounds()
+    before = len(store.lon)
+    after = int(keep.sum())
+    return simplified, {
+        'method': method,
+        'tolerance_m': tolerance_m,
+        'vertices_before': before,
+        'vertices_after': after,
+        'reduction': (1 - after / before) if before else 0.0,
+        'buildings_changed': int(((s_end - s_start) != (v_end - v_start)).sum()),
+    }
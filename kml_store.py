@@ -0,0 +1,440 @@
+"""
+컬럼형 건물 저장소 (NumPy)
+- KML 을 한 번 읽어서 모든 좌표를 평평한 float64 배열로 보관
+- 링/건물 경계는 offset 배열로 표시 (CSR 방식)
+- 중심점, bbox, 최고 높이는 로드할 때 한 번에 벡터 연산으로 계산
+
+store = BuildingStore.from_kml('cheongna_buildings_2.5km_perfect.kml')
+mask = store.name_mask('청라더샵레이크파크')
+print(store.centroid_lat[mask], store.centroid_lon[mask])
+"""
+from array import array
+
+import numpy as np
+
+from kml_profile import profiled, stage
+from kml_stream import KmlReader, read_placemarks, ns
+from kml_writer import KmlWriter
+
+EARTH_RADIUS_KM = 6371
+
+# 로드 시 계산되는 파생 컬럼 (kml_cache 가 그대로 저장/복원)
+DERIVED = ('centroid_lon', 'centroid_lat', 'vertex_count', 'bbox', 'top_alt')
+
+
+def haversine_km(lon, lat, center_lon, center_lat):
+    """haversine 거리 (km), lon/lat 은 배열 가능 → 모든 건물을 한 번에 계산"""
+    lon1, lat1 = np.radians(center_lon), np.radians(center_lat)
+    lon2, lat2 = np.radians(lon), np.radians(lat)
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+
+def _segment_reduce(ufunc, values, starts, ends, empty=np.nan):
+    """values[starts[i]:ends[i]] 구간별 ufunc.reduce 를 한 번에 계산"""
+    out = np.full(len(starts), empty, dtype=np.float64)
+    if len(starts) == 0 or len(values) == 0:
+        return out
+    padded = np.append(values, values[-1])
+    idx = np.empty(2 * len(starts), dtype=np.int64)
+    idx[0::2] = starts
+    idx[1::2] = ends
+    reduced = ufunc.reduceat(padded, idx)[0::2]
+    nonempty = ends > starts
+    out[nonempty] = reduced[nonempty]
+    return out
+
+
+def _ranges(starts, ends):
+    """여러 [start, end) 구간을 이어붙인 인덱스 배열"""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(total, dtype=np.int64) + offsets
+
+
+class BuildingStore:
+    """
+    건물 전체를 컬럼 단위로 보관
+
+    정점 (V개): lon, lat, alt
+    링 (R개): ring_offsets (R+1, 정점 시작 위치), ring_inner (구멍 여부)
+    건물 (N개): building_rings (N+1, 링 시작 위치), names, style_urls, descriptions,
+                extrude (-1 = 없음), altitude_modes, folders, inline_styles (Placemark 안 <Style>),
+                parse_errors (파싱 실패한 좌표 수),
+                xml (keep_xml 일 때)
+    파생값: centroid_lon/lat (첫 링 정점 평균, 기존 스크립트와 동일), bbox (N,4), top_alt
+    삭제: deleted (N, bool 비트맵) — delete() 는 표시만 하고 저장할 때 빠짐 (인덱스는 그대로 유지)
+    """
+
+    def __init__(self, lon, lat, alt, ring_offsets, ring_inner, building_rings,
+                 names, style_urls, descriptions, extrude, altitude_modes, folders,
+                 xml=None, header=None, document_name=None, derived=None, inline_styles=None,
+                 deleted=None, parse_errors=None):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.alt = np.asarray(alt, dtype=np.float64)
+        self.ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+        self.ring_inner = np.asarray(ring_inner, dtype=bool)
+        self.building_rings = np.asarray(building_rings, dtype=np.int64)
+        self.names = np.asarray(names, dtype=object)
+        self.style_urls = np.asarray(style_urls, dtype=object)
+        self.descriptions = np.asarray(descriptions, dtype=object)
+        self.extrude = np.asarray(extrude, dtype=np.int8)
+        self.altitude_modes = np.asarray(altitude_modes, dtype=object)
+        # 튜플이 배열로 풀리지 않도록 하나씩 넣음
+        self.folders = np.empty(len(self.names), dtype=object)
+        for i, folder in enumerate(folders):
+            self.folders[i] = folder
+        if inline_styles is None:
+            inline_styles = [None] * len(self.names)
+        self.inline_styles = np.asarray(inline_styles, dtype=object)
+        if parse_errors is None:
+            parse_errors = np.zeros(len(self.names), dtype=np.int32)
+        self.parse_errors = np.asarray(parse_errors, dtype=np.int32)
+        if deleted is None:
+            deleted = np.zeros(len(self.names), dtype=bool)
+        self.deleted = np.array(deleted, dtype=bool)
+        self.xml = None if xml is None else np.asarray(xml, dtype=object)
+        self.header = header if header is not None else []
+        self.document_name = document_name
+        # 좌표를 제자리에서 바꿀 때마다 증가 (KmlWriter 의 정점 배열 캐시 무효화용)
+        self.version = 0
+        if derived is not None:
+            # 캐시에서 읽은 값은 다시 계산하지 않음
+            for key in DERIVED:
+                setattr(self, key, derived[key])
+        else:
+            self._compute_derived()
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_placemarks(cls, placemarks, keep_xml=False, header=None, document_name=None):
+        """Placemark 레코드 iterable → BuildingStore"""
+        vertices = []
+        ring_lengths = array('q', [0])
+        ring_inner = []
+        building_rings = array('q', [0])
+        names = []
+        style_urls = []
+        descriptions = []
+        extrude = array('b')
+        altitude_modes = []
+        folders = []
+        inline_styles = []
+        parse_errors = array('i')
+        xml = [] if keep_xml else None
+
+        for pm in placemarks:
+            for ring, inner in zip(pm.rings, pm.ring_inner):
+                vertices.append(ring)
+                ring_lengths.append(len(ring))
+                ring_inner.append(inner)
+            building_rings.append(len(ring_inner))
+            names.append(pm.name)
+            style_urls.append(pm.style_url)
+            descriptions.append(pm.description)
+            extrude.append(-1 if pm.extrude is None else pm.extrude)
+            altitude_modes.append(pm.altitude_mode)
+            folders.append(pm.folder)
+            inline_styles.append(pm.inline_style)
+            parse_errors.append(len(pm.errors))
+            if keep_xml:
+                xml.append(pm.xml)
+
+        xyz = np.concatenate(vertices) if vertices else np.zeros((0, 3))
+        lon, lat, alt = np.ascontiguousarray(xyz.T)
+        return cls(
+            lon, lat, alt,
+            np.cumsum(np.frombuffer(ring_lengths, dtype=np.int64)),
+            ring_inner,
+            np.frombuffer(building_rings, dtype=np.int64),
+            names, style_urls, descriptions,
+            np.frombuffer(extrude, dtype=np.int8),
+            altitude_modes, folders, xml=xml,
+            header=header, document_name=document_name, inline_styles=inline_styles,
+            parse_errors=np.frombuffer(parse_errors, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_kml(cls, source, keep_xml=False):
+        """KML 파일을 스트리밍으로 한 번 읽어서 저장소 생성"""
+        with stage('parse') as s:
+            reader = KmlReader(source, keep_xml=keep_xml)
+            store = cls.from_placemarks(reader, keep_xml=keep_xml)
+            s.items = len(store)
+        store.header = reader.header
+        store.document_name = reader.document_name
+        return store
+
+    @classmethod
+    def from_tree(cls, root):
+        """
+        이미 ET.parse 로 읽은 트리에서 생성
+        인덱스 i 는 root.findall('.//kml:Placemark', ns)[i] 와 같은 건물
+        """
+        placemarks = root.findall('.//kml:Placemark', ns)
+        return cls.from_placemarks(read_placemarks(placemarks))
+
+    # ------------------------------------------------------------------
+    # 파생값
+    # ------------------------------------------------------------------
+    def _compute_derived(self):
+        first_ring = self.building_rings[:-1]
+        has_ring = self.building_rings[1:] > first_ring
+        first_ring = np.minimum(first_ring, max(len(self.ring_inner) - 1, 0))
+
+        # 첫 링 (외곽선) 정점 평균 = 기존 get_building_center 와 같은 값
+        if len(self.ring_inner):
+            ring_start = self.ring_offsets[first_ring]
+            ring_end = np.where(has_ring, self.ring_offsets[first_ring + 1], ring_start)
+        else:
+            ring_start = ring_end = np.zeros(len(self), dtype=np.int64)
+        count = ring_end - ring_start
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.centroid_lon = _segment_reduce(np.add, self.lon, ring_start, ring_end, 0.0) / count
+            self.centroid_lat = _segment_reduce(np.add, self.lat, ring_start, ring_end, 0.0) / count
+        self.vertex_count = count
+
+        # bbox / 최고 높이는 건물의 모든 링 기준
+        v_start, v_end = self.vertex_bounds()
+        self.bbox = np.column_stack([
+            _segment_reduce(np.minimum, self.lon, v_start, v_end),
+            _segment_reduce(np.minimum, self.lat, v_start, v_end),
+            _segment_reduce(np.maximum, self.lon, v_start, v_end),
+            _segment_reduce(np.maximum, self.lat, v_start, v_end),
+        ])
+        self.top_alt = _segment_reduce(np.maximum, self.alt, v_start, v_end)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.names)
+
+    def vertex_bounds(self):
+        """건물별 (정점 시작, 정점 끝) 배열"""
+        return (self.ring_offsets[self.building_rings[:-1]],
+                self.ring_offsets[self.building_rings[1:]])
+
+    def coords(self, i, ring=0):
+        """건물 i 의 ring 번째 링 좌표 (n, 3) 배열"""
+        r = self.building_rings[i] + ring
+        start, end = self.ring_offsets[r], self.ring_offsets[r + 1]
+        return np.column_stack([self.lon[start:end], self.lat[start:end], self.alt[start:end]])
+
+    def name_mask(self, term, exclude=None):
+        """이름에 term 이 들어간 건물 (exclude 가 들어간 건물은 제외)"""
+        return np.fromiter(
+            (n is not None and term in n and (exclude is None or exclude not in n)
+             for n in self.names),
+            dtype=bool, count=len(self))
+
+    def distances_km(self, center_lon, center_lat):
+        """모든 건물 중심점에서 (center_lon, center_lat) 까지 거리 (km), 중심 없는 건물은 nan"""
+        return haversine_km(self.centroid_lon, self.centroid_lat, center_lon, center_lat)
+
+    def within_radius(self, center_lon, center_lat, radii_km):
+        """
+        반경 여러 개를 거리 계산 한 번으로 처리
+        거리순 정렬 후 각 반경은 정렬 결과의 앞부분(prefix) → {반경: 건물 인덱스 (문서 순서)}
+        중심이 없는 건물(좌표 없음)은 기존 filter_radius.py 처럼 항상 유지
+        """
+        with stage('filter', items=len(self)):
+            distances = self.distances_km(center_lon, center_lat)
+            order = np.argsort(distances, kind='stable')
+            sorted_distances = distances[order]
+            no_center = np.flatnonzero(np.isnan(distances))
+
+            result = {}
+            for radius in radii_km:
+                count = np.searchsorted(sorted_distances, radius, side='right')
+                result[radius] = np.sort(np.concatenate((order[:count], no_center)))
+        return distances, result
+
+    def delete(self, indices):
+        """
+        건물을 삭제로 표시 (bool 마스크 또는 인덱스), 새로 삭제된 건물 수를 돌려줌
+        트리 검색/부모 탐색 없이 비트맵만 바꾸고, 실제 제거는 저장할 때 건너뛰는 것으로 처리
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        newly = int((~self.deleted[indices]).sum())
+        self.deleted[indices] = True
+        return newly
+
+    def undelete(self, indices):
+        """삭제 표시 취소"""
+        self.deleted[np.asarray(indices)] = False
+
+    def live(self):
+        """삭제되지 않은 건물 인덱스"""
+        return np.flatnonzero(~self.deleted)
+
+    def write_raw(self, path, indices=None, document_name=None, **options):
+        """keep_xml=True 로 읽은 원본 Placemark 를 그대로 이어 써서 저장"""
+        if self.xml is None:
+            raise ValueError('write_raw 는 keep_xml=True 로 읽은 저장소에서만 가능')
+        self.write(path, indices, document_name, **options)
+
+    def write(self, path, indices=None, document_name=None, **options):
+        """
+        KmlWriter 로 저장 (options: precision, alt_precision, compact)
+        원본 xml 이 있고 재포맷 옵션이 없으면 원본 그대로, 아니면 좌표 배열에서 직렬화
+        삭제 표시된 건물은 건너뜀
+        """
+        with KmlWriter(path, **options) as writer:
+            writer.write_header(self.header, document_name)
+            writer.write_store(self, indices)
+
+    def take(self, indices):
+        """indices 에 해당하는 건물만 모은 새 저장소 (순서 유지)"""
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        r_start = self.building_rings[indices]
+        r_end = self.building_rings[indices + 1]
+        rings = _ranges(r_start, r_end)
+        vertices = _ranges(self.ring_offsets[rings], self.ring_offsets[rings + 1])
+
+        ring_lengths = self.ring_offsets[rings + 1] - self.ring_offsets[rings]
+        building_lengths = r_end - r_start
+        return BuildingStore(
+            self.lon[vertices], self.lat[vertices], self.alt[vertices],
+            np.concatenate(([0], np.cumsum(ring_lengths))),
+            self.ring_inner[rings],
+            np.concatenate(([0], np.cumsum(building_lengths))),
+            self.names[indices], self.style_urls[indices], self.descriptions[indices],
+            self.extrude[indices], self.altitude_modes[indices], self.folders[indices],
+            xml=None if self.xml is None else self.xml[indices],
+            header=self.header, document_name=self.document_name,
+            inline_styles=self.inline_styles[indices], deleted=self.deleted[indices],
+            parse_errors=self.parse_errors[indices],
+        )
+
+    def keep_vertices(self, mask):
+        """
+        정점 bool 마스크 (V,) 에서 True 인 정점만 남긴 새 저장소 (건물 / 링 구조는 그대로)
+        정점 수가 바뀐 건물의 원본 xml 은 버림 → 저장 시 좌표 배열에서 다시 직렬화
+        """
+        mask = np.asarray(mask, dtype=bool)
+        kept = np.zeros(len(mask) + 1, dtype=np.int64)
+        np.cumsum(mask, out=kept[1:])
+        ring_offsets = kept[self.ring_offsets]
+        xml = None
+        if self.xml is not None:
+            v_start, v_end = self.vertex_bounds()
+            changed = (kept[v_end] - kept[v_start]) != (v_end - v_start)
+            xml = np.array(self.xml)
+            xml[changed] = None
+        return BuildingStore(
+            self.lon[mask], self.lat[mask], self.alt[mask],
+            ring_offsets, self.ring_inner, self.building_rings,
+            self.names, self.style_urls, self.descriptions,
+            self.extrude, self.altitude_modes, self.folders,
+            xml=xml, header=self.header, document_name=self.document_name,
+            inline_styles=self.inline_styles, deleted=self.deleted,
+            parse_errors=self.parse_errors,
+        )
+
+    # ------------------------------------------------------------------
+    # 복사 / 이동
+    # ------------------------------------------------------------------
+    @profiled('copy', items=len)
+    def clone(self, i, lons, lats, names=None, folder=(), decimal_places=7):
+        """
+        건물 i 를 (lons[k], lats[k]) 위치마다 복사한 새 저장소 (중심점이 목표 위치에 오도록 평행이동)
+        모든 복사본 좌표를 (복사본 수, 정점 수) 브로드캐스트 한 번으로 계산
+        names 가 없으면 원본 이름, decimal_places 는 경위도 반올림 (None 이면 그대로)
+        """
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        k = len(lons)
+        r0, r1 = self.building_rings[i], self.building_rings[i + 1]
+        v0, v1 = self.ring_offsets[r0], self.ring_offsets[r1]
+
+        lon = self.lon[v0:v1] + (lons - self.centroid_lon[i])[:, None]
+        lat = self.lat[v0:v1] + (lats - self.centroid_lat[i])[:, None]
+        if decimal_places is not None:
+            lon = np.round(lon, decimal_places)
+            lat = np.round(lat, decimal_places)
+        ring_lengths = np.tile(np.diff(self.ring_offsets[r0:r1 + 1]), k)
+
+        def repeat(column):
+            return np.repeat(column[i:i + 1], k)
+
+        return BuildingStore(
+            lon.ravel(), lat.ravel(), np.tile(self.alt[v0:v1], k),
+            np.concatenate(([0], np.cumsum(ring_lengths))),
+            np.tile(self.ring_inner[r0:r1], k),
+            np.arange(k + 1) * (r1 - r0),
+            repeat(self.names) if names is None else names,
+            repeat(self.style_urls), repeat(self.descriptions), repeat(self.extrude),
+            repeat(self.altitude_modes), [folder] * k,
+            xml=None if self.xml is None else [None] * k,
+            header=self.header, document_name=self.document_name,
+            inline_styles=repeat(self.inline_styles),
+        )
+
+    @profiled('move')
+    def move(self, indices, dlon, dlat, decimal_places=7):
+        """
+        건물 indices 를 (dlon, dlat) 만큼 평행이동 (제자리 수정, dlon/dlat 은 건물별 배열 가능)
+        decimal_places 는 clone 과 같이 이동한 정점의 경위도 반올림 (None 이면 그대로)
+        이동한 건물의 원본 xml 은 버림 → 저장 시 좌표 배열에서 다시 직렬화
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        v_start, v_end = self.vertex_bounds()
+        counts = v_end[indices] - v_start[indices]
+        vertices = _ranges(v_start[indices], v_end[indices])
+        # 캐시에서 mmap 으로 읽은 배열은 읽기 전용이므로 복사 후 수정
+        self.lon = np.array(self.lon)
+        self.lat = np.array(self.lat)
+        self.lon[vertices] += np.repeat(np.broadcast_to(dlon, indices.shape), counts)
+        self.lat[vertices] += np.repeat(np.broadcast_to(dlat, indices.shape), counts)
+        if decimal_places is not None:
+            self.lon[vertices] = np.round(self.lon[vertices], decimal_places)
+            self.lat[vertices] = np.round(self.lat[vertices], decimal_places)
+        self.version += 1
+        if self.xml is not None:
+            self.xml = np.array(self.xml)
+            self.xml[indices] = None
+        self._compute_derived()
+
+    @classmethod
+    @profiled('copy', items=len)
+    def concat(cls, stores):
+        """여러 저장소를 이어 붙인 새 저장소 (header/문서 이름은 첫 저장소 것)"""
+        stores = list(stores)
+        first = stores[0]
+        vertex_base = np.cumsum([0] + [len(s.lon) for s in stores[:-1]])
+        ring_base = np.cumsum([0] + [len(s.ring_inner) for s in stores[:-1]])
+        keep_xml = any(s.xml is not None for s in stores)
+
+        def column(name):
+            return np.concatenate([getattr(s, name) for s in stores])
+
+        return cls(
+            column('lon'), column('lat'), column('alt'),
+            np.concatenate([[0]] + [s.ring_offsets[1:] + base
+                                    for s, base in zip(stores, vertex_base)]),
+            column('ring_inner'),
+            np.concatenate([[0]] + [s.building_rings[1:] + base
+                                    for s, base in zip(stores, ring_base)]),
+            column('names'), column('style_urls'), column('descriptions'), column('extrude'),
+            column('altitude_modes'), column('folders'),
+            xml=np.concatenate([s.xml if s.xml is not None else np.full(len(s), None)
+                                for s in stores]) if keep_xml else None,
+            header=first.header, document_name=first.document_name,
+            inline_styles=column('inline_styles'), deleted=column('deleted'),
+            parse_errors=column('parse_errors'),
+        )
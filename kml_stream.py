@@ -0,0 +1,257 @@
+"""
+KML 스트리밍 리더
+- ET.parse 로 전체 DOM 을 올리지 않고 iterparse 로 Placemark 를 하나씩 읽음
+- 처리한 Placemark 는 바로 clear + 부모에서 제거 → 파일 크기와 무관하게 메모리 일정
+- 좌표는 PARSE_BATCH 개 Placemark 씩 모아 kml_coords.parse_many 로 한 번에 (N, 3) 배열로 파싱
+- .kmz (zip) / gzip 압축 파일도 풀지 않고 그대로 스트리밍 (open_kml / parse_kml)
+"""
+import gzip
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import namedtuple
+
+from kml_coords import parse_coords, parse_many
+from kml_profile import stage
+
+KML_NS = 'http://www.opengis.net/kml/2.2'
+ns = {'kml': KML_NS}
+ET.register_namespace('', KML_NS)
+
+_K = '{%s}' % KML_NS
+
+# 한 번에 좌표를 파싱할 Placemark 수 (KmlReader)
+PARSE_BATCH = 256
+
+# 건물 하나 (Placemark 하나)
+# rings: [(n, 3) float64 배열 (lon, lat, alt), ...]  외곽선이 먼저, ring_inner 로 구멍 여부 표시
+# errors: [(링 번호, 링 안 위치, 잘못된 좌표 원문), ...]
+# xml: keep_xml=True 일 때만 원본 Placemark 직렬화 문자열 (내용을 바꾸면 None 으로)
+# inline_style: Placemark 안에 직접 들어 있는 <Style> 직렬화 문자열
+Placemark = namedtuple('Placemark', [
+    'index', 'name', 'description', 'style_url', 'extrude', 'altitude_mode',
+    'rings', 'ring_inner', 'coord_texts', 'errors', 'folder', 'xml', 'inline_style',
+])
+
+
+def parse_coordinates(text):
+    """<coordinates> 텍스트 → ((n, 3) 배열, [파싱 실패한 좌표 문자열])"""
+    coords, errors = parse_coords(text)
+    return coords, [token for _, token in errors]
+
+
+def open_kml(source):
+    """
+    KML / KMZ / gzip 파일 → KML 내용을 읽는 바이너리 파일 객체 (압축은 읽으면서 풂)
+    KMZ 는 doc.kml 을, 없으면 첫 번째 .kml 항목을 사용
+    파일 객체가 들어오면 그대로 돌려줌
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return source
+    with open(source, 'rb') as f:
+        magic = f.read(4)
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.open(source, 'rb')
+    if magic == b'PK\x03\x04':
+        # 항목을 연 뒤 archive 를 닫아도 항목을 닫을 때까지 파일은 열려 있음
+        with zipfile.ZipFile(source) as archive:
+            names = [n for n in archive.namelist() if n.lower().endswith('.kml')]
+            if not names:
+                raise ValueError('KMZ 안에 .kml 파일이 없음: %s' % source)
+            return archive.open('doc.kml' if 'doc.kml' in names else names[0])
+    return open(source, 'rb')
+
+
+def parse_kml(source):
+    """ET.parse 와 같지만 KMZ / gzip 도 읽음"""
+    with open_kml(source) as f:
+        return ET.parse(f)
+
+
+def count_tags(source, tags, chunk_size=1 << 20):
+    """
+    파일을 파싱하지 않고 바이트에서 시작 태그 수만 셈 (접두사 붙은 태그, KMZ / gzip 도)
+    → {태그: 개수}
+    """
+    pattern = re.compile(rb'<(?:[\w.-]+:)?(%s)[\s>/]' % b'|'.join(re.escape(t.encode()) for t in tags))
+    counts = dict.fromkeys(tags, 0)
+    tail = b''
+    with open_kml(source) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            data = tail + chunk
+            # 마지막 '<' 부터는 태그가 잘렸을 수 있으므로 다음 조각과 이어서 검사
+            cut = data.rfind(b'<') if chunk else len(data)
+            if cut < 0:
+                cut = len(data)
+            for match in pattern.finditer(data, 0, cut):
+                counts[match.group(1).decode()] += 1
+            tail = data[cut:]
+            if not chunk:
+                return counts
+
+
+def fragment(elem):
+    """요소 하나를 문자열로 직렬화 (기본 네임스페이스 선언은 생략)"""
+    text = ET.tostring(elem, encoding='unicode')
+    return text.replace(' xmlns="%s"' % KML_NS, '', 1)
+
+
+def _text(elem, tag):
+    child = elem.find(_K + tag)
+    return child.text if child is not None else None
+
+
+def _read_fields(elem, index, folder, keep_xml):
+    """좌표 파싱 전까지의 Placemark 레코드 (rings/errors 는 비어 있음)"""
+    ring_inner = []
+    coord_texts = []
+    for polygon in elem.iter(_K + 'Polygon'):
+        for boundary in polygon:
+            if boundary.tag == _K + 'outerBoundaryIs':
+                inner = False
+            elif boundary.tag == _K + 'innerBoundaryIs':
+                inner = True
+            else:
+                continue
+            for coords_elem in boundary.iter(_K + 'coordinates'):
+                ring_inner.append(inner)
+                coord_texts.append(coords_elem.text or '')
+
+    style = elem.find(_K + 'Style')
+
+    polygon = elem.find('.//' + _K + 'Polygon')
+    extrude = None
+    altitude_mode = None
+    if polygon is not None:
+        extrude_text = _text(polygon, 'extrude')
+        extrude = int(extrude_text) if extrude_text is not None else None
+        altitude_mode = _text(polygon, 'altitudeMode')
+
+    return Placemark(
+        index=index,
+        name=_text(elem, 'name'),
+        description=_text(elem, 'description'),
+        style_url=_text(elem, 'styleUrl'),
+        extrude=extrude,
+        altitude_mode=altitude_mode,
+        rings=None,
+        ring_inner=ring_inner,
+        coord_texts=coord_texts,
+        errors=None,
+        folder=folder,
+        xml=fragment(elem) if keep_xml else None,
+        inline_style=fragment(style).strip() if style is not None else None,
+    )
+
+
+def _parse_batch(records):
+    """여러 Placemark 의 모든 <coordinates> 를 parse_many 한 번으로 읽어 rings/errors 채움"""
+    texts = [text for pm in records for text in pm.coord_texts]
+    with stage('coords', items=len(texts)):
+        xyz, offsets, errors = parse_many(texts)
+    by_ring = {}
+    for ring, position, token in errors:
+        by_ring.setdefault(ring, []).append((position, token))
+
+    bounds = offsets.tolist()
+    out = []
+    ring = 0
+    for pm in records:
+        n = len(pm.coord_texts)
+        rings = [xyz[bounds[r]:bounds[r + 1]] for r in range(ring, ring + n)]
+        pm_errors = []
+        if by_ring:
+            for k in range(n):
+                pm_errors.extend((k, position, token) for position, token in by_ring.get(ring + k, ()))
+        ring += n
+        out.append(pm._replace(rings=rings, errors=pm_errors))
+    return out
+
+
+def read_placemark(elem, index=0, folder=(), keep_xml=False):
+    """Placemark 요소 하나 → Placemark 레코드 (ET.parse 로 읽은 트리에도 사용 가능)"""
+    return _parse_batch([_read_fields(elem, index, folder, keep_xml)])[0]
+
+
+def read_placemarks(elems, keep_xml=False):
+    """Placemark 요소 목록 → 레코드 목록 (좌표는 PARSE_BATCH 개씩 한 번에 파싱)"""
+    records = [_read_fields(elem, i, (), keep_xml) for i, elem in enumerate(elems)]
+    out = []
+    for start in range(0, len(records), PARSE_BATCH):
+        out.extend(_parse_batch(records[start:start + PARSE_BATCH]))
+    return out
+
+
+class KmlReader:
+    """
+    Placemark 를 하나씩 yield 하는 리더
+
+    reader = KmlReader('cheongna_buildings_2.5km_perfect.kml')
+    for pm in reader:
+        print(pm.name, pm.rings[0][0])   # [lon, lat, alt]
+
+    Placemark 가 아닌 Document 자식 (name, LookAt, Style 등) 은 reader.header 에 모임
+    """
+
+    def __init__(self, source, keep_xml=False):
+        self.source = source
+        self.keep_xml = keep_xml
+        self.header = []
+        self.document_name = None
+        self.count = 0
+
+    def __iter__(self):
+        f = open_kml(self.source)
+        try:
+            yield from self._iter(f)
+        finally:
+            if f is not self.source:
+                f.close()
+
+    def _iter(self, f):
+        stack = []
+        folders = []
+        # 좌표는 PARSE_BATCH 개씩 모아서 한 번에 파싱
+        pending = []
+        for event, elem in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem)
+                if elem.tag == _K + 'Folder':
+                    folders.append(None)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            tag = elem.tag
+
+            if tag == _K + 'Placemark':
+                pending.append(_read_fields(elem, self.count, tuple(folders), self.keep_xml))
+                self.count += 1
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+            elif tag == _K + 'Folder':
+                folders.pop()
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+            elif parent is not None and parent.tag == _K + 'Folder' and tag == _K + 'name':
+                folders[-1] = elem.text
+            elif parent is not None and parent.tag == _K + 'Document':
+                if tag == _K + 'name':
+                    self.document_name = elem.text
+                self.header.append(elem)
+
+            if len(pending) >= PARSE_BATCH:
+                yield from _parse_batch(pending)
+                pending = []
+        if pending:
+            yield from _parse_batch(pending)
+
+
+def iter_placemarks(source, keep_xml=False):
+    """KmlReader 를 함수처럼 쓰기 위한 단축형"""
+    return iter(KmlReader(source, keep_xml=keep_xml))
+
@@ -0,0 +1,150 @@
+"""
+Placemark 안 인라인 <Style> → Document 공유 <Style id> + <styleUrl> 로 합치기
+- 내용이 같은 인라인 스타일 (공백 레이아웃 무시) 은 공유 스타일 하나로
+- Google Earth 는 Placemark 마다 스타일 객체를 만들지 않고, 파일도 작아짐
+- styleUrl 과 인라인 Style 을 함께 가진 Placemark 는 (두 스타일이 합쳐지므로) 그대로 둠
+
+ET 트리 (생성 스크립트):  report = intern_document(document)
+임의 KML (스트리밍 저장소): store = load_store(path, keep_xml=True); report = intern_store(store)
+"""
+import re
+import xml.etree.ElementTree as ET
+
+from kml_stream import KML_NS, _K, fragment
+from kml_writer import _BETWEEN_TAGS
+
+# Document 바로 아래에서 이 요소들이 나오기 전에 공유 스타일을 넣음
+_FEATURES = {_K + tag for tag in ('Placemark', 'Folder', 'Document', 'NetworkLink',
+                                   'GroundOverlay', 'ScreenOverlay', 'PhotoOverlay')}
+_INLINE_STYLE = re.compile(r'<Style\b.*?</Style>', re.S)
+_ID = re.compile(r'^(<Style)\s+id="[^"]*"')
+
+
+def _key(text):
+    """스타일 직렬화 문자열 → 비교용 키 (태그 사이 공백, 자체 id 무시)"""
+    return _ID.sub(r'\1', _BETWEEN_TAGS.sub('><', text.strip()))
+
+
+class StyleTable:
+    """같은 내용의 스타일에 같은 id 를 주는 표 (새 id 는 prefix_1, prefix_2, ...)"""
+
+    def __init__(self, taken=(), prefix='style'):
+        self.prefix = prefix
+        self.ids = {}
+        self.styles = []
+        self._taken = set(taken)
+
+    def known(self, style_id, text):
+        """이미 Document 에 있는 공유 스타일 (내용이 같은 인라인 스타일은 이 id 를 씀)"""
+        self.ids.setdefault(_key(text), style_id)
+
+    def intern(self, text):
+        """인라인 Style 직렬화 문자열 → 공유 id"""
+        key = _key(text)
+        style_id = self.ids.get(key)
+        if style_id is not None:
+            return style_id
+        n = len(self.styles) + 1
+        while '%s_%d' % (self.prefix, n) in self._taken:
+            n += 1
+        style_id = '%s_%d' % (self.prefix, n)
+        self._taken.add(style_id)
+        self.ids[key] = style_id
+        self.styles.append((style_id, text))
+        return style_id
+
+    def element(self, style_id, text, level=2):
+        """공유 스타일 Document 요소 (id 설정, 들여쓰기 정리)"""
+        elem = ET.fromstring(text.strip().replace('<Style', '<Style xmlns="%s"' % KML_NS, 1))
+        elem.set('id', style_id)
+        ET.indent(elem, space='  ', level=level)
+        elem.tail = '\n' + '  ' * level
+        return elem
+
+
+def _report(table, interned, skipped, removed_bytes, url_bytes):
+    shared = sum(len(fragment(table.element(i, t)).encode('utf-8')) for i, t in table.styles)
+    return {
+        'placemarks': interned,
+        'shared_styles': len(table.styles),
+        'skipped': skipped,
+        'bytes_saved': removed_bytes - url_bytes - shared,
+    }
+
+
+def _taken_ids(elems):
+    return {e.get('id') for root in elems for e in root.iter() if e.get('id') is not None}
+
+
+def intern_document(document, prefix='style'):
+    """
+    ET Document 요소 안의 모든 Placemark 인라인 스타일을 공유 스타일로 (트리를 직접 수정)
+    → {'placemarks', 'shared_styles', 'skipped', 'bytes_saved' (직렬화 기준 추정)}
+    """
+    table = StyleTable(_taken_ids([document]), prefix)
+    for child in document.findall(_K + 'Style'):
+        if child.get('id') is not None:
+            table.known(child.get('id'), fragment(child))
+    interned = skipped = removed = added = 0
+    for placemark in document.iter(_K + 'Placemark'):
+        style = placemark.find(_K + 'Style')
+        if style is None:
+            continue
+        if placemark.find(_K + 'styleUrl') is not None:
+            skipped += 1
+            continue
+        text = fragment(style)
+        style_id = table.intern(text)
+        # Style 자리에 styleUrl (스키마 순서상 styleUrl 은 StyleSelector 바로 앞)
+        position = list(placemark).index(style)
+        url = ET.Element(_K + 'styleUrl')
+        url.text = '#' + style_id
+        url.tail = style.tail
+        placemark.remove(style)
+        placemark.insert(position, url)
+        interned += 1
+        removed += len(text.encode('utf-8'))
+        added += len(fragment(url).encode('utf-8'))
+
+    children = list(document)
+    position = next((k for k, child in enumerate(children) if child.tag in _FEATURES),
+                    len(children))
+    for offset, (style_id, text) in enumerate(table.styles):
+        document.insert(position + offset, table.element(style_id, text))
+    return _report(table, interned, skipped, removed, added)
+
+
+def intern_store(store, prefix='style'):
+    """
+    BuildingStore 의 인라인 스타일을 공유 스타일로 (store 를 직접 수정)
+    header 에 공유 <Style> 추가, style_urls 설정, inline_styles 비움
+    원본 xml 이 있으면 그 안의 <Style> 만 <styleUrl> 로 바꿈 (나머지는 원본 그대로)
+    """
+    table = StyleTable(_taken_ids(store.header), prefix)
+    for elem in store.header:
+        if elem.tag == _K + 'Style' and elem.get('id') is not None:
+            table.known(elem.get('id'), fragment(elem))
+    interned = skipped = removed = added = 0
+    has_style = [i for i, s in enumerate(store.inline_styles.tolist()) if s is not None]
+    for i in has_style:
+        if store.style_urls[i] is not None:
+            skipped += 1
+            continue
+        text = store.inline_styles[i]
+        style_id = table.intern(text)
+        url = '<styleUrl>#%s</styleUrl>' % style_id
+        if store.xml is not None and store.xml[i] is not None:
+            match = _INLINE_STYLE.search(store.xml[i])
+            if match is not None:
+                xml = store.xml[i]
+                store.xml[i] = xml[:match.start()] + url + xml[match.end():]
+                text = match.group()
+        store.style_urls[i] = '#' + style_id
+        store.inline_styles[i] = None
+        interned += 1
+        removed += len(text.encode('utf-8'))
+        added += len(url.encode('utf-8'))
+
+    if table.styles:
+        store.header = list(store.header) + [table.element(i, t) for i, t in table.styles]
+    return _report(table, interned, skipped, removed, added)
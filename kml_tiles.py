@@ -0,0 +1,133 @@
+"""
+Region / Lod 기반 타일 출력 (Google Earth 가 화면에 보이는 타일만 읽도록)
+- 건물 bbox (BuildingStore.bbox) 중심으로 사분 트리 분할, 타일당 건물 수가 max_per_tile 이하가 될 때까지
+- 잎 타일마다 KML 파일 하나: <Region><Lod> + 그 타일의 건물 (공유 <Style> 은 타일마다 복사)
+- 안쪽 노드 파일은 자식 타일로 가는 <NetworkLink> (자식 Region 이 보일 때만 읽음, onRegion)
+- 루트 doc.kml 은 원본 헤더 (이름, LookAt) + 최상위 타일 링크 + 좌표 없는 건물
+- 경로가 .kmz 면 모든 파일을 zip 하나에, 아니면 디렉터리에 저장
+
+tiles = build_quadtree(store, store.live())
+write_tiles(store, 'cheongna_tiles.kmz', tiles)
+"""
+import os
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+
+from kml_simplify import simplify_store
+from kml_stream import _K
+from kml_writer import KmlWriter
+
+# 잎 타일 하나의 최대 건물 수
+MAX_PER_TILE = 256
+MAX_DEPTH = 12
+# 타일 Region 이 화면에서 이 픽셀 이상일 때 표시 / 로드
+MIN_LOD_PIXELS = 128
+
+TILE_DIR = 'tiles'
+
+# key: 사분 트리 경로 ('' = 루트, '0'..'3' 자식 순서), bbox: 하위 건물 bbox 합집합 (west, south, east, north)
+# indices: 잎이면 건물 인덱스 (문서 순서), children: 자식 타일 key
+Tile = namedtuple('Tile', ['key', 'bbox', 'indices', 'children'])
+
+
+def build_quadtree(store, indices=None, max_per_tile=MAX_PER_TILE, max_depth=MAX_DEPTH):
+    """
+    건물 bbox 중심을 기준으로 사분 트리 분할 → ({key: Tile}, 좌표 없는 건물 인덱스)
+    타일 bbox 는 하위 건물 bbox 의 합집합이라 칸 경계를 넘는 건물도 Region 안에 들어감
+    """
+    if indices is None:
+        indices = store.live()
+    indices = np.asarray(indices)
+    if indices.dtype == bool:
+        indices = np.flatnonzero(indices)
+    bbox = store.bbox[indices]
+    valid = ~np.isnan(bbox).any(axis=1)
+    ids = indices[valid]
+    boxes = bbox[valid]
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+
+    tiles = {}
+    if len(ids):
+        # 칸 분할 기준 (정사각형에 가깝게 하지 않고 건물 중심 범위 그대로)
+        stack = [('', np.arange(len(ids)), cx.min(), cy.min(), cx.max(), cy.max())]
+        while stack:
+            key, members, x0, y0, x1, y1 = stack.pop()
+            b = boxes[members]
+            tile_bbox = (b[:, 0].min(), b[:, 1].min(), b[:, 2].max(), b[:, 3].max())
+            if len(members) <= max_per_tile or len(key) >= max_depth:
+                tiles[key] = Tile(key, tile_bbox, np.sort(ids[members]), [])
+                continue
+            mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+            east = cx[members] > mx
+            north = cy[members] > my
+            # 0: 남서, 1: 남동, 2: 북서, 3: 북동
+            quadrant = east.astype(np.int8) + 2 * north.astype(np.int8)
+            children = []
+            for q, (qx0, qy0, qx1, qy1) in enumerate([(x0, y0, mx, my), (mx, y0, x1, my),
+                                                        (x0, my, mx, y1), (mx, my, x1, y1)]):
+                sub = members[quadrant == q]
+                if len(sub):
+                    children.append(key + str(q))
+                    stack.append((key + str(q), sub, qx0, qy0, qx1, qy1))
+            tiles[key] = Tile(key, tile_bbox, None, sorted(children))
+    return tiles, indices[~valid]
+
+
+def _tile_path(key):
+    return '%s/%s.kml' % (TILE_DIR, key or 'root')
+
+
+def write_tiles(store, output, tiles=None, no_geometry=None, document_name=None,
+                min_lod=MIN_LOD_PIXELS, simplify_m=None, **options):
+    """
+    타일 파일들 저장 (output 이 .kmz 면 zip 하나, 아니면 디렉터리) → 저장한 타일 파일 수
+    simplify_m: 타일 건물 외곽선을 이 허용 오차 (m) 로 단순화 (kml_simplify, dp)
+    options 는 KmlWriter 로 (precision, compact 등)
+    """
+    if tiles is None:
+        tiles, no_geometry = build_quadtree(store)
+    if simplify_m is not None:
+        # 건물 순서 / 인덱스는 그대로라 타일 분할은 원래 저장소 기준 그대로 사용
+        store, _ = simplify_store(store, simplify_m)
+    if no_geometry is None:
+        no_geometry = np.zeros(0, dtype=np.int64)
+    # 타일 문서에는 공유 스타일만 (이름 / LookAt 은 루트에만)
+    styles = [elem for elem in store.header if elem.tag in (_K + 'Style', _K + 'StyleMap')]
+
+    archive = None
+    if str(output).lower().endswith('.kmz'):
+        archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+
+        def open_writer(name):
+            return KmlWriter(name, archive=archive, **options)
+    else:
+        os.makedirs(os.path.join(output, TILE_DIR), exist_ok=True)
+
+        def open_writer(name):
+            return KmlWriter(os.path.join(output, name), **options)
+
+    try:
+        # 루트 문서 (KMZ 는 첫 항목이 기본 문서)
+        with open_writer('doc.kml') as writer:
+            writer.write_header(store.header, document_name)
+            if '' in tiles:
+                writer.write_network_link(_tile_path(''))
+            writer.write_store(store, no_geometry)
+
+        for tile in tiles.values():
+            with open_writer(_tile_path(tile.key)) as writer:
+                writer.write_header(styles, None)
+                if tile.indices is not None:
+                    writer.write_region(tile.bbox, min_lod)
+                    writer.write_store(store, tile.indices)
+                for child in tile.children:
+                    # 자식 파일 안의 상대 경로는 같은 디렉터리 기준
+                    writer.write_network_link(os.path.basename(_tile_path(child)),
+                                              tiles[child].bbox, min_lod=min_lod)
+    finally:
+        if archive is not None:
+            archive.close()
+    return len(tiles)
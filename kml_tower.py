@@ -0,0 +1,330 @@
+"""
+층별 면적 표 → 육각형 타워
+- 모든 층의 한 변 길이 / 정점 / 높이를 면적 배열 하나에 대한 NumPy 연산으로 계산 (층별 반복 없음)
+- 결과는 BuildingStore 로 만들어 KmlWriter 로 바로 씀 (ElementTree 노드를 만들지 않음)
+- 층 스타일은 Document 공유 <Style id> 하나 + styleUrl
+
+층 형태 (mode)
+- 'prism': 층마다 지면부터 층 꼭대기까지 extrude 한 기둥 (기존 방식, 층 수만큼 겹쳐 그림)
+- 'slab': 층마다 바닥~꼭대기 높이 사이 판 (옆면 6개 + 윗면 + 아랫면), 면적이 같은 연속 층은 하나로
+  (아랫면이 늘어 삼각형은 prism 보다 많을 수 있음 → 렌더 비용 절감용은 envelope)
+- 'envelope': 위층부터 누적 최대 면적으로 바꾼 뒤 같은 구간을 합친 판
+  → 겹친 기둥들의 합집합 (prism 에서 보이는 모습) 과 같은 외형, 구간 수만큼만 그림
+
+store = tower_store(areas, labels, CENTER_LON, CENTER_LAT, 448.0)
+store.write('청라신축타워_448m.kml', precision=7, alt_precision=1)
+"""
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from kml_overlap import footprint_areas
+from kml_store import BuildingStore, _ranges
+from kml_stream import _K
+
+# 기존 생성 스크립트와 같은 근사값 (1도 ≈ 111,000m)
+METERS_PER_DEG = 111000.0
+SIDES = 6
+
+TOWER_STYLE_ID = 'tower_floor'
+# 흰 테두리 + 불투명 골드 (448m 초고층 타워)
+TOWER_STYLE = (
+    '<Style xmlns="http://www.opengis.net/kml/2.2" id="%s">'
+    '<LineStyle><color>ffffffff</color><width>1.5</width></LineStyle>'
+    '<PolyStyle><color>ff00d7ff</color><fill>1</fill><outline>1</outline></PolyStyle>'
+    '</Style>'
+)
+
+
+def hexagon_sides(areas):
+    """정육각형 면적 → 한 변 길이 (m): 면적 = (3√3/2) × 변²"""
+    return np.sqrt(2 * np.asarray(areas, dtype=np.float64) / (3 * np.sqrt(3)))
+
+
+def floor_heights(n, total_height):
+    """층 n 개에 total_height 를 똑같이 나눈 (바닥 높이 (n,), 꼭대기 높이 (n,))"""
+    top = np.cumsum(np.full(n, total_height / n if n else 0.0))
+    return np.concatenate(([0.0], top[:-1])), top
+
+
+def hexagon_rings(sides, center_lon, center_lat):
+    """한 변 길이 (M,) → 닫힌 육각형 정점 (lon (M, 7), lat (M, 7)), 위쪽 (90°) 에서 시계 방향"""
+    angles = np.radians(90 - 60 * np.arange(SIDES))
+    angles = np.append(angles, angles[0])
+    lat_per_meter = 1.0 / METERS_PER_DEG
+    lon_per_meter = 1.0 / (METERS_PER_DEG * np.cos(np.radians(center_lat)))
+    # (층, 정점) 브로드캐스트 한 번
+    sides = np.asarray(sides, dtype=np.float64)
+    lat = center_lat + sides[:, None] * np.sin(angles) * lat_per_meter
+    lon = center_lon + sides[:, None] * np.cos(angles) * lon_per_meter
+    return lon, lat
+
+
+def hexagon_floors(areas, center_lon, center_lat, total_height):
+    """
+    층별 면적 (F,) → (lon (F, 7), lat (F, 7), 층 바닥 높이 (F,), 층 꼭대기 높이 (F,), 한 변 (F,))
+    정점은 위쪽 (90°) 에서 시계 방향, 마지막 정점은 첫 정점과 같음 (닫힌 링)
+    층 높이는 total_height 를 층 수로 똑같이 나눔
+    """
+    sides = hexagon_sides(areas)
+    base, top = floor_heights(len(sides), total_height)
+    lon, lat = hexagon_rings(sides, center_lon, center_lat)
+    return lon, lat, base, top, sides
+
+
+def floor_segments(sides, mode='prism'):
+    """
+    층별 한 변 (F,) → 그릴 구간 (시작 층, 끝 층 (미포함), 구간 한 변)
+    prism: 층마다 그대로, slab: 같은 면적 연속 층 합침, envelope: 위층부터 누적 최대 후 합침
+    """
+    sides = np.asarray(sides, dtype=np.float64)
+    n = len(sides)
+    if mode == 'prism':
+        return np.arange(n), np.arange(n) + 1, sides
+    if mode == 'envelope':
+        sides = np.maximum.accumulate(sides[::-1])[::-1]
+    elif mode != 'slab':
+        raise ValueError("mode 는 'prism', 'slab', 'envelope' 중 하나: %r" % (mode,))
+    change = np.flatnonzero(sides[1:] != sides[:-1]) + 1
+    starts = np.concatenate(([0], change)).astype(np.int64)
+    ends = np.concatenate((change, [n])).astype(np.int64)
+    return starts, ends, sides[starts]
+
+
+# 옆면 사각형: 링 변 (v, v+1) 의 바닥 두 점 → 꼭대기 두 점 → 닫힘
+_WALL = np.array([0, 1, 1, 0, 0])
+_WALL_TOP = np.array([False, False, True, True, False])
+
+
+def slab_geometry(lon, lat, ring_offsets, base, top, bottom=True):
+    """
+    건물마다 닫힌 외곽선 링 하나 + 바닥/꼭대기 높이 (M,) → 판 (옆면 + 윗면 (+ 아랫면)) 정점 배열
+    → (lon, lat, alt, 링 offsets, 건물별 링 시작)
+    옆면은 변마다 높이가 다른 정점으로 세운 사각형 Polygon, 윗면은 꼭대기, 아랫면은 바닥 높이
+    """
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    start, end = ring_offsets[:-1], ring_offsets[1:]
+    lengths = end - start
+    m = len(lengths)
+    edges = np.maximum(lengths - 1, 0)
+    caps = 2 if bottom else 1
+    per_building = edges * 5 + lengths * caps
+    out_start = np.concatenate(([0], np.cumsum(per_building)))
+    total = int(out_start[-1])
+    out_lon = np.empty(total)
+    out_lat = np.empty(total)
+    out_alt = np.empty(total)
+
+    # 옆면 (변 E 개 × 정점 5)
+    e = _ranges(start, end - 1)
+    owner = np.repeat(np.arange(m), edges)
+    src = e[:, None] + _WALL
+    dst = (out_start[owner] + (e - start[owner]) * 5)[:, None] + np.arange(5)
+    out_lon[dst] = lon[src]
+    out_lat[dst] = lat[src]
+    out_alt[dst] = np.where(_WALL_TOP, top[owner][:, None], base[owner][:, None])
+
+    # 윗면 / 아랫면 (아랫면은 반대 방향)
+    v = _ranges(start, end)
+    v_owner = np.repeat(np.arange(m), lengths)
+    k = v - start[v_owner]
+    cap = out_start[v_owner] + edges[v_owner] * 5
+    out_lon[cap + k] = lon[v]
+    out_lat[cap + k] = lat[v]
+    out_alt[cap + k] = top[v_owner]
+    if bottom:
+        flipped = end[v_owner] - 1 - k
+        out_lon[cap + lengths[v_owner] + k] = lon[flipped]
+        out_lat[cap + lengths[v_owner] + k] = lat[flipped]
+        out_alt[cap + lengths[v_owner] + k] = base[v_owner]
+
+    # 링: 건물마다 옆면 edges 개 (길이 5) + 뚜껑 caps 개 (길이 = 원래 링)
+    rings_per = edges + caps
+    building_rings = np.concatenate(([0], np.cumsum(rings_per)))
+    ring_lengths = np.full(int(building_rings[-1]), 5, dtype=np.int64)
+    cap_ring = building_rings[1:] - caps
+    ring_lengths[cap_ring] = lengths
+    if bottom:
+        ring_lengths[cap_ring + 1] = lengths
+    return (out_lon, out_lat, out_alt,
+            np.concatenate(([0], np.cumsum(ring_lengths))), building_rings)
+
+
+def slab_store(store, indices=None, merge=True, mode='slab'):
+    """
+    지면부터 extrude 한 층 건물들 (첫 링) → 층 사이 판 저장소
+    꼭대기 높이 순으로 쌓아 바로 아래 층 꼭대기를 바닥으로 씀 (첫 층은 0)
+    merge=True 면 외곽선이 똑같은 연속 층을 판 하나로 합침 (이름은 '첫 층 ~ 끝 층')
+    mode='envelope': 층마다 그 층과 위층들 중 가장 넓은 외곽선을 써서 (기둥들의 합집합 외형)
+    같은 외곽선 구간을 합치고 아랫면은 그리지 않음
+    (위층 외곽선이 아래층 안에 들어가는, 중심이 같은 타워 기준)
+    mode='slab' 은 아랫면까지 그려서 삼각형이 원래 기둥보다 많아질 수 있음 (렌더 비용 절감 아님)
+    """
+    if mode not in ('slab', 'envelope'):
+        raise ValueError("mode 는 'slab', 'envelope' 중 하나: %r" % (mode,))
+    if indices is None:
+        indices = store.live()
+    indices = np.asarray(indices)
+    if indices.dtype == bool:
+        indices = np.flatnonzero(indices)
+    indices = indices[store.vertex_count[indices] > 0]
+    floors = indices[np.argsort(store.top_alt[indices], kind='stable')]
+    top = store.top_alt[floors]
+    base = np.concatenate(([0.0], top[:-1]))
+    shapes = floors
+    if mode == 'envelope' and len(floors):
+        # 위층부터 누적 최대 면적: 자기보다 넓은 위층이 있으면 그 층 외곽선
+        areas = footprint_areas(store)[floors]
+        own = np.flatnonzero(areas >= np.maximum.accumulate(areas[::-1])[::-1])
+        shapes = floors[own[np.searchsorted(own, np.arange(len(floors)))]]
+    first = store.ring_offsets[store.building_rings[shapes]]
+    lengths = store.vertex_count[shapes]
+
+    starts = np.arange(len(floors))
+    if merge and len(floors) > 1:
+        # 연속 층 쌍마다 정점 수가 같고 모든 경위도가 같은지
+        same = lengths[1:] == lengths[:-1]
+        pairs = np.flatnonzero(same)
+        a = _ranges(first[pairs], first[pairs] + lengths[pairs])
+        b = _ranges(first[pairs + 1], first[pairs + 1] + lengths[pairs])
+        differ = (store.lon[a] != store.lon[b]) | (store.lat[a] != store.lat[b])
+        owner = np.repeat(np.arange(len(pairs)), lengths[pairs])
+        same[pairs] = np.bincount(owner, weights=differ, minlength=len(pairs)) == 0
+        starts = np.flatnonzero(np.concatenate(([True], ~same)))
+    ends = np.concatenate((starts[1:], [len(floors)]))
+
+    head = floors[starts]
+    ring_start = first[starts]
+    ring_offsets = np.concatenate(([0], np.cumsum(lengths[starts])))
+    vertices = _ranges(ring_start, ring_start + lengths[starts])
+    lon, lat, alt, offsets, building_rings = slab_geometry(
+        store.lon[vertices], store.lat[vertices], ring_offsets,
+        base[starts], top[ends - 1], bottom=mode == 'slab')
+    names = [store.names[floors[a]] if b - a == 1 else
+             '%s ~ %s' % (store.names[floors[a]], store.names[floors[b - 1]])
+             for a, b in zip(starts.tolist(), ends.tolist())]
+    n = len(head)
+    return BuildingStore(
+        lon, lat, alt, offsets, np.zeros(int(building_rings[-1]), dtype=bool), building_rings,
+        names, store.style_urls[head], store.descriptions[head],
+        np.full(n, -1, dtype=np.int8), ['relativeToGround'] * n, store.folders[head],
+        header=store.header, document_name=store.document_name,
+        inline_styles=store.inline_styles[head],
+    )
+
+
+def render_cost(areas, total_height, mode='prism'):
+    """
+    Google Earth 가 그릴 (삼각형 수, 옆면 넓이 m²) 추정
+    prism: 층마다 옆면 6 × 2 + 윗면 4 삼각형, 옆면은 지면부터
+    slab: 구간마다 옆면 + 윗면 + 아랫면, envelope: 옆면 + 윗면 (옆면은 구간 높이만)
+    """
+    sides = hexagon_sides(areas)
+    n = len(sides)
+    base, top = floor_heights(n, total_height)
+    starts, ends, seg_sides = floor_segments(sides, mode)
+    perimeter = SIDES * seg_sides
+    if mode == 'prism':
+        return n * (SIDES * 2 + 4), float((perimeter * top).sum())
+    caps = 2 if mode == 'slab' else 1
+    return (len(starts) * (SIDES * 2 + 4 * caps),
+            float((perimeter * (top[ends - 1] - base[starts])).sum()))
+
+
+def store_render_cost(store):
+    """
+    저장소 (살아 있는 건물) 를 Google Earth 가 그릴 (삼각형 수, 옆면 넓이 m²) 추정
+    render_cost 와 같은 기준으로 파일에 있는 도형에서 계산 (restack 전후 비교용)
+    링마다 뚜껑 (정점 수 - 3) 삼각형, extrude 한 건물은 변마다 옆면 2 삼각형 (지면~정점 높이)
+    extrude 하지 않은 링 중 높이가 다른 정점이 있는 (세운) 링은 그 넓이를 옆면에 더함
+    """
+    live = store.live()
+    rings = _ranges(store.building_rings[live], store.building_rings[live + 1])
+    owner = live[np.repeat(np.arange(len(live)), np.diff(store.building_rings)[live])]
+    start, end = store.ring_offsets[rings], store.ring_offsets[rings + 1]
+    lengths = end - start
+    extruded = store.extrude[owner] == 1
+
+    # 변 (v, v+1) 마다 미터 좌표
+    e = _ranges(start, np.maximum(end - 1, start))
+    e_ring = np.repeat(np.arange(len(rings)), np.maximum(lengths - 1, 0))
+    x = store.lon * METERS_PER_DEG * np.cos(np.radians(store.lat))
+    y = store.lat * METERS_PER_DEG
+    z = store.alt
+    x0, y0, z0, x1, y1, z1 = x[e], y[e], z[e], x[e + 1], y[e + 1], z[e + 1]
+
+    triangles = int(np.maximum(lengths - 3, 0).sum() +
+                    2 * np.maximum(lengths - 1, 0)[extruded].sum())
+    # extrude 옆면: 변 길이 × 두 끝 높이 평균 (사다리꼴)
+    wall = np.hypot(x1 - x0, y1 - y0) * (z0 + z1) / 2
+    walls = float(wall[extruded[e_ring]].sum())
+    # 세운 링: 벡터 넓이 ½|Σ p_i × p_{i+1}|
+    count = len(rings)
+    cross = [np.bincount(e_ring, weights=w, minlength=count)
+             for w in (y0 * z1 - z0 * y1, z0 * x1 - x0 * z1, x0 * y1 - y0 * x1)]
+    vertical = np.bincount(e_ring, weights=z0 != z1, minlength=count) > 0
+    area = 0.5 * np.sqrt(cross[0] ** 2 + cross[1] ** 2 + cross[2] ** 2)
+    walls += float(area[vertical & ~extruded].sum())
+    return triangles, walls
+
+
+def tower_header(document_name):
+    """Document 이름 + 층 공유 스타일 header 요소"""
+    name = ET.Element(_K + 'name')
+    name.text = document_name
+    name.tail = '\n    '
+    style = ET.fromstring(TOWER_STYLE % TOWER_STYLE_ID)
+    ET.indent(style, space='  ', level=2)
+    style.tail = '\n    '
+    return [name, style]
+
+
+def tower_store(areas, labels, center_lon, center_lat, total_height,
+                document_name=None, folder_name=None, name_format='{label}층',
+                description_format=None, mode='prism'):
+    """
+    층별 면적 / 층 이름 → BuildingStore (prism 은 층마다, slab / envelope 는 구간마다 건물 하나)
+    name_format / description_format: label, area, side, base, top 를 쓸 수 있는 format 문자열
+    (합친 구간의 label 은 '첫 층~끝 층', area / side 는 구간 값)
+    """
+    areas = np.asarray(areas, dtype=np.float64)
+    labels = [str(label) for label in labels]
+    lon, lat, base, top, sides = hexagon_floors(areas, center_lon, center_lat, total_height)
+    starts, ends, seg_sides = floor_segments(sides, mode)
+    seg_base = base[starts]
+    seg_top = top[ends - 1]
+    seg_areas = areas if mode == 'prism' else 3 * np.sqrt(3) / 2 * seg_sides ** 2
+    n = len(starts)
+
+    if mode == 'prism':
+        seg_lon, seg_lat = lon, lat
+        seg_alt = np.repeat(top[:, None], lon.shape[1], axis=1)
+        ring_offsets = np.arange(n + 1) * lon.shape[1]
+        building_rings = np.arange(n + 1)
+        extrude = 1
+    else:
+        ring_lon, ring_lat = hexagon_rings(seg_sides, center_lon, center_lat)
+        # envelope 는 위로 갈수록 좁아지기만 하므로 아랫면이 보이지 않음
+        seg_lon, seg_lat, seg_alt, ring_offsets, building_rings = slab_geometry(
+            ring_lon.ravel(), ring_lat.ravel(), np.arange(n + 1) * ring_lon.shape[1],
+            seg_base, seg_top, bottom=mode == 'slab')
+        extrude = -1
+
+    seg_labels = [labels[a] if b - a == 1 else '%s~%s' % (labels[a], labels[b - 1])
+                  for a, b in zip(starts.tolist(), ends.tolist())]
+    fields = [dict(label=label, area=a, side=s, base=b, top=t)
+              for label, a, s, b, t in zip(seg_labels, seg_areas.tolist(), seg_sides.tolist(),
+                                           seg_base.tolist(), seg_top.tolist())]
+    names = [name_format.format(**f) for f in fields]
+    descriptions = ([description_format.format(**f) for f in fields]
+                    if description_format is not None else [None] * n)
+    folder = (folder_name,) if folder_name is not None else ()
+
+    return BuildingStore(
+        seg_lon.ravel(), seg_lat.ravel(), seg_alt.ravel(), ring_offsets,
+        np.zeros(int(building_rings[-1]), dtype=bool), building_rings,
+        names, ['#' + TOWER_STYLE_ID] * n, descriptions,
+        np.full(n, extrude, dtype=np.int8), ['relativeToGround'] * n, [folder] * n,
+        header=tower_header(document_name) if document_name is not None else [],
+        document_name=document_name,
+    )
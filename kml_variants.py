@@ -0,0 +1,90 @@
+"""
+스타일 변형 KML 생성기 (create_variations.py)
+- 변형끼리 다른 건 <PolyStyle> 의 fill / outline / color 뿐이고 건물은 styleUrl 로 스타일을 공유
+  → 원본은 한 번만 읽어서 <PolyStyle> 블록 위치로 잘라 두고,
+    변형마다 PolyStyle 블록만 고쳐 쓰고 나머지 (좌표 포함) 는 원본 bytes 를 그대로 복사
+- 변형 파일들은 스레드 풀에서 동시에 씀 (파일 쓰기는 GIL 을 놓음)
+- 변형 하나 추가 = 파일 복사 한 번 (파싱 없음)
+
+source = StyleVariants('cheongna_buildings_5km_clean.kml')
+source.write('walls_opaque.kml', fill=1, outline=0, alpha_hex='ff')
+"""
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from kml_stream import open_kml
+from kml_writer import _open_output
+
+# PolyStyle 블록: 빈 태그 (<PolyStyle/>) 와 접두사 붙은 태그 (<kml:PolyStyle>) 도
+# (빈 태그를 따로 잡지 않으면 non-greedy 매치가 다음 PolyStyle 의 닫는 태그까지 이어짐)
+_POLY_STYLE = re.compile(rb'<((?:[\w.-]+:)?)PolyStyle\b[^>]*?/>'
+                         rb'|<((?:[\w.-]+:)?)PolyStyle\b[^>]*>.*?</\2PolyStyle\s*>', re.S)
+_FILL = re.compile(rb'(<(?:[\w.-]+:)?fill\b[^>/]*>)[^<]*(</(?:[\w.-]+:)?fill\s*>)')
+_OUTLINE = re.compile(rb'(<(?:[\w.-]+:)?outline\b[^>/]*>)[^<]*(</(?:[\w.-]+:)?outline\s*>)')
+_COLOR = re.compile(rb'(<(?:[\w.-]+:)?color\b[^>/]*>)([^<]*)(</(?:[\w.-]+:)?color\s*>)')
+
+Variant = namedtuple('Variant', ['output', 'fill', 'outline', 'alpha_hex', 'description'])
+
+
+class StyleVariants:
+    """
+    원본 KML 한 번 읽기 → PolyStyle 블록과 그 사이 (그대로 복사할) 조각으로 나눠 둠
+    kmz / gz 원본도 그대로 읽음
+    """
+
+    def __init__(self, source):
+        with open_kml(source) as f:
+            self.data = f.read()
+        self._literal = []  # PolyStyle 앞 조각들 (마지막은 꼬리)
+        self._styles = []   # PolyStyle 블록 원문
+        pos = 0
+        view = memoryview(self.data)
+        for m in _POLY_STYLE.finditer(self.data):
+            self._literal.append(view[pos:m.start()])
+            self._styles.append(m.group())
+            pos = m.end()
+        self._literal.append(view[pos:])
+
+    def __len__(self):
+        return len(self._styles)
+
+    @staticmethod
+    def patch_style(style, fill=None, outline=None, alpha_hex=None):
+        """PolyStyle 블록 하나의 fill / outline 값과 color 의 투명도 (앞 2자리) 교체"""
+        if fill is not None:
+            style = _FILL.sub(rb'\g<1>%s\g<2>' % str(fill).encode(), style)
+        if outline is not None:
+            style = _OUTLINE.sub(rb'\g<1>%s\g<2>' % str(outline).encode(), style)
+        if alpha_hex:
+            alpha = alpha_hex.encode()
+            style = _COLOR.sub(lambda m: m.group(1) + alpha + m.group(2)[2:] + m.group(3), style)
+        return style
+
+    def write(self, output, fill=None, outline=None, alpha_hex=None, buffer_size=1 << 20):
+        """변형 하나 저장 → 파일 크기 (bytes)"""
+        # 공유 스타일은 보통 몇 종류뿐이라 같은 원문은 한 번만 고침
+        patched = {}
+        f, archive = _open_output(output, buffer_size, binary=True)
+        try:
+            for literal, style in zip(self._literal, self._styles):
+                f.write(literal)
+                new = patched.get(style)
+                if new is None:
+                    new = patched[style] = self.patch_style(style, fill, outline, alpha_hex)
+                f.write(new)
+            f.write(self._literal[-1])
+        finally:
+            f.close()
+            if archive is not None:
+                archive.close()
+        return os.path.getsize(output)
+
+    def write_variants(self, variants, workers=None):
+        """Variant 목록을 동시에 저장 → 같은 순서의 파일 크기 목록"""
+        workers = workers or min(len(variants), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self.write, v.output, v.fill, v.outline, v.alpha_hex)
+                       for v in variants]
+            return [future.result() for future in futures]
@@ -0,0 +1,251 @@
+"""
+편집 결과 검증 엔진 (verify_* 스크립트들의 검사를 선언형으로)
+- 검사 하나 = 건물 선택 (Select: 이름 역색인 조건 + 저장소 마스크) + 기대값
+  Count: 선택된 건물 수, Forbidden: 선택된 건물이 없어야 함,
+  Positions: 기대 위치마다 tolerance_m 안에 선택된 건물 (건물 하나는 위치 하나에만 대응),
+  SameGeometry: 선택된 건물의 도형 해시가 원본 (다른 파일 또는 복사 원본) 의 같은 이름 건물과 같음
+- 파일은 한 번만 읽음 (kml_cache 캐시 + 편집 기록이 있으면 kml_journal 현재 상태)
+  모든 검사는 같은 컬럼 / 이름 색인 위에서 계산, 위치 대응은 GridIndex 최근접 검색
+- 결과는 JSON 으로 저장 가능한 dict (ok, 검사별 기대값 / 실제값 / 건물 번호)
+  건너뛴 검사 (ok 가 None) 는 ok 계산에서 빠지고 skipped_checks 에 따로 적음
+
+checks = [
+    Forbidden('no_apartment', Select('청라푸르지오아파트')),
+    Count('dieast_copies', Select('청라 디 이스트', copies=True), 8),
+    Positions('lake_park', Select('청라더샵레이크파크'), [(37.530835, 126.638879)], 1.0),
+    SameGeometry('copies_keep_shape', Select(copies=True), relative=True),
+]
+report = verify_file('cheongna_buildings_2.5km_perfect.kml', checks)
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from kml_cache import load_names, load_store
+from kml_index import METERS_PER_DEG_LAT, GridIndex
+from kml_journal import Journal, journal_path
+from kml_store import _ranges
+
+# 실패한 검사에서 보고서에 이름까지 적는 건물 수 (번호는 모두)
+MAX_LISTED = 50
+
+# 도형 해시: 좌표를 이 소수 자릿수 (경위도 1e-7 도 ≈ 1cm) / 높이 소수 자릿수로 반올림해서 비교
+COORD_DIGITS = 7
+ALT_DIGITS = 2
+
+Select = namedtuple('Select', ['terms', 'any_of', 'exclude', 'copies', 'min_height', 'max_height',
+                               'where'],
+                    defaults=((), (), (), None, None, None, None))
+Select.__doc__ = """
+검사할 건물 선택 (삭제된 건물은 항상 제외)
+terms / any_of / exclude / copies / min_height / max_height 는 NameIndex.query 와 같음
+where: 저장소 → 건물별 bool 마스크 (예: lambda s: s.vertex_count > 0)
+"""
+
+Count = namedtuple('Count', ['name', 'select', 'expected'])
+Count.__doc__ = "선택된 건물 수 == expected (정수) 또는 (최소, 최대) 범위 (None 은 제한 없음)"
+
+Forbidden = namedtuple('Forbidden', ['name', 'select'])
+Forbidden.__doc__ = "선택된 건물이 하나도 없어야 함"
+
+Positions = namedtuple('Positions', ['name', 'select', 'positions', 'tolerance_m'],
+                       defaults=(1.0,))
+Positions.__doc__ = """
+기대 위치 [(위도, 경도) 또는 (위도, 경도, 이름표)] 마다 중심점이 tolerance_m 안인 선택 건물
+가까운 쌍부터 대응시키고 건물 하나는 위치 하나에만 씀
+"""
+
+SameGeometry = namedtuple('SameGeometry', ['name', 'select', 'source', 'source_select',
+                                           'relative'],
+                          defaults=(None, None, False))
+SameGeometry.__doc__ = """
+선택된 건물마다 원본에 (원본 이름, 도형 해시) 가 같은 건물이 있어야 함
+source: 원본 KML 경로 (None 이면 같은 파일), source_select: 원본에서 비교할 건물 (None 이면 전부)
+원본 이름: 복사본은 복사 원본 이름 ('원본 - Copy 1' → '원본'), 아니면 자기 이름
+relative: 첫 정점 기준 상대 좌표로 비교 (다른 위치로 복사한 건물)
+source 파일이 없으면 검사하지 않고 건너뜀 (결과 ok 는 None, skipped / warning)
+"""
+
+
+def _mix(x):
+    """uint64 배열 섞기 (splitmix64 마무리 단계)"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _quantize(values, digits):
+    return np.round(values * 10.0 ** digits).astype(np.int64).view(np.uint64)
+
+
+def geometry_hashes(store, ids=None, relative=False):
+    """
+    건물마다 도형 해시 (uint64) — 모든 링의 정점 (경도, 위도, 높이) 을 반올림해서 순서대로 섞음
+    relative: 경위도를 건물 첫 정점 기준으로 (평행이동한 복사본은 원본과 같은 해시)
+    """
+    ids = np.arange(len(store)) if ids is None else np.asarray(ids, dtype=np.int64)
+    v_start, v_end = store.vertex_bounds()
+    v_start, v_end = v_start[ids], v_end[ids]
+    counts = v_end - v_start
+    vertices = _ranges(v_start, v_end)
+    owner = np.repeat(np.arange(len(ids)), counts)
+
+    lon, lat = store.lon[vertices], store.lat[vertices]
+    if relative and len(vertices):
+        first = v_start[owner]
+        lon = lon - store.lon[first]
+        lat = lat - store.lat[first]
+    position = np.arange(len(vertices)) - np.repeat(np.cumsum(counts) - counts, counts)
+    with np.errstate(over='ignore'):
+        h = _mix(_quantize(lon, COORD_DIGITS) ^ _mix(_quantize(lat, COORD_DIGITS) +
+                 _mix(_quantize(store.alt[vertices], ALT_DIGITS) +
+                      position.astype(np.uint64))))
+        # 건물별 합 (uint64 누적합의 차, 넘침은 2^64 로 감김)
+        total = np.zeros(len(vertices) + 1, dtype=np.uint64)
+        np.cumsum(h, out=total[1:])
+        ends = np.cumsum(counts)
+        rings = store.building_rings[ids + 1] - store.building_rings[ids]
+        return _mix(total[ends] - total[ends - counts] + _mix(counts.astype(np.uint64)) +
+                    _mix(rings.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)))
+
+
+def select(store, names, selection):
+    """Select → 삭제되지 않은 건물 번호 (오름차순)"""
+    terms = (selection.terms,) if isinstance(selection.terms, str) else tuple(selection.terms)
+    any_of = (selection.any_of,) if isinstance(selection.any_of, str) else selection.any_of
+    ids = names.query(*terms, any_of=any_of, exclude=selection.exclude, copies=selection.copies,
+                      min_height=selection.min_height, max_height=selection.max_height,
+                      within=store.live())
+    if selection.where is not None:
+        ids = ids[np.asarray(selection.where(store), dtype=bool)[ids]]
+    return ids
+
+
+def _listed(store, ids):
+    return [store.names[i] for i in ids[:MAX_LISTED].tolist()]
+
+
+def _count(store, names, check):
+    ids = select(store, names, check.select)
+    expected = check.expected
+    low, high = (expected, expected) if isinstance(expected, int) else expected
+    ok = (low is None or len(ids) >= low) and (high is None or len(ids) <= high)
+    return {'ok': bool(ok), 'expected': [low, high], 'count': len(ids), 'ids': ids.tolist(),
+            'names': _listed(store, ids)}
+
+
+def _forbidden(store, names, check):
+    ids = select(store, names, check.select)
+    return {'ok': not len(ids), 'count': len(ids), 'ids': ids.tolist(),
+            'names': _listed(store, ids)}
+
+
+def _positions(store, names, check):
+    ids = select(store, names, check.select)
+    expected = [(float(p[0]), float(p[1]), p[2] if len(p) > 2 else None) for p in check.positions]
+    results = [{'label': label, 'lat': lat, 'lon': lon, 'ok': False, 'id': None, 'name': None,
+                'error_m': None} for lat, lon, label in expected]
+    if not len(ids):
+        return {'ok': not expected, 'tolerance_m': check.tolerance_m, 'candidates': 0,
+                'positions': results}
+
+    # 기대 위치들의 bbox (+ 허용 거리) 밖 후보는 대응할 수 없으므로 색인 전에 제외
+    lats = np.array([lat for lat, _, _ in expected])
+    lons = np.array([lon for _, lon, _ in expected])
+    dlat = check.tolerance_m / METERS_PER_DEG_LAT
+    dlon = dlat / np.cos(np.radians(np.abs(lats).max()))
+    lon, lat = store.centroid_lon[ids], store.centroid_lat[ids]
+    ids = ids[(lon >= lons.min() - dlon) & (lon <= lons.max() + dlon) &
+              (lat >= lats.min() - dlat) & (lat <= lats.max() + dlat)]
+    if not len(ids):
+        return {'ok': False, 'tolerance_m': check.tolerance_m, 'candidates': 0,
+                'positions': results}
+
+    index = GridIndex.build(store.centroid_lon[ids], store.centroid_lat[ids], store.bbox[ids])
+    # 위치마다 허용 거리 안의 후보 (위치 수만큼) → 가까운 쌍부터 겹치지 않게 대응
+    k = max(2, min(len(expected), len(ids)))
+    pairs = []
+    for j, (lat, lon, _) in enumerate(expected):
+        near, dist = index.nearest(lon, lat, k=k, max_distance_m=check.tolerance_m)
+        pairs.extend(zip(dist.tolist(), [j] * len(near), near.tolist()))
+    used = set()
+    for dist, j, local in sorted(pairs):
+        if results[j]['ok'] or local in used:
+            continue
+        used.add(local)
+        i = int(ids[local])
+        results[j].update(ok=True, id=i, name=store.names[i], error_m=dist)
+    # 대응하지 못한 위치는 (허용 거리 범위 근처) 가장 가까운 후보를 참고로 적음
+    for (lat, lon, _), result in zip(expected, results):
+        if not result['ok']:
+            local, dist = index.nearest(lon, lat)
+            if local is not None:
+                result.update(id=int(ids[local]), name=store.names[ids[local]], error_m=dist)
+    return {'ok': all(r['ok'] for r in results), 'tolerance_m': check.tolerance_m,
+            'candidates': len(ids), 'positions': results}
+
+
+def _same_geometry(store, names, check):
+    ids = select(store, names, check.select)
+    if check.source is not None and not os.path.exists(check.source):
+        # 검사할 파일이 없을 때처럼 건너뜀: ok 는 None (통과도 실패도 아님)
+        return {'ok': None, 'skipped': True, 'source': check.source,
+                'relative': bool(check.relative), 'count': len(ids),
+                'warning': '원본 파일 없음', 'mismatched': [], 'names': []}
+    if check.source is None:
+        source, source_names = store, names
+    else:
+        source, source_names = load_store(check.source), load_names(check.source)
+    source_ids = select(source, source_names, check.source_select or Select())
+
+    # 원본 이름 해시와 도형 해시를 합친 키 (원본은 이름이 같은 건물만 해시 계산)
+    origin = np.where(names.is_copy, names.parent_hash, names.name_hash)[ids]
+    source_ids = source_ids[np.isin(source_names.name_hash[source_ids], origin)]
+    with np.errstate(over='ignore'):
+        keys = origin * np.uint64(0x9E3779B97F4A7C15) + geometry_hashes(store, ids, check.relative)
+        source_keys = (source_names.name_hash[source_ids] * np.uint64(0x9E3779B97F4A7C15) +
+                       geometry_hashes(source, source_ids, check.relative))
+    bad = ids[~np.isin(keys, source_keys)]
+    return {'ok': not len(bad), 'source': check.source, 'relative': bool(check.relative),
+            'count': len(ids), 'mismatched': bad.tolist(), 'names': _listed(store, bad)}
+
+
+_RUNNERS = {Count: _count, Forbidden: _forbidden, Positions: _positions,
+            SameGeometry: _same_geometry}
+
+
+def verify(store, names, checks, target=None):
+    """모든 검사를 같은 저장소 / 이름 색인 위에서 계산 → 보고서 dict"""
+    results = []
+    for check in checks:
+        result = {'name': check.name, 'kind': type(check).__name__}
+        result.update(_RUNNERS[type(check)](store, names, check))
+        results.append(result)
+    return {
+        'target': target,
+        'buildings': int(len(store.live())),
+        'ok': all(r['ok'] is not False for r in results),
+        'failed': [r['name'] for r in results if r['ok'] is False],
+        'skipped_checks': [r['name'] for r in results if r['ok'] is None],
+        'checks': results,
+    }
+
+
+def verify_file(path, checks, journal=True):
+    """
+    KML 파일 검증 → 보고서 dict
+    journal: 편집 기록이 있으면 기록까지 적용한 현재 상태를 검증 (False 면 파일 내용 그대로)
+    """
+    if journal and os.path.exists(journal_path(path)):
+        edits = Journal(path)
+        store, names = edits.state(), edits.names()
+        state = {'generation': edits.generation, 'edits': len(edits), 'seq': edits.next_seq - 1}
+    else:
+        store, names = load_store(path), load_names(path)
+        state = None
+    report = verify(store, names, checks, target=path)
+    report['journal'] = state
+    return report
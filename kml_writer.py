@@ -0,0 +1,336 @@
+"""
+KML 스트리밍 라이터
+- ElementTree 트리를 만들지 않고 건물을 하나씩 버퍼 파일에 바로 씀
+- 링 하나의 좌표는 길이별로 캐시한 포맷 문자열로 한 번에 포맷 (정점마다 f-string 없음)
+- precision: 경위도 소수 자릿수 (None 이면 원래 값 그대로), alt_precision: 높이 자릿수
+- compact=True 면 들여쓰기/줄바꿈 없이 저장 (배포용, 파일 크기 감소)
+- 경로가 .kmz 면 zip 의 doc.kml 항목으로, .gz 면 gzip 으로 바로 압축하며 씀 (임시 파일 없음)
+
+with KmlWriter('out.kml', precision=7, compact=True) as writer:
+    writer.write_header(reader.header)
+    for pm in reader:
+        writer.write_placemark(pm)
+"""
+import gzip
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from kml_profile import stage, timed_stream
+from kml_stream import KML_NS, _K, fragment
+
+_BETWEEN_TAGS = re.compile(r'>\s+<')
+
+
+def _open_output(path, buffer_size, binary=False, archive=None):
+    """
+    (파일, 닫을 zip archive 또는 None) — binary=False 면 utf-8 텍스트 파일
+    archive 를 주면 이미 열린 zip 안의 path 항목으로 씀 (archive 는 호출한 쪽에서 닫음)
+    """
+    # 압축 스트림의 write/close 시간은 'compress' 단계로 (계측이 꺼져 있으면 스트림 그대로)
+    if archive is not None:
+        entry = timed_stream(archive.open(str(path), 'w', force_zip64=True), 'compress')
+        return (entry if binary else io.TextIOWrapper(entry, encoding='utf-8')), None
+    lower = str(path).lower()
+    if lower.endswith('.kmz'):
+        archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        entry = timed_stream(archive.open('doc.kml', 'w', force_zip64=True), 'compress')
+        return (entry if binary else io.TextIOWrapper(entry, encoding='utf-8')), archive
+    if lower.endswith('.gz'):
+        compressed = timed_stream(gzip.open(path, 'wb'), 'compress')
+        return (compressed if binary else io.TextIOWrapper(compressed, encoding='utf-8')), None
+    if binary:
+        return open(path, 'wb', buffering=buffer_size), None
+    return open(path, 'w', encoding='utf-8', buffering=buffer_size), None
+
+
+def _polygons(rings, ring_inner):
+    """링 목록 → [(외곽선, [구멍, ...]), ...] (구멍은 바로 앞 외곽선에 붙음)"""
+    polygons = []
+    for ring, inner in zip(rings, ring_inner):
+        if inner and polygons:
+            polygons[-1][1].append(ring)
+        else:
+            polygons.append((ring, []))
+    return polygons
+
+
+class KmlWriter:
+    """
+    건물 단위로 KML 을 쓰는 라이터 (Folder 경로가 바뀌면 <Folder> 를 자동으로 열고 닫음)
+
+    write_placemark(pm): Placemark 레코드 (pm.xml 이 있고 재포맷이 필요 없으면 원본 그대로)
+    write_building(store, i) / write_store(store): BuildingStore 배열에서 바로 직렬화
+    write_raw(xml, folder): 이미 직렬화된 Placemark 문자열
+    write_region / write_network_link: Region 기반 LOD 타일 (kml_tiles)
+    archive: 열린 ZipFile 을 주면 path 는 그 안의 항목 이름 (KMZ 여러 파일)
+    """
+
+    def __init__(self, path, precision=None, alt_precision=None, compact=False,
+                 buffer_size=1 << 20, archive=None):
+        self.path = path
+        self.precision = precision
+        self.alt_precision = alt_precision
+        self.compact = compact
+        # 원본 XML 을 그대로 쓸 수 있는지 (정밀도/레이아웃을 바꾸면 다시 직렬화)
+        self.passthrough = precision is None and alt_precision is None and not compact
+        self.count = 0
+        self._file, self._archive = _open_output(path, buffer_size, archive=archive)
+        self._folder = ()
+        self._header_written = False
+        self._formats = {}
+        self._xyz = (None, None, None)
+
+        lon = '%s' if precision is None else '%%.%df' % precision
+        alt = '%s' if alt_precision is None else '%%.%df' % alt_precision
+        self._vertex = '%s,%s,%s' % (lon, lon, alt)
+        self._vertex_2d = '%s,%s' % (lon, lon)
+        if compact:
+            self._ind = lambda depth: ''
+            self._nl = ''
+        else:
+            self._ind = lambda depth: '  ' * depth
+            self._nl = '\n'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 문서 / Folder
+    # ------------------------------------------------------------------
+    def write_header(self, header=(), document_name=None):
+        """<kml><Document> 와 Document 수준 요소 (name, LookAt, Style 등)"""
+        f = self._file
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        if self.compact:
+            f.write('<kml xmlns="%s"><Document>' % KML_NS)
+        else:
+            f.write('<kml xmlns="%s">\n  <Document>\n    ' % KML_NS)
+        for elem in header:
+            if document_name is not None and elem.tag == _K + 'name':
+                f.write('<name>%s</name>%s' % (escape(document_name),
+                                               '' if self.compact else '\n    '))
+            elif self.compact:
+                f.write(_BETWEEN_TAGS.sub('><', fragment(elem).strip()))
+            else:
+                f.write(fragment(elem))
+        self._header_written = True
+
+    def _enter_folder(self, folder):
+        folder = tuple(folder or ())
+        current = self._folder
+        if folder == current:
+            return
+        shared = 0
+        while (shared < len(current) and shared < len(folder)
+               and current[shared] == folder[shared]):
+            shared += 1
+        f = self._file
+        f.write('</Folder>' * (len(current) - shared))
+        for name in folder[shared:]:
+            f.write('<Folder>')
+            if name is not None:
+                f.write('<name>%s</name>' % escape(name))
+        self._folder = folder
+
+    def write_elements(self, elems):
+        """
+        Document 수준 요소를 현재 위치에 씀 (열린 Folder 는 닫음)
+        첫 Placemark 뒤에 나오는 Style / Schema 등을 버리지 않고 Document 끝에 붙일 때 사용
+        """
+        self._enter_folder(())
+        f = self._file
+        for elem in elems:
+            if self.compact:
+                f.write(_BETWEEN_TAGS.sub('><', fragment(elem).strip()))
+            else:
+                f.write(fragment(elem))
+
+    def close(self):
+        if self._file.closed:
+            return
+        if not self._header_written:
+            self.write_header()
+        self._enter_folder(())
+        self._file.write('</Document>\n</kml>\n')
+        self._file.close()
+        if self._archive is not None:
+            self._archive.close()
+
+    # ------------------------------------------------------------------
+    # Region / NetworkLink
+    # ------------------------------------------------------------------
+    def _region(self, bbox, min_lod, max_lod, depth):
+        """bbox = (west, south, east, north) → <Region> 문자열"""
+        ind, nl = self._ind, self._nl
+        west, south, east, north = (float(v) for v in bbox)
+        return ''.join([
+            '<Region>', nl,
+            '%s<LatLonAltBox>%s' % (ind(depth + 1), nl),
+            '%s<north>%r</north>%s' % (ind(depth + 2), north, nl),
+            '%s<south>%r</south>%s' % (ind(depth + 2), south, nl),
+            '%s<east>%r</east>%s' % (ind(depth + 2), east, nl),
+            '%s<west>%r</west>%s' % (ind(depth + 2), west, nl),
+            '%s</LatLonAltBox>%s' % (ind(depth + 1), nl),
+            '%s<Lod>%s' % (ind(depth + 1), nl),
+            '%s<minLodPixels>%d</minLodPixels>%s' % (ind(depth + 2), min_lod, nl),
+            '%s<maxLodPixels>%d</maxLodPixels>%s' % (ind(depth + 2), max_lod, nl),
+            '%s</Lod>%s' % (ind(depth + 1), nl),
+            '%s</Region>' % ind(depth),
+        ])
+
+    def write_region(self, bbox, min_lod=128, max_lod=-1):
+        """Document 의 <Region> (write_header 바로 다음, Placemark 보다 먼저)"""
+        self._file.write(self._region(bbox, min_lod, max_lod, 2) + self._nl + self._ind(2))
+
+    def write_network_link(self, href, bbox=None, name=None, min_lod=128, max_lod=-1,
+                           folder=()):
+        """href 파일을 bbox 영역이 화면에 보일 때만 읽어 오는 <NetworkLink> (bbox 없으면 항상)"""
+        ind, nl = self._ind, self._nl
+        self._enter_folder(folder)
+        out = ['<NetworkLink>', nl]
+        if name is not None:
+            out.append('%s<name>%s</name>%s' % (ind(3), escape(name), nl))
+        if bbox is not None:
+            out.append('%s%s%s' % (ind(3), self._region(bbox, min_lod, max_lod, 3), nl))
+        out.append('%s<Link>%s' % (ind(3), nl))
+        out.append('%s<href>%s</href>%s' % (ind(4), escape(href), nl))
+        if bbox is not None:
+            out.append('%s<viewRefreshMode>onRegion</viewRefreshMode>%s' % (ind(4), nl))
+        out.append('%s</Link>%s' % (ind(3), nl))
+        out.append('%s</NetworkLink>%s%s' % (ind(2), nl, ind(2)))
+        self._file.write(''.join(out))
+
+    # ------------------------------------------------------------------
+    # 좌표
+    # ------------------------------------------------------------------
+    def _ring_format(self, n, depth, dims=3):
+        """정점 n 개짜리 링의 포맷 문자열 (길이/깊이/차원별로 캐시)"""
+        key = (n, depth, dims)
+        fmt = self._formats.get(key)
+        if fmt is None:
+            vertex = self._vertex if dims == 3 else self._vertex_2d
+            if self.compact:
+                fmt = ' '.join([vertex] * n)
+            else:
+                indent = '  ' * depth
+                fmt = ('\n' + indent + vertex) * n + '\n' + indent[:-2]
+            self._formats[key] = fmt
+        return fmt
+
+    def format_ring(self, ring, depth=7):
+        """
+        링 ((n,3) 배열 또는 (lon, lat, alt) 튜플 목록) → <coordinates> 텍스트
+        (n,2) 배열 / (lon, lat) 튜플이면 높이 없이 'lon,lat' 로 씀
+        """
+        if isinstance(ring, np.ndarray):
+            dims = ring.shape[1] if ring.ndim == 2 else 3
+            values = ring.ravel().tolist()
+        else:
+            dims = len(ring[0]) if len(ring) else 3
+            values = [v for vertex in ring for v in vertex]
+        return self._ring_format(len(ring), depth, dims) % tuple(values)
+
+    # ------------------------------------------------------------------
+    # Placemark
+    # ------------------------------------------------------------------
+    def write_raw(self, xml, folder=()):
+        self._enter_folder(folder)
+        self._file.write(xml)
+        self.count += 1
+
+    def _build(self, name, description, inline_style, style_url, extrude, altitude_mode,
+               rings, ring_inner):
+        ind, nl = self._ind, self._nl
+        out = ['<Placemark>', nl]
+        if name is not None:
+            out.append('%s<name>%s</name>%s' % (ind(3), escape(name), nl))
+        if description is not None:
+            out.append('%s<description>%s</description>%s' % (ind(3), escape(description), nl))
+        if inline_style is not None:
+            if self.compact:
+                inline_style = _BETWEEN_TAGS.sub('><', inline_style)
+            out.append('%s%s%s' % (ind(3), inline_style, nl))
+        if style_url is not None:
+            out.append('%s<styleUrl>%s</styleUrl>%s' % (ind(3), escape(style_url), nl))
+
+        polygons = _polygons(rings, ring_inner)
+        multi = len(polygons) > 1
+        d = 4 if multi else 3
+        if multi:
+            out.append('%s<MultiGeometry>%s' % (ind(3), nl))
+        for outer, holes in polygons:
+            out.append('%s<Polygon>%s' % (ind(d), nl))
+            if extrude is not None:
+                out.append('%s<extrude>%d</extrude>%s' % (ind(d + 1), extrude, nl))
+            if altitude_mode is not None:
+                out.append('%s<altitudeMode>%s</altitudeMode>%s' % (ind(d + 1), altitude_mode, nl))
+            for tag, ring in [('outerBoundaryIs', outer)] + [('innerBoundaryIs', h) for h in holes]:
+                out.append('%s<%s>%s%s<LinearRing>%s' % (ind(d + 1), tag, nl, ind(d + 2), nl))
+                out.append('%s<coordinates>%s</coordinates>%s'
+                           % (ind(d + 3), self.format_ring(ring, d + 4), nl))
+                out.append('%s</LinearRing>%s%s</%s>%s' % (ind(d + 2), nl, ind(d + 1), tag, nl))
+            out.append('%s</Polygon>%s' % (ind(d), nl))
+        if multi:
+            out.append('%s</MultiGeometry>%s' % (ind(3), nl))
+        out.append('%s</Placemark>%s%s' % (ind(2), nl, ind(2)))
+        return ''.join(out)
+
+    def placemark_xml(self, pm):
+        """Placemark 레코드 → 문자열 (원본 xml 이 남아 있고 재포맷이 필요 없으면 그대로)"""
+        if pm.xml is not None and self.passthrough:
+            return pm.xml
+        return self._build(pm.name, pm.description, pm.inline_style, pm.style_url,
+                           pm.extrude, pm.altitude_mode, pm.rings, pm.ring_inner)
+
+    def write_placemark(self, pm):
+        self.write_raw(self.placemark_xml(pm), pm.folder)
+
+    def write_building(self, store, i):
+        """BuildingStore 의 건물 i 를 좌표 배열에서 바로 직렬화"""
+        if store.xml is not None and store.xml[i] is not None and self.passthrough:
+            self.write_raw(store.xml[i], store.folders[i])
+            return
+        # 정점 (V,3) 배열은 저장소마다 한 번만 만듦 (move 로 좌표가 바뀌면 version 으로 다시 만듦)
+        if self._xyz[0] is not store or self._xyz[1] != store.version:
+            self._xyz = (store, store.version,
+                         np.column_stack((store.lon, store.lat, store.alt)))
+        xyz = self._xyz[2]
+        offsets = store.ring_offsets
+        r0, r1 = int(store.building_rings[i]), int(store.building_rings[i + 1])
+        rings = [xyz[offsets[r]:offsets[r + 1]] for r in range(r0, r1)]
+        extrude = int(store.extrude[i])
+        xml = self._build(store.names[i], store.descriptions[i], store.inline_styles[i],
+                          store.style_urls[i], None if extrude < 0 else extrude,
+                          store.altitude_modes[i], rings, store.ring_inner[r0:r1].tolist())
+        self.write_raw(xml, store.folders[i])
+
+    def write_store(self, store, indices=None):
+        """저장소 전체 (또는 indices 건물만, 순서대로) 기록, 삭제 표시된 건물은 건너뜀"""
+        if indices is None:
+            indices = np.flatnonzero(~store.deleted)
+        else:
+            indices = np.asarray(indices)
+            if indices.dtype == bool:
+                indices = np.flatnonzero(indices)
+            indices = indices[~store.deleted[indices]]
+        with stage('serialize', items=len(indices)):
+            for i in indices.tolist():
+                self.write_building(store, i)
+
+
+def write_kml(path, header, fragments, document_name=None, **options):
+    """
+    header 요소 + (Placemark 직렬화 문자열, Folder 경로) 쌍들로 KML 작성
+    같은 Folder 에 속한 연속 Placemark 는 <Folder> 로 다시 묶음
+    """
+    with KmlWriter(path, **options) as writer:
+        writer.write_header(header, document_name)
+        for xml, folder in fragments:
+            writer.write_raw(xml, folder)
@@ -1,63 +1,35 @@
-import xml.etree.ElementTree as ET
-import re
-
-# KML 파일 파싱
-tree = ET.parse('cheongna_buildings_5km.kml')
-root = tree.getroot()
-
-# 네임스페이스
-ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-ET.register_namespace('', 'http://www.opengis.net/kml/2.2')
-
-# 좌표 정밀도 줄이는 함수
-def round_coordinate(coord_str, decimal_places=6):
-    """좌표 정밀도를 줄임 (소수점 6자리면 약 10cm 정확도)"""
-    parts = coord_str.split(',')
-    if len(parts) >= 2:
-        lon = round(float(parts[0]), decimal_places)
-        lat = round(float(parts[1]), decimal_places)
-        if len(parts) == 3:
-            # 높이는 소수점 1자리로
-            height = round(float(parts[2]), 1)
-            return f"{lon},{lat},{height}"
-        return f"{lon},{lat}"
-    return coord_str
-
-# 모든 Polygon 처리
-removed_extrude = 0
-optimized_coords = 0
-
-for polygon in root.findall('.//kml:Polygon', ns):
-    # extrude 제거
-    extrude = polygon.find('kml:extrude', ns)
-    if extrude is not None:
-        polygon.remove(extrude)
-        removed_extrude += 1
-    
-    # 좌표 최적화
-    coords_elem = polygon.find('.//kml:coordinates', ns)
-    if coords_elem is not None:
-        coords_text = coords_elem.text.strip()
-        coord_points = [c.strip() for c in coords_text.split() if c.strip()]
-        
-        # 각 좌표 정밀도 줄이기
-        optimized_points = [round_coordinate(c) for c in coord_points]
-        
-        # 공백으로 구분하여 다시 저장 (줄바꿈 제거로 더 간결하게)
-        coords_elem.text = ' '.join(optimized_points)
-        optimized_coords += 1
-
-print(f"제거된 extrude: {removed_extrude}개")
-print(f"최적화된 좌표: {optimized_coords}개")
-
-# 저장
-tree.write('cheongna_buildings_5km_optimized.kml', encoding='utf-8', xml_declaration=True)
-print("최적화 파일 저장 완료: cheongna_buildings_5km_optimized.kml")
+import os
+from kml_pipeline import Pipeline, ExtrudeStage, SimplifyStage
+
+INPUT_FILE = 'cheongna_buildings_5km.kml'
+OUTPUT_FILE = 'cheongna_buildings_5km_optimized.kml'
+
+# 외곽선 단순화 허용 오차 (m, 예: 0.5), None 이면 단순화하지 않음 (기본: 도형 그대로)
+SIMPLIFY_TOLERANCE_M = None
+
+# extrude 제거 + 좌표 정밀도 줄이기 (소수점 6자리면 약 10cm 정확도, 높이는 1자리)
+# 정밀도는 라이터가 링 단위로 한 번에 포맷, 들여쓰기 없는 compact 레이아웃으로 저장
+extrude = ExtrudeStage(None)
+stages = [extrude]
+if SIMPLIFY_TOLERANCE_M is not None:
+    # 중복 / 일직선 정점 제거 + Douglas–Peucker 로 불필요한 정점 제거
+    simplify = SimplifyStage(SIMPLIFY_TOLERANCE_M)
+    stages.insert(0, simplify)
+pipeline = Pipeline(stages)
+pipeline.run(INPUT_FILE, OUTPUT_FILE, precision=6, alt_precision=1, compact=True)
+
+print(f"제거된 extrude: {extrude.counters['changed']}개")
+if SIMPLIFY_TOLERANCE_M is not None:
+    removed = simplify.vertices_in - simplify.vertices_out
+    print(f"단순화 ({SIMPLIFY_TOLERANCE_M}m): 정점 {simplify.vertices_in:,} → {simplify.vertices_out:,}개 "
+          f"({removed / max(simplify.vertices_in, 1) * 100:.1f}% 감소)")
+print(f"최적화된 건물: {pipeline.written}개")
+
+print(f"최적화 파일 저장 완료: {OUTPUT_FILE}")
 
 # 파일 크기 비교
-import os
-original_size = os.path.getsize('cheongna_buildings_5km.kml')
-optimized_size = os.path.getsize('cheongna_buildings_5km_optimized.kml')
+original_size = os.path.getsize(INPUT_FILE)
+optimized_size = os.path.getsize(OUTPUT_FILE)
 print(f"\n원본 파일: {original_size:,} bytes ({original_size/1024/1024:.2f} MB)")
 print(f"최적화 파일: {optimized_size:,} bytes ({optimized_size/1024/1024:.2f} MB)")
 print(f"감소량: {original_size-optimized_size:,} bytes ({(1-optimized_size/original_size)*100:.1f}% 감소)")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+5km 원본 내보내기에서 반경 KML 을 한 번에 다시 만듦
+정리 (clean) → 샘플 양식 (스타일 변경 + 7자리) → 반경 필터 → 최적화 (선택)
+원본은 한 번 읽고 결과는 한 번 씀 (중간 파일 없음)
+"""
+import os
+from kml_journal import Journal
+from kml_pipeline import Pipeline, CleanStage, RestyleStage, RadiusStage, ExtrudeStage
+
+INPUT_FILE = 'cheongna_buildings_5km.kml'
+
+# 청라시티타워 중심 좌표
+CENTER_LON = 126.633973
+CENTER_LAT = 37.533053
+RADIUS_KM = 2.5
+
+# optimize 단계 (extrude 제거, 6자리) 까지 적용할지 여부
+OPTIMIZE = False
+# 들여쓰기/줄바꿈 없이 저장 (배포용)
+COMPACT = False
+# True 면 .kmz 로 저장 (zip 항목으로 바로 압축)
+KMZ = False
+
+output_file = f'cheongna_buildings_{RADIUS_KM}km_perfect.' + ('kmz' if KMZ else 'kml')
+
+stages = [
+    CleanStage(decimal_places=7),
+    RestyleStage(alpha='ff', fill=1, outline=1),
+    RadiusStage(CENTER_LON, CENTER_LAT, RADIUS_KM),
+]
+if OPTIMIZE:
+    stages.append(ExtrudeStage(None))
+
+print("=" * 80)
+print(f"{output_file} 다시 만드는 중")
+print("=" * 80)
+
+pipeline = Pipeline(stages)
+# 편집 기록이 있는 기준 파일이면 다시 쓴 파일을 새 세대 기준으로 (기록이 깨지지 않게)
+with Journal(output_file).rewriting():
+    pipeline.run(INPUT_FILE, output_file,
+                 document_name=f'청라시티타워 반경 {RADIUS_KM}km 건물 (높이 1~299m)',
+                 precision=6 if OPTIMIZE else None, alt_precision=1 if OPTIMIZE else None,
+                 compact=COMPACT)
+pipeline.print_report()
+
+original_size = os.path.getsize(INPUT_FILE)
+new_size = os.path.getsize(output_file)
+print(f"\n✅ 저장 완료: {output_file}")
+print(f"  원본: {original_size/1024/1024:.2f} MB → {new_size/1024/1024:.2f} MB")
+print("=" * 80)
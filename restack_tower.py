@@ -0,0 +1,49 @@
+import os
+import sys
+
+from kml_store import BuildingStore
+from kml_tower import slab_store, store_render_cost
+
+# 층마다 지면부터 extrude 한 타워 KML → 층 사이 판 (같은 외곽선 연속 층은 하나로)
+SOURCE_FILE = '청라신축타워_448m.kml'
+OUTPUT_FILE = '청라신축타워_448m_slab.kml'
+# 'envelope': 층마다 위층들 중 가장 넓은 외곽선 → 겹친 기둥들의 외형, 구간 수만큼 (아랫면 없음)
+# 'slab': 층마다 바닥~꼭대기 판 (옆면 + 윗면 + 아랫면) — 아랫면 때문에 삼각형이 늘 수 있어
+#         렌더 비용 절감용이 아님 (층 사이 판 자체가 필요할 때만)
+MODE = 'envelope'
+# 변환 결과를 그리는 비용 (삼각형 수 또는 옆면 넓이) 이 원본보다 크면 저장하지 않음
+# (True 면 경고만 하고 저장)
+ALLOW_COSTLIER = False
+
+print(f"=== 층별 기둥 → 층 사이 판 ({MODE}) ===\n")
+
+store = BuildingStore.from_kml(SOURCE_FILE)
+slabs = slab_store(store, mode=MODE)
+
+print(f"층 (기둥): {len(store)}개 → 판: {len(slabs)}개")
+print(f"Polygon: {len(store.ring_inner)}개 → {len(slabs.ring_inner)}개")
+print(f"정점: {len(store.lon):,}개 → {len(slabs.lon):,}개")
+print(f"최고 높이: {store.top_alt.max():.1f}m → {slabs.top_alt.max():.1f}m")
+
+# Google Earth 가 그릴 삼각형 수 / 옆면 넓이로 저장 여부 결정
+source_triangles, source_walls = store_render_cost(store)
+triangles, walls = store_render_cost(slabs)
+print(f"\n  삼각형: {source_triangles:,}개 → {triangles:,}개 "
+      f"({(triangles - source_triangles) / source_triangles * 100:+.1f}%)")
+print(f"  옆면 넓이: {source_walls:,.0f}m² → {walls:,.0f}m² "
+      f"({(walls - source_walls) / source_walls * 100:+.1f}%)")
+costlier = triangles > source_triangles or walls > source_walls
+if costlier and not ALLOW_COSTLIER:
+    print(f"\n⚠️  변환 결과를 그리는 비용이 원본보다 커서 저장하지 않음")
+    print(f"   원본 그대로 쓰는 것이 더 가벼움 — 그래도 저장하려면 ALLOW_COSTLIER = True")
+    sys.exit(1)
+
+slabs.write(OUTPUT_FILE, precision=7, alt_precision=1)
+source_size = os.path.getsize(SOURCE_FILE)
+output_size = os.path.getsize(OUTPUT_FILE)
+# 판은 옆면을 Polygon 으로 직접 그리므로 파일은 extrude 기둥보다 커질 수 있음 (참고용)
+print(f"\n  파일: {source_size:,} bytes → {output_size:,} bytes "
+      f"({(output_size - source_size) / source_size * 100:+.1f}%)")
+if costlier:
+    print(f"\n⚠️  변환 결과를 그리는 비용이 원본보다 큼 (ALLOW_COSTLIER = True 로 저장)")
+print(f"\n✅ 저장 완료: {OUTPUT_FILE}")
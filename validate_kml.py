@@ -0,0 +1,31 @@
+import json
+
+from kml_rules import RULES, build_report, validate
+
+SOURCE_FILE = 'cheongna_buildings_5km.kml'
+REPORT_FILE = 'validation_report.json'
+# None 이면 건물 수에 따라 자동 (작은 파일은 한 프로세스)
+WORKERS = None
+
+# 모든 규칙을 전체 건물에 대해 한 번에 계산 (파일은 캐시로 한 번만 읽음)
+store, masks = validate(SOURCE_FILE, workers=WORKERS)
+report = build_report(store, masks, source=SOURCE_FILE)
+
+print(f"총 건물 수: {report['buildings']}")
+print(f"모든 규칙 통과: {report['passed']}개\n")
+
+print("=== 규칙별 결과 ===")
+for rule in RULES:
+    failed = report['rules'][rule.name]['failed']
+    print(f"  {rule.name}: {failed}개 - {rule.description}")
+
+# 문제 있는 건물 예시
+failed = [b for b in report['results'] if not b['ok']]
+if failed:
+    print(f"\n=== 문제 있는 건물 (처음 10개 / 총 {len(failed)}개) ===")
+    for building in failed[:10]:
+        print(f"  [{building['index']}] {building['name']}: {', '.join(building['failed'])}")
+
+with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+    json.dump(report, f, ensure_ascii=False, indent=2)
+print(f"\n전체 보고서 저장: {REPORT_FILE}")
@@ -0,0 +1,127 @@
+import json
+
+from kml_verify import Count, Forbidden, Positions, SameGeometry, Select, verify_file
+
+# 편집 기록 (.journal) 이 있으면 기록까지 적용한 현재 상태를 검증
+USE_JOURNAL = True
+
+# 실행할 검사 묶음 (None 이면 전부)
+# 기본은 전부: 스크립트를 모두 실행한 현재 상태 (삭제 후 라피아노 복원) 에서 함께 통과
+SETS = None
+
+REPORT_FILE = 'verification_report.json'
+
+KML_FILE = 'cheongna_buildings_2.5km_perfect.kml'
+SOURCE_FILE = 'cheongna_buildings_5km_perfect.kml'
+CLEAN_FILE = 'cheongna_buildings_5km_clean.kml'
+
+# 검사 묶음: 이름 → (검증할 파일, 검사 목록)
+CHECK_SETS = {
+    # copy_and_move_building.py: 청라더샵레이크파크 3곳 복사 (요청 위치에서 약 10m 이내)
+    'copies': (KML_FILE, [
+        Positions('lake_park_copy_positions',
+                  Select('청라더샵레이크파크', where=lambda s: s.vertex_count > 0),
+                  [(37.530835, 126.638879, 'Copy 1'),
+                   (37.53083906814747, 126.63797714584872, 'Copy 2'),
+                   (37.530824759044826, 126.63702985257429, 'Copy 3')],
+                  tolerance_m=11.1),
+    ]),
+    # copy_dieast_buildings.py: 청라 디 이스트 2개 건물을 1곳 + 7곳에 복사
+    'dieast': (KML_FILE, [
+        Count('dieast_copies', Select(('청라 디 이스트', ' - Copy-')), 8),
+        Positions('dieast_copy_positions', Select(('청라 디 이스트', ' - Copy-')),
+                  [(37.527302, 126.622974, 'Copy-1 (from bottom-right)'),
+                   (37.526918, 126.624515, 'Copy-1 (from middle-left)'),
+                   (37.525738, 126.623513, 'Copy-2'),
+                   (37.526073, 126.624895, 'Copy-3'),
+                   (37.524977, 126.623893, 'Copy-4'),
+                   (37.525326, 126.625191, 'Copy-5'),
+                   (37.524414, 126.624130, 'Copy-6'),
+                   (37.524786, 126.625445, 'Copy-7')]),
+        SameGeometry('dieast_copy_shapes', Select(('청라 디 이스트', ' - Copy-')), relative=True),
+    ]),
+    # delete_and_copy_buildings.py: 푸르지오 삭제 + 청라더샵레이크파크를 푸르지오 위치 4곳에 복사
+    'deletion_and_copy': (KML_FILE, [
+        # 라피아노는 restore_prugio_except_apartment.py 가 되살리므로 제외 (복원 전후 모두 통과)
+        Forbidden('prugio_deleted', Select('푸르지오', exclude=('더샵레이크파크', '라피아노'))),
+        Count('lake_park_new_copies', Select(('더샵레이크파크', '푸르지오위치')), 4),
+        Positions('lake_park_new_copy_positions', Select(('더샵레이크파크', '푸르지오위치')),
+                  [(37.535087, 126.636995), (37.535252, 126.637917),
+                   (37.535328, 126.638787), (37.535392, 126.639674)]),
+        SameGeometry('lake_park_new_copy_shapes', Select(('더샵레이크파크', '푸르지오위치')),
+                     relative=True),
+    ]),
+    # restore_prugio_except_apartment.py: 라피아노 1, 2단지만 원본 (5km) 에서 복원
+    'prugio_restoration': (KML_FILE, [
+        Count('lapiano1_restored', Select('청라푸르지오라피아노 1단지'), (1, None)),
+        Count('lapiano2_restored', Select('청라푸르지오라피아노 2단지'), (1, None)),
+        Forbidden('apartment_excluded', Select('청라푸르지오아파트', exclude='더샵레이크파크')),
+        SameGeometry('lapiano_same_as_source',
+                     Select('청라푸르지오라피아노', any_of=('1단지', '2단지')), source=SOURCE_FILE),
+    ]),
+    # fix_kml_clean.py: 정리 후에도 3D (extrude=1) 유지
+    'clean': (CLEAN_FILE, [
+        Count('extruded', Select(where=lambda s: (s.extrude == 1) & (s.vertex_count > 0)),
+              (1, None)),
+    ]),
+}
+
+selected = [name for name in CHECK_SETS if SETS is None or name in SETS]
+
+# 파일마다 한 번만 읽고 그 파일의 모든 검사를 같이 계산
+files = {}
+for name in selected:
+    path, checks = CHECK_SETS[name]
+    files.setdefault(path, []).extend((name, check) for check in checks)
+
+print("=== 검증 ===")
+reports = []
+for path, named in files.items():
+    try:
+        report = verify_file(path, [check for _, check in named], journal=USE_JOURNAL)
+    except FileNotFoundError:
+        print(f"\n⚠️  {path}: 파일 없음 (건너뜀)")
+        reports.append({'target': path, 'skipped': True,
+                        'sets': sorted({name for name, _ in named})})
+        continue
+    for (set_name, _), result in zip(named, report['checks']):
+        result['set'] = set_name
+    reports.append(report)
+
+    state = report['journal']
+    edits = f", 편집 기록 {state['edits']}개 적용" if state else ""
+    print(f"\n{path} (건물 {report['buildings']}개{edits})")
+    for result in report['checks']:
+        if result.get('skipped'):
+            print(f"  ⚠️  [{result['set']}] {result['name']}: {result['warning']}: "
+                  f"{result['source']} (건너뜀)")
+            continue
+        mark = '✅' if result['ok'] else '❌'
+        if result['kind'] == 'Positions':
+            matched = sum(p['ok'] for p in result['positions'])
+            detail = f"{matched}/{len(result['positions'])}곳 {result['tolerance_m']}m 이내"
+        elif result['kind'] == 'SameGeometry':
+            detail = f"{result['count'] - len(result['mismatched'])}/{result['count']}개 도형 일치"
+        else:
+            detail = f"{result['count']}개"
+        print(f"  {mark} [{result['set']}] {result['name']}: {detail}")
+        if result['ok']:
+            continue
+        if result['kind'] == 'Positions':
+            for p in result['positions']:
+                if not p['ok']:
+                    near = f" (가장 가까운 건물 {p['error_m']:.1f}m)" if p['error_m'] is not None else ""
+                    print(f"      - {p['label'] or ''} ({p['lat']:.6f}, {p['lon']:.6f}){near}")
+        else:
+            for building in result['names'][:10]:
+                print(f"      - {building}")
+
+# 파일이 없어 건너뛴 자리표시 보고서는 빼고, 실제로 계산한 검사 결과 전부로 판정
+checked = [r for r in reports if r.get('skipped') is not True]
+ok = all(result['ok'] is not False for r in checked for result in r['checks'])
+with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+    json.dump({'ok': ok, 'sets': selected, 'files': reports}, f, ensure_ascii=False, indent=2)
+
+print(f"\n{'✅ 모든 검사 통과' if ok else '❌ 실패한 검사 있음'} — 보고서: {REPORT_FILE}")
+if not ok:
+    exit(1)